@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backends de navegador para as operações de página do bot
+(navegar, buscar elementos, clicar, preencher, avaliar JS, screenshot)
+
+- SeleniumBackend: cada operação é um comando WebDriver (HTTP ao chromedriver)
+- CdpBackend: fala direto com a guia pelo Chrome DevTools Protocol em um websocket
+  persistente; cada operação é um único Runtime.evaluate, sem passar pelo chromedriver
+
+O CdpBackend se conecta ao mesmo Chrome aberto pelo Selenium (debuggerAddress), então login,
+janelas e esperas longas continuam no Selenium e só o caminho quente usa o backend escolhido.
+Seleção: BROWSER_BACKEND=selenium|cdp
+"""
+
+import os
+import json
+import time
+import base64
+import threading
+import logging
+from abc import ABC, abstractmethod
+from urllib.request import urlopen
+
+from selenium.webdriver.common.by import By
+
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+logger = logging.getLogger("dropi_automation_cron")
+
+BACKEND_SELENIUM = "selenium"
+BACKEND_CDP = "cdp"
+BROWSER_BACKEND = os.getenv("BROWSER_BACKEND", BACKEND_SELENIUM).strip().lower()
+
+CDP_TIMEOUT_SECONDS = float(os.getenv("CDP_TIMEOUT_SECONDS", "30"))
+WAIT_POLL_SECONDS = 0.25
+
+# Visibilidade aproximada do is_displayed do Selenium
+IS_VISIBLE_JS = """(e) => {
+    if (!e || !e.isConnected) return false;
+    const style = window.getComputedStyle(e);
+    if (style.visibility === 'hidden' || style.display === 'none') return false;
+    return e.offsetParent !== null || e.getClientRects().length > 0;
+}"""
+VISIBLE_SCRIPT = f"return ({IS_VISIBLE_JS})(arguments[0]);"
+
+FIND_XPATH_JS = """
+const result = document.evaluate(arguments[0], arguments[1] || document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const nodes = [];
+for (let i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+"""
+FIND_XPATH_SCRIPT = FIND_XPATH_JS + "return nodes;"
+FIND_VISIBLE_XPATH_SCRIPT = FIND_XPATH_JS + f"return nodes.filter({IS_VISIBLE_JS});"
+
+FILL_SCRIPT = """
+const field = arguments[0];
+field.click();
+field.value = '';
+field.value = arguments[1];
+for (const name of ['input', 'change', 'blur']) field.dispatchEvent(new Event(name));
+"""
+
+
+class BrowserBackend(ABC):
+    """Interface das operações de página usadas no processamento de novelties"""
+
+    name = None
+
+    @abstractmethod
+    def navigate(self, url):
+        pass
+
+    @abstractmethod
+    def current_url(self):
+        pass
+
+    @abstractmethod
+    def evaluate(self, script, *args):
+        """Executa o corpo de função script (com arguments[i] e return, como execute_script)"""
+
+    @abstractmethod
+    def find_all(self, xpath, root=None):
+        pass
+
+    @abstractmethod
+    def is_visible(self, element):
+        pass
+
+    @abstractmethod
+    def text(self, element):
+        pass
+
+    @abstractmethod
+    def screenshot(self, path):
+        pass
+
+    def close(self):
+        pass
+
+    def release_handles(self):
+        """Descarta referências a elementos de iterações anteriores"""
+        pass
+
+    def click(self, element):
+        """Clique via JS (o Dropi tem sobreposições que interceptam o clique nativo)"""
+        self.evaluate("arguments[0].click();", element)
+
+    def scroll_into_view(self, element, block="center"):
+        self.evaluate("arguments[0].scrollIntoView({block: arguments[1]});", element, block)
+
+    def fill(self, element, value):
+        """Clica, limpa, define o valor e dispara input/change/blur em uma única ida ao navegador"""
+        self.evaluate(FILL_SCRIPT, element, value)
+
+    def find_visible(self, xpath, root=None):
+        return [element for element in self.find_all(xpath, root) if self.is_visible(element)]
+
+    def wait_for_any(self, xpaths, timeout, visible=False):
+        """Primeiro elemento que aparecer para qualquer um dos xpaths; None após o timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            for xpath in xpaths:
+                found = self.find_visible(xpath) if visible else self.find_all(xpath)
+                if found:
+                    return found[0]
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(WAIT_POLL_SECONDS)
+
+
+class SeleniumBackend(BrowserBackend):
+    """Operações de página pelos comandos WebDriver"""
+
+    name = BACKEND_SELENIUM
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def navigate(self, url):
+        self.driver.get(url)
+
+    def current_url(self):
+        return self.driver.current_url
+
+    def evaluate(self, script, *args):
+        return self.driver.execute_script(script, *args)
+
+    def find_all(self, xpath, root=None):
+        return (root or self.driver).find_elements(By.XPATH, xpath)
+
+    def is_visible(self, element):
+        return element.is_displayed()
+
+    def text(self, element):
+        return element.text
+
+    def screenshot(self, path):
+        return self.driver.save_screenshot(path)
+
+
+class CdpElement:
+    """Referência a um elemento guardado na página (window.__dropiHandles[index])"""
+
+    __slots__ = ("index",)
+
+    def __init__(self, index):
+        self.index = index
+
+    def __repr__(self):
+        return f"CdpElement({self.index})"
+
+
+class CdpError(Exception):
+    pass
+
+
+# Converte o retorno do script: elementos ficam na página e voltam como {"__cdp_handle__": i}
+# (Promises são aguardadas, como no execute_script do WebDriver)
+CDP_EVALUATE_TEMPLATE = """
+(() => {
+    const handles = window.__dropiHandles || (window.__dropiHandles = []);
+    const args = %s.map(arg => (arg && typeof arg === 'object' && '__cdp_handle__' in arg) ? handles[arg.__cdp_handle__] : arg);
+    const wrap = (value) => {
+        if (value instanceof Element) { handles.push(value); return {__cdp_handle__: handles.length - 1}; }
+        if (value instanceof NodeList || value instanceof HTMLCollection || Array.isArray(value)) return Array.from(value, wrap);
+        if (value && typeof value === 'object') {
+            const out = {};
+            for (const key of Object.keys(value)) out[key] = wrap(value[key]);
+            return out;
+        }
+        return value;
+    };
+    const result = (function () { %s }).apply(null, args);
+    return (result && typeof result.then === 'function') ? result.then(wrap) : wrap(result);
+})()
+"""
+
+
+class CdpBackend(BrowserBackend):
+    """Operações de página por Runtime.evaluate em um websocket CDP persistente"""
+
+    name = BACKEND_CDP
+
+    def __init__(self, websocket_url, timeout=CDP_TIMEOUT_SECONDS, on_command=None):
+        if websocket is None:
+            raise CdpError("websocket-client não instalado")
+        self.socket = websocket.create_connection(websocket_url, timeout=timeout, suppress_origin=True)
+        self.on_command = on_command
+        self.lock = threading.Lock()
+        self.next_id = 0
+
+    @classmethod
+    def attach(cls, driver, on_command=None):
+        """Conecta à guia atual do Chrome aberto pelo Selenium (o window handle é o id do alvo CDP)"""
+        address = driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+        if not address:
+            raise CdpError("Chrome sem debuggerAddress")
+        with urlopen(f"http://{address}/json", timeout=5) as response:
+            targets = json.loads(response.read().decode("utf-8"))
+        handle = driver.current_window_handle
+        pages = [target for target in targets if target.get("type") == "page"]
+        target = next((target for target in pages if target.get("id") == handle), pages[0] if pages else None)
+        if not target:
+            raise CdpError("Nenhuma guia encontrada para conectar via CDP")
+        return cls(target["webSocketDebuggerUrl"], on_command=on_command)
+
+    def send(self, method, params=None):
+        """Envia um comando e espera a resposta com o mesmo id (eventos recebidos no meio são ignorados)"""
+        started = time.perf_counter()
+        with self.lock:
+            self.next_id += 1
+            message_id = self.next_id
+            self.socket.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+            while True:
+                message = json.loads(self.socket.recv())
+                if message.get("id") == message_id:
+                    break
+        if self.on_command:
+            self.on_command(f"cdp:{method}", time.perf_counter() - started)
+        if "error" in message:
+            raise CdpError(message["error"].get("message", str(message["error"])))
+        return message.get("result", {})
+
+    def _encode(self, value):
+        if isinstance(value, CdpElement):
+            return {"__cdp_handle__": value.index}
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item) for item in value]
+        return value
+
+    def _decode(self, value):
+        if isinstance(value, dict):
+            if "__cdp_handle__" in value and len(value) == 1:
+                return CdpElement(value["__cdp_handle__"])
+            return {key: self._decode(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._decode(item) for item in value]
+        return value
+
+    def evaluate(self, script, *args):
+        expression = CDP_EVALUATE_TEMPLATE % (json.dumps([self._encode(arg) for arg in args]), script)
+        result = self.send("Runtime.evaluate", {
+            "expression": expression, "returnByValue": True, "awaitPromise": True
+        })
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CdpError(details.get("exception", {}).get("description") or details.get("text", "erro no script"))
+        return self._decode(result.get("result", {}).get("value"))
+
+    def navigate(self, url, timeout=CDP_TIMEOUT_SECONDS):
+        self.send("Page.navigate", {"url": url})
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_POLL_SECONDS)
+            try:
+                if self.evaluate("return document.readyState;") == "complete":
+                    return
+            except CdpError:
+                continue
+        raise CdpError(f"Timeout carregando {url}")
+
+    def current_url(self):
+        return self.evaluate("return location.href;")
+
+    def find_all(self, xpath, root=None):
+        return self.evaluate(FIND_XPATH_SCRIPT, xpath, root)
+
+    def is_visible(self, element):
+        return bool(self.evaluate(VISIBLE_SCRIPT, element))
+
+    def text(self, element):
+        return self.evaluate("return arguments[0].innerText;", element) or ""
+
+    def find_visible(self, xpath, root=None):
+        # Busca e filtro na mesma ida ao navegador
+        return self.evaluate(FIND_VISIBLE_XPATH_SCRIPT, xpath, root)
+
+    def release_handles(self):
+        # Sem isso a página manteria vivas as linhas de todos os snapshots anteriores
+        self.evaluate("window.__dropiHandles = [];")
+
+    def screenshot(self, path):
+        data = self.send("Page.captureScreenshot", {"format": "png"})["data"]
+        with open(path, 'wb') as f:
+            f.write(base64.b64decode(data))
+        return True
+
+    def close(self):
+        try:
+            self.socket.close()
+        except Exception:
+            pass
+
+
+def create_backend(driver, name=BROWSER_BACKEND, on_command=None):
+    """Backend escolhido; sem CDP disponível, volta para o Selenium"""
+    if name == BACKEND_CDP:
+        try:
+            backend = CdpBackend.attach(driver, on_command=on_command)
+            logger.info("🔌 Backend do navegador: CDP direto (websocket)")
+            return backend
+        except Exception as e:
+            logger.warning(f"⚠️ Backend CDP indisponível ({str(e)}) - usando Selenium")
+    elif name != BACKEND_SELENIUM:
+        logger.warning(f"⚠️ BROWSER_BACKEND desconhecido: {name} - usando Selenium")
+    return SeleniumBackend(driver)
+
+
+# Carga fixa para comparar backends contra o replay_server (site local)
+def run_workload(backend, url, rounds=20):
+    """
+    Repete as operações do caminho quente (ler tabela, visibilidade, textos, campos do formulário)
+    e retorna operações, tempo e operações por segundo
+    """
+    backend.navigate(url)
+    operations = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        rows = backend.find_all("//table//tr[.//button[contains(@class, 'btn-success')]]")
+        operations += 1
+        for row in rows[:10]:
+            if backend.is_visible(row):
+                cells = backend.find_all(".//td", row)
+                operations += 2
+                if cells:
+                    backend.text(cells[0])
+                    operations += 1
+        backend.evaluate("return document.querySelectorAll('table tbody tr').length;")
+        operations += 1
+        for field in backend.find_visible("//input")[:5]:
+            backend.scroll_into_view(field)
+            backend.fill(field, "benchmark")
+            operations += 2
+        operations += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "backend": backend.name,
+        "operacoes": operations,
+        "tempo_s": round(elapsed, 3),
+        "operacoes_por_s": round(operations / elapsed, 1) if elapsed else 0.0
+    }
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pool limitado de navegadores Chrome compartilhado entre perfis de país
+Evita um cold start do Chrome por país: drivers liberados são limpos e reaproveitados
+"""
+
+import threading
+import logging
+
+logger = logging.getLogger("dropi_automation_cron")
+
+
+class BrowserPool:
+    """Limita quantos Chrome ficam abertos ao mesmo tempo e reaproveita os drivers"""
+
+    def __init__(self, max_browsers):
+        self.max_browsers = max(1, int(max_browsers))
+        self.slots = threading.BoundedSemaphore(self.max_browsers)
+        self.lock = threading.Lock()
+        self.idle_drivers = []
+        self.all_drivers = []
+
+    def acquire(self, driver_factory):
+        """Bloqueia até haver vaga e retorna um driver (reaproveitado ou criado por driver_factory)"""
+        self.slots.acquire()
+        with self.lock:
+            if self.idle_drivers:
+                logger.info("♻️ Reaproveitando navegador do pool")
+                return self.idle_drivers.pop()
+
+        try:
+            driver = driver_factory()
+        except Exception:
+            self.slots.release()
+            raise
+
+        if driver is None:
+            self.slots.release()
+            return None
+
+        with self.lock:
+            self.all_drivers.append(driver)
+        return driver
+
+    def reset_driver(self, driver):
+        """Limpa sessão do driver (cookies, guias extras) antes de reaproveitar"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.get("about:blank")
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+
+    def release(self, driver, reusable=True):
+        """Devolve o driver ao pool; se não for reaproveitável, fecha o navegador"""
+        if driver is None:
+            self.slots.release()
+            return
+
+        try:
+            if reusable:
+                self.reset_driver(driver)
+                with self.lock:
+                    self.idle_drivers.append(driver)
+                return
+        except Exception as e:
+            logger.warning(f"⚠️ Navegador não pôde ser reaproveitado: {str(e)}")
+        finally:
+            self.slots.release()
+
+        self.discard(driver)
+
+    def replace(self, driver, driver_factory):
+        """Fecha driver e cria outro na mesma vaga (reciclagem sem devolver a vaga ao pool)"""
+        self.discard(driver)
+        new_driver = driver_factory()
+        if new_driver is not None:
+            with self.lock:
+                self.all_drivers.append(new_driver)
+        return new_driver
+
+    def discard(self, driver):
+        """Fecha um driver e remove do pool"""
+        with self.lock:
+            if driver in self.all_drivers:
+                self.all_drivers.remove(driver)
+            if driver in self.idle_drivers:
+                self.idle_drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao fechar navegador: {str(e)}")
+
+    def close_all(self):
+        """Fecha todos os navegadores do pool"""
+        with self.lock:
+            drivers = list(self.all_drivers)
+        for driver in drivers:
+            self.discard(driver)
+        logger.info(f"🔒 Pool de navegadores encerrado ({len(drivers)} navegadores)")
@@ -13,13 +13,13 @@ import traceback
 import os
 import sys
 import platform
-import re
 import datetime
 import requests
 import json
+import threading
+import signal
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -29,34 +29,92 @@ from selenium.webdriver.support.ui import Select
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
 from io import StringIO
+from contextlib import contextmanager
 
 # Adiciona o diretório atual ao path para importar db_connection
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
-    from db_connection import get_execution_history, is_railway, save_execution_result
+    from db_connection import (
+        get_execution_history, is_railway, save_execution_result, get_last_fingerprint, count_skipped_runs
+    )
 except ImportError:
     print("❌ Erro ao importar db_connection. Verifique se o arquivo existe no diretório raiz.")
     sys.exit(1)
 
+from country_profiles import INCIDENT_UNKNOWN, get_profile, get_enabled_profiles
+from browser_pool import BrowserPool
+from run_recorder import RunRecorder, RECORD_RUN, enable_performance_log
+from profiling import RunProfiler, PROFILE_MODE, PROFILE_DISCORD
+from structured_logging import setup_logging, set_text_format, set_log_context, log_context, new_run_id
+from novelty_scheduler import NoveltyScheduler, pending_fingerprint
+from circuit_breaker import CircuitBreaker
+from run_controller import RunController, format_duration
+from webdriver_stats import CommandStats, instrument_driver, command_recorder
+from browser_backend import create_backend
+from discord_digest import DiscordDigest
+from modal_observer import (
+    ModalWatcher, MODAL_VISIBLE_STATES, MODAL_CONFIRM, MODAL_FORM, MODAL_CLOSED,
+    MODAL_OPEN_TIMEOUT, MODAL_CONFIRM_TIMEOUT, MODAL_FORM_TIMEOUT, MODAL_CLOSE_TIMEOUT
+)
+from rate_governor import (
+    GOVERNOR, GOVERNOR_NETWORK_LOG, GOVERNOR_SUBMIT_TIMEOUT, NetworkLogWatcher, worst_outcome,
+    is_error_page, ERROR_PAGE_SCRIPT, OUTCOME_OK, OUTCOME_SLOW, OUTCOME_ERROR_PAGE, WRITE_METHODS
+)
+import novelty_scrape
+from driver_resolver import resolve_chromedriver
+from memory_watchdog import (
+    MemoryWatchdog, RECYCLE_DRIVER, RECYCLE_TAB, measure_process_tree_rss, driver_pid
+)
+from retry_queue import (
+    RetryQueue, FAILURE_DESCRIPTIONS, FAILURE_SAVE_BUTTON_MISSING, FAILURE_MODAL_NOT_SHOWN,
+    FAILURE_YES_NOT_CLICKED, FAILURE_NO_FIELDS, FAILURE_SAVE_FAILED, FAILURE_MODAL_STILL_OPEN,
+    FAILURE_UNEXPECTED
+)
+from metrics import (
+    REGISTRY, NOVELTIES_PROCESSED, NOVELTIES_FAILED, STEP_DURATION,
+    CHROME_RSS_BYTES, LAST_RUN_TIMESTAMP, DISCORD_CALL_DURATION, NOVELTY_RETRIES, CHROME_RECYCLES
+)
+
 # Constantes
-THIS_COUNTRY = "chile"
+THIS_COUNTRY = "chile"  # Perfil padrão (ver country_profiles.py)
+MAX_BROWSERS = int(os.getenv("MAX_BROWSERS", "2"))  # Navegadores simultâneos no modo multi-país
+
+# Limite do heap V8 (MB) de cada renderer do Chrome (passado via --js-flags)
+CHROME_JS_HEAP_MB = int(os.getenv("CHROME_JS_HEAP_MB", "4096"))
+
+# Encerra a execução cedo quando as pendentes são idênticas às da última execução completa
+FINGERPRINT_SKIP_ENABLED = os.getenv("FINGERPRINT_SKIP_ENABLED", "true").lower() in ["true", "1", "yes"]
+
+# Modo daemon: intervalo entre verificações e a cada quantas verificações as pendentes antigas são retentadas
+DAEMON_POLL_MINUTES = float(os.getenv("DAEMON_POLL_MINUTES", "5"))
+DAEMON_FULL_SWEEP_EVERY = int(os.getenv("DAEMON_FULL_SWEEP_EVERY", "12"))
+
+# Lê todas as linhas pendentes (com botão Save visível) em uma única chamada
+PENDING_ROWS_SCRIPT = """
+const result = [];
+document.querySelectorAll('table tbody tr').forEach((row, index) => {
+    if (row.offsetParent === null) return;
+    const hasSave = Array.from(row.querySelectorAll('button.btn-success')).some(b => b.offsetParent !== null);
+    if (!hasSave) return;
+    const cells = Array.from(row.querySelectorAll('td')).map(c => c.innerText.trim());
+    result.push({element: row, index: index, order_id: cells.length ? cells[0] : '', cells: cells});
+});
+return result;
+"""
 DISCORD_WEBHOOK_URL = "https://discord.com/api/webhooks/1379273630290284606/h1I670CtBauZ0J7_Oq2K5pPJOIZEAHkfI_9-gexG4jmMI0g5bMxRODt85BEcMyX_vkN_"
 
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('automation.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Configuração de logging: fila assíncrona, console em texto e automation.jsonl (ver structured_logging.py)
+setup_logging()
 logger = logging.getLogger("dropi_automation_cron")
 
 class DroplAutomationBot:
-    def __init__(self):
+    def __init__(self, profile=None, browser_pool=None):
+        self.profile = profile or get_profile(THIS_COUNTRY)
+        self.browser_pool = browser_pool
         self.driver = None
+        self.browser = None
+        self.modal_watcher = None
         self.execution_start_time = None
         self.processed_items = 0
         self.success_count = 0
@@ -64,47 +122,108 @@ class DroplAutomationBot:
         self.failed_items = []
         self.closed_tabs = 0
         self.found_pagination = False
+        self.all_entries_shown = False
         self.rows = []
         self.total_items = 0
+        self.current_incident_type = INCIDENT_UNKNOWN
+        self.start_fingerprint = None
+        self.end_fingerprint = None
+        self.skipped_runs = 0
+        self.scheduler = NoveltyScheduler(self.classify_incident)
+        self.retry_queue = RetryQueue()
+        self.last_failure_reason = None
+        self.breaker = CircuitBreaker()
+        self.run_controller = RunController()
+        self.run_started_at = None
+        self.run_id = None
+        self.profiler = None
+        self.remaining_backlog = 0
+        self.attempted_ids = set()
+        self.run_status = "ok"
+        self.diagnostic_path = None
+        self.watchdog = MemoryWatchdog(
+            lambda: driver_pid(self.driver),
+            on_sample=lambda rss: CHROME_RSS_BYTES.set(rss, country=self.profile.source_country)
+        )
+        self.recycles = {RECYCLE_TAB: 0, RECYCLE_DRIVER: 0}
+        self.command_stats = CommandStats()
+        self.governor = GOVERNOR
+        self.network_watcher = NetworkLogWatcher() if GOVERNOR_NETWORK_LOG else None
+        self.discord_digest = DiscordDigest(
+            f"{self.profile.flag} {self.profile.display_name}", self.build_discord_embed, self.post_discord_embed
+        )
         
-        # Credenciais fixas
-        self.email = "llegolatiendachile@gmail.com"
-        self.password = "Chegou123!"
+        # Gravação de snapshots para replay offline (RECORD_RUN=true ou --record)
+        self.recorder = RunRecorder(self.profile.source_country) if (RECORD_RUN or "--record" in sys.argv) else None
         
-    def send_discord_notification(self, message, is_error=False):
-        """Envia notificação para o Discord via webhook"""
-        try:
-            color = 0xFF0000 if is_error else 0x00FF00  # Vermelho para erro, verde para sucesso
-            
-            embed = {
-                "embeds": [{
-                    "title": "🇨🇱 Dropi Chile Cron Job",
-                    "description": message,
-                    "color": color,
-                    "timestamp": datetime.datetime.now().isoformat(),
-                    "footer": {
-                        "text": "Railway Cron Automation"
-                    }
-                }]
+        # Credenciais do perfil (variáveis de ambiente DROPI_<PAIS>_EMAIL/PASSWORD)
+        self.email, self.password = self.profile.get_credentials()
+        
+    def send_discord_notification(self, message, is_error=False, digest=True):
+        """
+        Notifica o Discord: erros vão na hora (repetidos são suprimidos), o restante
+        entra no resumo periódico (discord_digest.py), que guarda só a primeira linha.
+        digest=False envia a mensagem completa direto (ex: resumo de conclusão com estatísticas)
+        """
+        if digest:
+            self.discord_digest.notify(message, critical=is_error)
+        else:
+            self.discord_digest.send_now(message, critical=is_error)
+    
+    def build_discord_embed(self, message, is_error=False):
+        """Embed das notificações do bot"""
+        color = 0xFF0000 if is_error else 0x00FF00  # Vermelho para erro, verde para sucesso
+        
+        return {
+            "title": f"{self.profile.flag} Dropi {self.profile.display_name} Cron Job",
+            "description": message,
+            "color": color,
+            "timestamp": datetime.datetime.now().isoformat(),
+            "footer": {
+                "text": "Railway Cron Automation"
             }
-            
-            response = requests.post(DISCORD_WEBHOOK_URL, json=embed, timeout=10)
+        }
+    
+    def post_discord_embed(self, embed):
+        """Envia um embed via webhook; retorna True em caso de sucesso"""
+        try:
+            with DISCORD_CALL_DURATION.time():
+                response = requests.post(DISCORD_WEBHOOK_URL, json={"embeds": [embed]}, timeout=10)
             if response.status_code == 204:
                 logger.info("✅ Notificação Discord enviada com sucesso")
-            else:
-                logger.warning(f"⚠️ Falha ao enviar notificação Discord: {response.status_code}")
+                return True
+            logger.warning(f"⚠️ Falha ao enviar notificação Discord: {response.status_code}")
+            return False
                 
         except Exception as e:
             logger.error(f"❌ Erro ao enviar notificação Discord: {str(e)}")
+            return False
 
     def create_screenshots_folder(self):
-        """Cria pasta de screenshots se não existir"""
-        if not os.path.exists("screenshots"):
-            os.makedirs("screenshots")
-        return "screenshots"
+        """Cria pasta de screenshots do país se não existir"""
+        folder = os.path.join("screenshots", self.profile.source_country)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        return folder
 
     def setup_driver(self):
-        """Configura o driver do Selenium"""
+        """Configura o driver do Selenium (do pool compartilhado, se houver)"""
+        try:
+            if self.browser_pool:
+                self.driver = self.browser_pool.acquire(self.create_driver)
+            else:
+                self.driver = self.create_driver()
+            if self.driver is not None:
+                # Drivers reaproveitados do pool passam a contar comandos para este bot
+                self.driver.command_stats = self.command_stats
+                self.attach_browser()
+            return self.driver is not None
+        except Exception as e:
+            logger.error(f"❌ Erro ao obter navegador: {str(e)}")
+            return False
+
+    def create_driver(self):
+        """Cria um novo driver do Chrome (retorna None em caso de erro)"""
         logger.info("🔧 Iniciando configuração do driver Chrome...")
         
         chrome_options = Options()
@@ -128,28 +247,200 @@ class DroplAutomationBot:
         chrome_options.add_argument("--disable-web-security")
         chrome_options.add_argument("--disable-features=VizDisplayCompositor")
         chrome_options.add_argument("--memory-pressure-off")
-        chrome_options.add_argument("--max_old_space_size=4096")
+        # --max_old_space_size é opção do Node; no Chrome o heap do V8 é limitado via --js-flags
+        chrome_options.add_argument(f"--js-flags=--max-old-space-size={CHROME_JS_HEAP_MB}")
+        if self.recorder or GOVERNOR_NETWORK_LOG:
+            enable_performance_log(chrome_options)
         
         try:
             if is_railway():
-                # No Railway, usa o Chrome já instalado pelo Dockerfile
                 logger.info("🚂 Inicializando o driver Chrome no Railway...")
-                service = Service()
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
             else:
-                # Localmente, usa o webdriver_manager
                 logger.info("💻 Inicializando o driver Chrome localmente...")
-                self.driver = webdriver.Chrome(
-                    service=Service(ChromeDriverManager().install()),
-                    options=chrome_options
-                )
+            # chromedriver em cache pela versão do Chrome (ver driver_resolver.py); sem ele, o Selenium resolve
+            driver_path = resolve_chromedriver()
+            service = Service(executable_path=driver_path) if driver_path else Service()
+            driver = webdriver.Chrome(service=service, options=chrome_options)
                 
+            instrument_driver(driver, __file__)
+            driver.command_stats = self.command_stats
             logger.info("✅ Driver do Chrome iniciado com sucesso")
-            return True
+            return driver
         except Exception as e:
             logger.error(f"❌ Erro ao configurar o driver Chrome: {str(e)}")
             logger.error(traceback.format_exc())
+            return None
+
+    def attach_browser(self):
+        """(Re)cria o backend das operações de página (BROWSER_BACKEND) para a guia atual do driver"""
+        if self.browser:
+            self.browser.close()
+        self.browser = create_backend(self.driver, on_command=command_recorder(self.driver, __file__))
+        self.modal_watcher = ModalWatcher(self.browser)
+
+    def record_step(self, step):
+        """No modo gravação, guarda o DOM e as respostas de rede desta etapa"""
+        if self.recorder:
+            self.observe_network()
+            self.recorder.capture(self.driver, step)
+
+    def read_network_responses(self):
+        """
+        Lê o log de performance uma única vez (a leitura esvazia o buffer): as entradas vão
+        também para o gravador e as respostas do Dropi voltam para o governador
+        """
+        if not self.network_watcher or not self.driver:
+            return []
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            logger.debug(f"Log de performance indisponível: {str(e)}")
+            return []
+        if self.recorder and self.recorder.active:
+            self.recorder.collect_network(self.driver, entries)
+        return self.network_watcher.responses(entries)
+
+    def observe_network(self):
+        """Repassa ao governador o pior resultado das respostas desde a última leitura"""
+        responses = self.read_network_responses()
+        self.governor.record(*worst_outcome(responses))
+        return responses
+
+    def navigate(self, url):
+        """Navegação sob o governador de taxa; página de erro ou 429/5xx reduzem a taxa"""
+        self.observe_network()
+        with self.governor.slot("navigate"):
+            self.driver.get(url)
+        # Página nova volta à visão paginada padrão
+        self.all_entries_shown = False
+        # Observer do modal instalado uma vez por carregamento de página
+        if self.modal_watcher:
+            self.modal_watcher.install()
+        outcome, retry_after = worst_outcome(self.read_network_responses())
+        try:
+            if is_error_page(self.driver.execute_script(ERROR_PAGE_SCRIPT)):
+                logger.warning(f"🚦 Página de erro do servidor em {url}")
+                outcome = OUTCOME_ERROR_PAGE if outcome in (None, OUTCOME_OK, OUTCOME_SLOW) else outcome
+        except Exception as e:
+            logger.debug(f"Não foi possível verificar a página carregada: {str(e)}")
+        self.governor.record(outcome, retry_after)
+
+    def submit(self, action):
+        """
+        Envio sob o governador: executa action (clique/Enter) e mantém a vaga até a resposta de
+        escrita do Dropi chegar pelo log de rede (ou GOVERNOR_SUBMIT_TIMEOUT), no lugar de uma pausa fixa
+        """
+        self.observe_network()
+        with self.governor.slot("submit"):
+            action()
+            if not self.network_watcher:
+                time.sleep(2)
+                return
+            deadline = time.monotonic() + GOVERNOR_SUBMIT_TIMEOUT
+            while time.monotonic() < deadline:
+                responses = self.read_network_responses()
+                self.governor.record(*worst_outcome(responses))
+                if any(response["method"] in WRITE_METHODS for response in responses):
+                    return
+                time.sleep(0.25)
+            logger.debug("Resposta do envio não observada no log de rede dentro do timeout")
+
+    @contextmanager
+    def timed_step(self, step):
+        """Mede a etapa (dropi_step_duration_seconds) e marca os logs dentro dela com o campo step"""
+        with log_context(step=step), STEP_DURATION.time(step=step):
+            yield
+
+    def sample_chrome_memory(self):
+        """Mede a RSS (bytes) do chromedriver e de todos os processos do Chrome abaixo dele"""
+        if not self.driver:
+            return 0
+        total_rss = measure_process_tree_rss(driver_pid(self.driver))
+        if total_rss:
+            CHROME_RSS_BYTES.set(total_rss, country=self.profile.source_country)
+        return total_rss
+
+    def save_session_state(self):
+        """Guarda cookies e localStorage da sessão autenticada para reabrir em outro navegador"""
+        return {
+            "url": self.driver.current_url,
+            "cookies": self.driver.get_cookies(),
+            "local_storage": self.driver.execute_script(
+                "const data = {}; for (let i = 0; i < localStorage.length; i++) {"
+                " const key = localStorage.key(i); data[key] = localStorage.getItem(key); } return data;"
+            ) or {}
+        }
+
+    def restore_session_state(self, state):
+        """Reaplica cookies e localStorage no navegador atual; retorna True se continuou autenticado"""
+        self.navigate(self.profile.base_url)
+        for cookie in state["cookies"]:
+            if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+                cookie.pop("sameSite", None)
+            try:
+                self.driver.add_cookie(cookie)
+            except Exception as e:
+                logger.debug(f"Cookie {cookie.get('name')} não restaurado: {str(e)}")
+        self.driver.execute_script(
+            "for (const [key, value] of Object.entries(arguments[0])) { localStorage.setItem(key, value); }",
+            state["local_storage"]
+        )
+        self.navigate(self.profile.novelties_url)
+        time.sleep(3)
+        return self.verify_authentication()
+
+    def recycle_tab(self):
+        """Abre uma guia nova na mesma sessão e fecha a antiga (libera o renderer e o DOM acumulado)"""
+        old_handle = self.driver.current_window_handle
+        self.driver.switch_to.new_window('tab')
+        new_handle = self.driver.current_window_handle
+        self.driver.switch_to.window(old_handle)
+        self.driver.close()
+        self.driver.switch_to.window(new_handle)
+        self.attach_browser()
+        self.navigate(self.profile.novelties_url)
+        time.sleep(3)
+        return self.configure_entries_display()
+
+    def recycle_driver(self):
+        """Fecha o navegador e abre outro, reaproveitando a sessão salva (login só se ela não valer mais)"""
+        state = self.save_session_state()
+        old_driver = self.driver
+        if self.browser_pool:
+            self.driver = self.browser_pool.replace(old_driver, self.create_driver)
+        else:
+            try:
+                old_driver.quit()
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao fechar navegador: {str(e)}")
+            self.driver = self.create_driver()
+        if not self.driver:
+            raise Exception("Falha ao recriar o driver Chrome")
+        self.driver.command_stats = self.command_stats
+        self.attach_browser()
+        
+        if not self.restore_session_state(state):
+            logger.warning("🔐 Sessão salva não foi aceita - refazendo login")
+            if not self.login() or not self.navigate_to_novelties():
+                raise Exception("Falha ao refazer login após reciclar o navegador")
+        return self.configure_entries_display()
+
+    def recycle_if_needed(self):
+        """Entre novelties: recicla guia ou navegador quando o watchdog pedir. Retorna True se reciclou"""
+        kind, reason = self.watchdog.check()
+        if not kind:
             return False
+        logger.info(f"♻️ Reciclando {'navegador' if kind == RECYCLE_DRIVER else 'guia'}: {reason} ({self.watchdog.headroom_line()})")
+        with self.timed_step(f"recycle_{kind}"):
+            if kind == RECYCLE_DRIVER:
+                self.recycle_driver()
+            else:
+                self.recycle_tab()
+        self.recycles[kind] += 1
+        CHROME_RECYCLES.inc(kind=kind)
+        self.watchdog.recycled(kind)
+        logger.info(f"✅ Reciclagem concluída: {self.watchdog.headroom_line()}")
+        return True
 
     def verify_credentials_and_urls(self):
         """Verifica se as credenciais e URLs estão corretas"""
@@ -158,15 +449,7 @@ class DroplAutomationBot:
         logger.info(f"📧 Email: {self.email}")
         logger.info(f"🔑 Senha: {'*' * len(self.password)}")
         
-        test_urls = [
-            "https://app.dropi.cl",
-            "https://app.dropi.cl/auth/login", 
-            "https://app.dropi.cl/login",
-            "https://dropi.cl/login",
-            "https://app.dropi.co/auth/login",
-            "https://panel.dropi.cl/login",
-            "https://admin.dropi.cl/login"
-        ]
+        test_urls = self.profile.login_urls
         
         logger.info("🌐 URLs sendo testadas:")
         for url in test_urls:
@@ -188,7 +471,7 @@ class DroplAutomationBot:
             for url in login_urls:
                 try:
                     logger.info(f"🌐 Tentando URL: {url}")
-                    self.driver.get(url)
+                    self.navigate(url)
                     time.sleep(3)
                     
                     current_url = self.driver.current_url
@@ -345,10 +628,7 @@ class DroplAutomationBot:
             # Clica no botão de login
             logger.info("🎯 Tentando fazer login...")
             
-            try:
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", login_button)
-                time.sleep(1)
-                
+            def click_login():
                 try:
                     login_button.click()
                     logger.info("✅ Clique normal realizado")
@@ -359,12 +639,19 @@ class DroplAutomationBot:
                         logger.info("✅ Clique JavaScript realizado")
                     except Exception as e2:
                         logger.info(f"Clique JavaScript falhou: {str(e2)}")
-                        try:
-                            password_field.send_keys(Keys.ENTER)
-                            logger.info("✅ Enter enviado")
-                        except Exception as e3:
-                            logger.error(f"Todos os métodos de clique falharam: {str(e3)}")
-                            return False
+                        password_field.send_keys(Keys.ENTER)
+                        logger.info("✅ Enter enviado")
+            
+            try:
+                self.driver.execute_script("arguments[0].scrollIntoView(true);", login_button)
+                time.sleep(1)
+                
+                # Envio do formulário também passa pelo governador de taxa
+                try:
+                    self.submit(click_login)
+                except Exception as e3:
+                    logger.error(f"Todos os métodos de clique falharam: {str(e3)}")
+                    return False
             except Exception as e:
                 logger.error(f"❌ Erro ao clicar no botão de login: {str(e)}")
                 return False
@@ -406,14 +693,11 @@ class DroplAutomationBot:
             # Teste final: tenta navegar para o dashboard
             logger.info("🔍 Teste final: navegando para dashboard...")
             try:
-                dashboard_urls = [
-                    "https://app.dropi.cl/dashboard",
-                    "https://app.dropi.cl/dashboard/novelties"
-                ]
+                dashboard_urls = self.profile.dashboard_urls
                 
                 for dashboard_url in dashboard_urls:
                     try:
-                        self.driver.get(dashboard_url)
+                        self.navigate(dashboard_url)
                         time.sleep(3)
                         final_url = self.driver.current_url
                         
@@ -456,7 +740,7 @@ class DroplAutomationBot:
         """Navega até a página de novelties"""
         try:
             logger.info("🧭 Navegando diretamente para a página de novelties...")
-            self.driver.get("https://app.dropi.cl/dashboard/novelties")
+            self.navigate(self.profile.novelties_url)
             time.sleep(5)
             
             current_url = self.driver.current_url
@@ -487,7 +771,7 @@ class DroplAutomationBot:
             current_url = self.driver.current_url
             if "novelties" not in current_url:
                 logger.warning(f"⚠️ Não está na página de novelties. URL atual: {current_url}")
-                self.driver.get("https://app.dropi.cl/dashboard/novelties")
+                self.navigate(self.profile.novelties_url)
                 time.sleep(5)
             
             # Aguarda a página carregar completamente (especialmente importante localmente)
@@ -558,6 +842,7 @@ class DroplAutomationBot:
                     if entries_found:
                         logger.info("🎯 Configurado para exibir 1000 entradas")
                         self.found_pagination = True
+                        self.all_entries_shown = True
                         time.sleep(8)  # Aguarda mais tempo para recarregar
                         
                         try:
@@ -594,13 +879,13 @@ class DroplAutomationBot:
             
             # Procura pelo cabeçalho "ORDERS TO:"
             try:
-                header_info = self.driver.find_elements(By.XPATH, "//*[contains(text(), 'ORDERS TO:')]")
+                header_info = self.browser.find_all("//*[contains(text(), 'ORDERS TO:')]")
                 
                 if header_info:
                     for element in header_info:
                         try:
-                            parent = element.find_element(By.XPATH, "./..")
-                            parent_text = parent.text
+                            parent = self.browser.find_all("./..", element)[0]
+                            parent_text = self.browser.text(parent)
                             
                             lines = parent_text.split('\n')
                             if len(lines) > 1:
@@ -618,9 +903,9 @@ class DroplAutomationBot:
             
             # Procura pelo campo de telefone
             try:
-                phone_elements = self.driver.find_elements(By.XPATH, "//*[contains(text(), 'Telf.')]")
+                phone_elements = self.browser.find_all("//*[contains(text(), 'Telf.')]")
                 for element in phone_elements:
-                    element_text = element.text
+                    element_text = self.browser.text(element)
                     if "Telf." in element_text:
                         phone_parts = element_text.split("Telf.")
                         if len(phone_parts) > 1:
@@ -648,69 +933,17 @@ class DroplAutomationBot:
                 "phone": "Não informado"
             }
 
-    def parse_chilean_address(self, address):
-        """Extrai componentes específicos de um endereço chileno"""
-        try:
-            logger.info(f"🏠 Analisando endereço chileno: {address}")
-            
-            components = {
-                "calle": "",
-                "numero": "",
-                "comuna": "",
-                "region": ""
-            }
-            
-            # Extrai número
-            numero_match = re.search(r'\d+', address)
-            if numero_match:
-                components["numero"] = numero_match.group(0)
-            else:
-                components["numero"] = "1"
-            
-            # Extrai calle
-            dash_index = address.find('-')
-            if dash_index != -1:
-                components["calle"] = address[:dash_index].strip()
-            else:
-                if numero_match:
-                    numero = components["numero"]
-                    calle_index = address.find(numero)
-                    if calle_index > 0:
-                        components["calle"] = address[:calle_index].strip()
-                else:
-                    components["calle"] = address
-            
-            # Extrai comuna e região
-            last_comma_index = address.rfind(',')
-            
-            if last_comma_index != -1:
-                comuna_region_part = address[last_comma_index+1:].strip()
-                
-                if "BIO - BIO" in comuna_region_part.upper():
-                    bio_index = comuna_region_part.upper().find("BIO - BIO")
-                    dash_before_bio = comuna_region_part[:bio_index].rfind('-')
-                    
-                    if dash_before_bio != -1:
-                        components["comuna"] = comuna_region_part[:dash_before_bio].strip()
-                        components["region"] = "BIO - BIO"
-                else:
-                    last_hyphen_index = comuna_region_part.rfind('-')
-                    
-                    if last_hyphen_index != -1:
-                        components["comuna"] = comuna_region_part[:last_hyphen_index].strip()
-                        components["region"] = comuna_region_part[last_hyphen_index+1:].strip()
-                    else:
-                        components["comuna"] = comuna_region_part.strip()
-            
-            return components
-        except Exception as e:
-            logger.error(f"❌ Erro ao analisar endereço chileno: {str(e)}")
-            return {
-                "calle": "",
-                "numero": "",
-                "comuna": "",
-                "region": ""
-            }
+    def parse_address(self, address):
+        """Extrai componentes do endereço com o parser do país do perfil"""
+        return self.profile.address_parser(address)
+
+    def classify_incident(self, form_text):
+        """Retorna (tipo, mensagem) da primeira regra que corresponde ao texto da incidência"""
+        text = form_text.upper().strip()
+        for incident_type, phrases, message in self.profile.incident_rules:
+            if any(phrase in text for phrase in phrases):
+                return incident_type, message
+        return INCIDENT_UNKNOWN, ""
 
     def generate_automatic_message(self, form_text):
         """Gera mensagens automáticas com base no texto da incidência"""
@@ -718,24 +951,11 @@ class DroplAutomationBot:
             form_text = form_text.upper().strip()
             logger.info(f"🤖 Analisando texto para mensagem automática: '{form_text[:100]}...'")
             
-            if any(phrase in form_text for phrase in ["CLIENTE AUSENTE", "NADIE EN CASA"]):
-                message = "Entramos en contacto con el cliente y él se disculpó y mencionó que estará en casa para recibir el producto en este próximo intento."
-                logger.info("✅ Resposta selecionada: CLIENTE AUSENTE")
-                return message
-            
-            if "PROBLEMA COBRO" in form_text:
-                message = "En llamada telefónica, el cliente afirmó que estará con dinero suficiente para comprar el producto, por favor intenten nuevamente."
-                logger.info("✅ Resposta selecionada: PROBLEMA COBRO")
-                return message
+            incident_type, message = self.classify_incident(form_text)
+            self.current_incident_type = incident_type
             
-            if any(phrase in form_text for phrase in ["DIRECCIÓN INCORRECTA", "DIRECCION INCORRECTA", "FALTAN DATOS", "INUBICABLE", "COMUNA ERRADA", "CAMBIO DE DOMICILIO"]):
-                message = "En llamada telefónica, el cliente rectificó sus datos para que la entrega suceda de forma más asertiva."
-                logger.info("✅ Resposta selecionada: PROBLEMA DE ENDEREÇO")
-                return message
-            
-            if any(phrase in form_text for phrase in ["RECHAZA", "RECHAZADA"]):
-                message = "En llamada telefónica, el cliente afirma que quiere el producto y mencionó que no fue buscado por la transportadora. Por lo tanto, por favor envíen el producto hasta el cliente."
-                logger.info("✅ Resposta selecionada: RECHAZO DE ENTREGA")
+            if message:
+                logger.info(f"✅ Resposta selecionada: {incident_type}")
                 return message
             
             logger.warning("⚠️ Nenhuma condição conhecida encontrada na incidência")
@@ -764,57 +984,83 @@ class DroplAutomationBot:
         except Exception as e:
             logger.error(f"❌ Erro ao verificar e fechar guias: {str(e)}")
 
-    def get_available_novelty_rows(self):
+    def get_pending_snapshot(self):
         """
-        Obtém todas as linhas que têm botão Save disponível
+        Retorna as linhas pendentes da tabela em uma única ida ao navegador:
+        lista de dicts com element, index, order_id e cells
         """
         try:
-            # Aguarda tabela estar presente
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, "//table"))
-            )
-            
-            # Procura por linhas com botão Save
-            rows_with_save = []
-            
-            # Múltiplos seletores para encontrar linhas
-            row_selectors = [
-                "//table/tbody/tr[.//button[contains(@class, 'btn-success')]]",
-                "//table//tr[.//button[contains(text(), 'Save')]]",
-                "//table//tr[.//button[contains(@class, 'btn-success') and contains(text(), 'Save')]]"
-            ]
-            
-            for selector in row_selectors:
-                try:
-                    found_rows = self.driver.find_elements(By.XPATH, selector)
-                    if found_rows:
-                        rows_with_save = found_rows
-                        logger.info(f"✅ Encontradas {len(found_rows)} linhas com botão Save usando: {selector}")
-                        break
-                except Exception as e:
-                    logger.debug(f"Seletor falhou: {selector} - {str(e)}")
-                    continue
-            
-            # Filtra apenas linhas visíveis
-            visible_rows = []
-            for row in rows_with_save:
-                try:
-                    if row.is_displayed():
-                        # Verifica se realmente tem botão Save visível
-                        save_buttons = row.find_elements(By.XPATH, ".//button[contains(@class, 'btn-success')]")
-                        if save_buttons and any(btn.is_displayed() for btn in save_buttons):
-                            visible_rows.append(row)
-                except Exception as e:
-                    logger.debug(f"Erro ao verificar visibilidade da linha: {str(e)}")
-                    continue
-            
-            logger.info(f"📊 Linhas visíveis com botão Save: {len(visible_rows)}")
-            return visible_rows
-            
+            if self.browser.wait_for_any(["//table"], 10) is None:
+                raise TimeoutException("tabela não encontrada")
+            # Linhas de snapshots anteriores não são mais usadas
+            self.browser.release_handles()
+            snapshot = self.browser.evaluate(PENDING_ROWS_SCRIPT) or []
+            for row in snapshot:
+                # Sem ID na primeira coluna: usa o texto da linha como chave
+                if not row["order_id"]:
+                    row["order_id"] = " ".join(row["cells"])[:80]
+            logger.info(f"📊 Snapshot: {len(snapshot)} novelties pendentes")
+            return snapshot
         except Exception as e:
-            logger.error(f"❌ Erro ao obter linhas disponíveis: {str(e)}")
+            logger.error(f"❌ Erro ao obter snapshot das novelties: {str(e)}")
             return []
 
+    def compute_pending_fingerprint(self, attempted_ids=None):
+        """
+        Hash das novelties pendentes com todas as entradas visíveis (1000, como em
+        process_all_novelties), ver pending_fingerprint.
+        Retorna None se não for possível calcular, se a tabela continuar paginada
+        (linhas fora da primeira página não entrariam no hash e a execução seria pulada por engano)
+        ou, com attempted_ids, se há pendentes que esta execução não chegou a tentar
+        """
+        try:
+            if not self.all_entries_shown:
+                self.configure_entries_display()
+            if not self.all_entries_shown:
+                logger.warning("⚠️ Tabela não exibe todas as entradas - fingerprint não calculado")
+                return None
+            
+            snapshot = self.get_pending_snapshot()
+            fingerprint = pending_fingerprint(snapshot, self.classify_incident, attempted_ids)
+            if not fingerprint:
+                logger.info("🔏 Pendentes ainda não tentadas nesta execução - fingerprint não gravado")
+                return None
+            logger.info(f"🔏 Fingerprint das pendentes: {fingerprint[:12]} ({len(snapshot)} linhas)")
+            return fingerprint
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível calcular fingerprint: {str(e)}")
+            return None
+
+    def should_skip_run(self):
+        """Verifica se as pendentes são as mesmas que a última execução já tentou"""
+        if not FINGERPRINT_SKIP_ENABLED or self.recorder:
+            return False
+        self.start_fingerprint = self.compute_pending_fingerprint()
+        if not self.start_fingerprint:
+            return False
+        return self.start_fingerprint == get_last_fingerprint(self.profile.source_country)
+
+    def record_noop_run(self):
+        """Registra a execução pulada no histórico e avisa o Discord de forma resumida"""
+        execution_time = (datetime.datetime.now() - self.execution_start_time).total_seconds()
+        save_execution_result(
+            country=self.profile.source_country,
+            total_processed=0,
+            successful=0,
+            failed=0,
+            execution_time=execution_time,
+            status="noop",
+            fingerprint=self.start_fingerprint
+        )
+        skipped_runs = count_skipped_runs(self.profile.source_country)
+        logger.info(f"⏭️ Nenhuma mudança desde a última execução completa - execução pulada ({skipped_runs} seguidas)")
+        self.send_discord_notification(
+            f"⏭️ **Execução pulada - sem mudanças**\n\n"
+            f"• 🔏 Pendentes idênticas à última execução completa\n"
+            f"• 🔁 Execuções puladas seguidas: **{skipped_runs}**\n"
+            f"• ⏱️ Tempo: **{execution_time:.0f}s**"
+        )
+
     def process_single_novelty(self, row_element, iteration_number):
         """
         Processa uma única novelty
@@ -824,99 +1070,81 @@ class DroplAutomationBot:
         """
         try:
             logger.info(f"🎯 Processando novelty (iteração {iteration_number})")
+            self.last_failure_reason = None
             
             # Rola até a linha
-            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", row_element)
+            self.browser.scroll_into_view(row_element)
             time.sleep(1)
             
             # Obtém ID da linha para logs
             try:
-                row_cells = row_element.find_elements(By.TAG_NAME, "td")
-                row_id = row_cells[0].text if row_cells else f"Iteração {iteration_number}"
+                row_cells = self.browser.find_all(".//td", row_element)
+                row_id = self.browser.text(row_cells[0]) if row_cells else f"Iteração {iteration_number}"
             except:
                 row_id = f"Iteração {iteration_number}"
             
             logger.info(f"📋 Processando: {row_id}")
             
             # Encontra botão Save na linha
-            save_buttons = row_element.find_elements(By.XPATH, ".//button[contains(@class, 'btn-success')]")
+            save_buttons = self.browser.find_all(".//button[contains(@class, 'btn-success')]", row_element)
             
             if not save_buttons:
                 logger.error("❌ Botão Save não encontrado na linha")
+                self.last_failure_reason = FAILURE_SAVE_BUTTON_MISSING
                 return False
             
             save_button = save_buttons[0]
             
             # Clica no Save
             try:
-                self.driver.execute_script("arguments[0].click();", save_button)
+                self.browser.click(save_button)
                 logger.info("✅ Botão Save clicado")
             except Exception as e:
                 logger.error(f"❌ Erro ao clicar no Save: {str(e)}")
+                self.last_failure_reason = FAILURE_SAVE_BUTTON_MISSING
                 return False
             
-            # Aguarda modal aparecer
-            time.sleep(5)
-            
-            # Verifica se modal apareceu
-            modal_appeared = False
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.any_of(
-                        EC.presence_of_element_located((By.XPATH, "//div[contains(@class, 'modal')]")),
-                        EC.presence_of_element_located((By.XPATH, "//button[contains(text(), 'Yes')]")),
-                        EC.presence_of_element_located((By.XPATH, "//button[contains(text(), 'Sim')]"))
-                    )
-                )
-                modal_appeared = True
-                logger.info("✅ Modal detectado")
-            except TimeoutException:
+            # Aguarda o modal (transições registradas pelo MutationObserver da página)
+            modal_state = self.modal_watcher.wait_for(MODAL_VISIBLE_STATES, MODAL_OPEN_TIMEOUT)
+            if modal_state not in MODAL_VISIBLE_STATES:
                 logger.error("❌ Modal não apareceu - item pode já estar processado")
+                self.last_failure_reason = FAILURE_MODAL_NOT_SHOWN
                 return False
+            logger.info("✅ Modal detectado")
+            self.record_step("modal")
             
-            if not modal_appeared:
-                return False
-            
-            # Clica em Yes/Sim
-            yes_clicked = False
-            for text in ["Yes", "Sim", "YES", "SIM"]:
-                try:
-                    yes_buttons = self.driver.find_elements(By.XPATH, f"//button[contains(text(), '{text}')]")
-                    for button in yes_buttons:
-                        if button.is_displayed():
-                            self.driver.execute_script("arguments[0].click();", button)
-                            logger.info(f"✅ Clicado em '{text}'")
-                            yes_clicked = True
-                            break
-                    if yes_clicked:
-                        break
-                except:
-                    continue
+            # Clica em Yes/Sim (o botão pode aparecer logo depois do modal)
+            if modal_state != MODAL_CONFIRM:
+                self.modal_watcher.wait_for([MODAL_CONFIRM], MODAL_CONFIRM_TIMEOUT)
+            try:
+                confirm_text = self.modal_watcher.click_confirm()
+            except Exception as e:
+                logger.debug(f"Erro ao clicar em Yes/Sim: {str(e)}")
+                confirm_text = None
             
-            if not yes_clicked:
+            if not confirm_text:
                 logger.error("❌ Não foi possível clicar em Yes/Sim")
+                self.last_failure_reason = FAILURE_YES_NOT_CLICKED
+                self.dismiss_open_modal()
                 return False
+            logger.info(f"✅ Clicado em '{confirm_text}'")
             
-            time.sleep(5)
+            # Formulário visível (ou o modal fechou); no pior caso segue após o timeout
+            self.modal_watcher.wait_for([MODAL_FORM, MODAL_CLOSED], MODAL_FORM_TIMEOUT)
+            self.record_step("form")
             
             # Extrai informações e preenche formulário
             customer_info = self.extract_customer_info()
             
             # Processa formulário
-            form_success = self.fill_and_submit_form(customer_info)
+            with self.timed_step("fill_form"):
+                form_success = self.fill_and_submit_form(customer_info)
             
             if form_success:
-                # Aguarda finalização
-                time.sleep(8)
-                
-                # Verifica se modal fechou (sucesso)
-                modal_closed = True
-                try:
-                    modal_elements = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'modal') and contains(@style, 'display: block')]")
-                    if modal_elements:
-                        modal_closed = False
-                except:
-                    pass
+                # Aguarda o modal fechar (sucesso); página sem resposta conta como fechado
+                modal_state = self.modal_watcher.wait_for([MODAL_CLOSED], MODAL_CLOSE_TIMEOUT)
+                modal_closed = modal_state in (MODAL_CLOSED, None)
+                self.record_step("after_save")
                 
                 # Fecha guias extras
                 self.check_and_close_tabs()
@@ -926,16 +1154,85 @@ class DroplAutomationBot:
                     return True
                 else:
                     logger.warning(f"⚠️ Modal ainda aberto para {row_id}")
+                    self.last_failure_reason = FAILURE_MODAL_STILL_OPEN
+                    self.dismiss_open_modal()
                     return False
             else:
                 logger.error(f"❌ Falha no formulário para {row_id}")
+                self.last_failure_reason = self.last_failure_reason or FAILURE_SAVE_FAILED
+                self.dismiss_open_modal()
                 return False
             
         except Exception as e:
             logger.error(f"❌ Erro ao processar novelty: {str(e)}")
             logger.error(traceback.format_exc())
+            self.last_failure_reason = FAILURE_UNEXPECTED
+            self.dismiss_open_modal()
             return False
 
+    def dismiss_open_modal(self):
+        """
+        Fecha um modal que ficou aberto após uma falha, para que as próximas linhas
+        da tabela continuem clicáveis
+        """
+        try:
+            closed = self.browser.evaluate("""
+                const modals = Array.from(document.querySelectorAll('.modal')).filter(m => m.offsetParent !== null);
+                let closed = 0;
+                for (const modal of modals) {
+                    const button = modal.querySelector('button.close, [data-dismiss="modal"], [data-bs-dismiss="modal"]');
+                    if (button) { button.click(); closed++; }
+                }
+                return closed;
+            """)
+            if not closed:
+                self.driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
+            self.modal_watcher.wait_for([MODAL_CLOSED], 1)
+            self.check_and_close_tabs()
+        except Exception as e:
+            logger.debug(f"Erro ao fechar modal: {str(e)}")
+
+    def capture_diagnostic_snapshot(self, reason):
+        """
+        Salva screenshot, HTML da página e estado da execução quando o circuit breaker abre
+        Retorna a pasta do snapshot (ou None se não foi possível salvar)
+        """
+        try:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            folder = os.path.join(self.create_screenshots_folder(), f"diagnostico_{timestamp}")
+            os.makedirs(folder, exist_ok=True)
+            
+            info = {
+                "reason": reason,
+                "country": self.profile.source_country,
+                "timestamp": timestamp,
+                "breaker": self.breaker.state(),
+                "success_count": self.success_count,
+                "failures_by_reason": self.retry_queue.reason_counts(),
+                "pending_retries": {
+                    order_id: {"attempts": entry["attempts"], "reasons": entry["reasons"]}
+                    for order_id, entry in self.retry_queue.unresolved().items()
+                }
+            }
+            
+            try:
+                info["url"] = self.driver.current_url
+                self.browser.screenshot(os.path.join(folder, "page.png"))
+                with open(os.path.join(folder, "page.html"), 'w', encoding='utf-8') as f:
+                    f.write(self.driver.page_source)
+            except Exception as e:
+                info["browser_error"] = str(e)
+            
+            with open(os.path.join(folder, "state.json"), 'w', encoding='utf-8') as f:
+                json.dump(info, f, ensure_ascii=False, indent=2, default=str)
+            
+            self.diagnostic_path = folder
+            logger.info(f"🩺 Snapshot de diagnóstico salvo: {folder}")
+            return folder
+        except Exception as e:
+            logger.error(f"❌ Erro ao salvar snapshot de diagnóstico: {str(e)}")
+            return None
+
     def fill_and_submit_form(self, customer_info):
         """
         Preenche e submete o formulário da novelty
@@ -943,7 +1240,7 @@ class DroplAutomationBot:
         try:
             # Analisa texto para mensagem automática
             try:
-                page_text = self.driver.find_element(By.TAG_NAME, "body").text
+                page_text = self.browser.evaluate("return document.body.innerText;") or ""
                 automatic_message = self.generate_automatic_message(page_text)
                 if automatic_message:
                     customer_info["automatic_message"] = automatic_message
@@ -953,21 +1250,21 @@ class DroplAutomationBot:
             # Procura formulário
             form_modal = None
             try:
-                form_modal = WebDriverWait(self.driver, 10).until(
-                    EC.visibility_of_element_located((By.XPATH, "//div[contains(@class, 'modal-body')]"))
+                form_modal = (
+                    self.browser.wait_for_any(["//div[contains(@class, 'modal-body')]"], 10, visible=True)
+                    or self.browser.find_all("//body")[0]
                 )
             except:
-                try:
-                    form_modal = self.driver.find_element(By.TAG_NAME, "body")
-                except:
-                    logger.error("❌ Formulário não encontrado")
-                    return False
+                logger.error("❌ Formulário não encontrado")
+                self.last_failure_reason = FAILURE_NO_FIELDS
+                return False
             
             if not form_modal:
+                self.last_failure_reason = FAILURE_NO_FIELDS
                 return False
             
             # Preenche campos
-            address_components = self.parse_chilean_address(customer_info["address"])
+            address_components = self.parse_address(customer_info["address"])
             
             fields_to_fill = [
                 (["Datos adicionales a la dirección", "Datos adicionales"], customer_info["address"]),
@@ -994,27 +1291,40 @@ class DroplAutomationBot:
                     return True
                 else:
                     logger.error("❌ Falha ao salvar formulário")
+                    self.last_failure_reason = FAILURE_SAVE_FAILED
                     return False
             else:
                 logger.error("❌ Nenhum campo preenchido")
+                self.last_failure_reason = FAILURE_NO_FIELDS
                 return False
             
         except Exception as e:
             logger.error(f"❌ Erro no formulário: {str(e)}")
             return False
 
-    def process_all_novelties(self):
+    def process_all_novelties(self, target_ids=None, controller=None):
         """
-        NOVA VERSÃO: Processa novelties dinamicamente
-        Sempre pega a primeira linha disponível com botão Save
+        Processa novelties dinamicamente, em ordem de prioridade
+        A cada iteração lê o snapshot de pendentes, ordena pelo NoveltyScheduler
+        (prazo, tipo de incidência, idade) e processa a primeira disponível.
+        Falhas vão para a RetryQueue: o pedido sai da fila durante o backoff do motivo
+        e volta depois, enquanto as demais linhas seguem sendo processadas.
+        Continua enquanto o RunController estimar que a próxima novelty cabe no orçamento
+        target_ids: se informado, processa apenas esses pedidos
+        controller: RunController com o prazo (padrão: antes do próximo horário do cron)
         """
         try:
-            logger.info(f"🔄 Iniciando processamento dinâmico de novelties...")
+            logger.info(f"🔄 Iniciando processamento de novelties por prioridade...")
             
-            max_iterations = 100  # Limite de segurança
             iteration = 0
-            
-            while iteration < max_iterations:
+            done_ids = set()
+            pending = []
+            retry_queue = self.retry_queue = RetryQueue()
+            breaker = self.breaker = CircuitBreaker()
+            controller = self.run_controller = controller or RunController.for_run(self.run_started_at)
+            self.watchdog.start()
+            
+            while controller.can_start_next():
                 iteration += 1
                 
                 logger.info(f"🔄 Iteração {iteration} - Buscando novelties disponíveis...")
@@ -1022,40 +1332,105 @@ class DroplAutomationBot:
                 # Aguarda página estabilizar
                 time.sleep(3)
                 
-                # Recarrega todas as linhas da tabela
-                available_rows = self.get_available_novelty_rows()
+                # Recarrega as pendentes e ordena por prioridade
+                pending = [
+                    row for row in self.get_pending_snapshot()
+                    if row["order_id"] not in done_ids
+                    and (target_ids is None or row["order_id"] in target_ids)
+                ]
+                blocked_ids = retry_queue.blocked_ids()
+                candidates = [row for row in pending if row["order_id"] not in blocked_ids]
                 
-                if not available_rows:
-                    logger.info("✅ Nenhuma novelty disponível para processar - Finalizando")
-                    break
+                if not candidates:
+                    wait = retry_queue.seconds_until_next_retry({row["order_id"] for row in pending})
+                    if wait is None:
+                        logger.info("✅ Nenhuma novelty disponível para processar - Finalizando")
+                        break
+                    if not controller.can_wait(wait):
+                        break
+                    logger.info(f"⏳ Só restam pedidos em backoff - aguardando {wait:.0f}s pela próxima retentativa")
+                    time.sleep(wait)
+                    continue
                 
-                logger.info(f"📋 Encontradas {len(available_rows)} novelties disponíveis")
+                # Memória alta ou muitas novelties na mesma guia/navegador: recicla e relê a tabela
+                if self.recycle_if_needed():
+                    continue
                 
-                # Sempre processa a PRIMEIRA linha disponível
-                success = self.process_single_novelty(available_rows[0], iteration)
+                ranked = self.scheduler.rank(candidates)
+                row = ranked[0]
+                order_id = row["order_id"]
+                
+                logger.info(
+                    f"📋 {len(ranked)} novelties disponíveis - próxima: {order_id} "
+                    f"(P{row['priority']}, {row['incident_type']}, {row['age_hours']:.0f}h)"
+                )
+                
+                self.current_incident_type = INCIDENT_UNKNOWN
+                attempt_start = time.monotonic()
+                with log_context(order_id=order_id), self.timed_step("process_novelty"):
+                    success = self.process_single_novelty(row["element"], iteration)
+                if self.recorder:
+                    self.recorder.novelty_done()
+                attempt_duration = time.monotonic() - attempt_start
+                controller.record(attempt_duration)
+                self.watchdog.record_novelty()
                 
                 if success:
+                    done_ids.add(order_id)
+                    retry_queue.record_success(order_id)
+                    self.scheduler.record(row, True)
                     self.success_count += 1
+                    NOVELTIES_PROCESSED.inc(country=self.profile.source_country, incident_type=self.current_incident_type)
                     logger.info(f"✅ Novelty {iteration} processada com sucesso!")
                 else:
-                    self.failed_count += 1
-                    self.failed_items.append({
-                        "id": f"Iteração {iteration}",
-                        "error": "Falha no processamento"
-                    })
-                    logger.error(f"❌ Falha ao processar novelty {iteration}")
+                    reason = self.last_failure_reason or FAILURE_UNEXPECTED
+                    NOVELTY_RETRIES.inc(country=self.profile.source_country, reason=reason)
+                    retry_queue.record_failure(order_id, reason, dict(row, incident_type_processed=self.current_incident_type))
+                    logger.error(f"❌ Falha ao processar novelty {iteration}: {FAILURE_DESCRIPTIONS.get(reason, reason)}")
                 
-                # Pausa entre processamentos
-                time.sleep(2)
+                # Execução degradada (falhas seguidas, taxa de falha ou lentidão): para cedo
+                if breaker.record(success, attempt_duration):
+                    self.run_status = "degraded"
+                    self.capture_diagnostic_snapshot(breaker.reason)
+                    break
+                
+                # Sem pausa fixa entre processamentos: o governador de taxa espaça os envios
             
-            if iteration >= max_iterations:
-                logger.warning("⚠️ Limite máximo de iterações atingido")
+            # Pedidos tentados nesta execução (com sucesso ou falha em todas as tentativas)
+            self.attempted_ids = done_ids | set(retry_queue.unresolved())
+            
+            # Backlog que ficou para a próxima execução e tempo projetado para zerá-lo
+            self.remaining_backlog = len([row for row in pending if row["order_id"] not in done_ids])
+            if self.remaining_backlog:
+                logger.info(
+                    f"📦 Backlog restante: {self.remaining_backlog} novelties "
+                    f"(~{format_duration(controller.projected_clear_seconds(self.remaining_backlog))} para zerar)"
+                )
+            
+            # Pedidos que não tiveram sucesso em nenhuma tentativa contam como falha uma única vez
+            for order_id, entry in retry_queue.unresolved().items():
+                reason = entry["last_reason"]
+                self.failed_count += 1
+                NOVELTIES_FAILED.inc(country=self.profile.source_country, incident_type=entry["row"]["incident_type_processed"])
+                self.scheduler.record(entry["row"], False)
+                self.failed_items.append({
+                    "id": order_id,
+                    "error": f"{FAILURE_DESCRIPTIONS.get(reason, reason)} ({entry['attempts']} tentativas)"
+                })
             
             logger.info(f"🎯 Processamento concluído: {self.success_count} sucessos, {self.failed_count} falhas")
+            for line in self.scheduler.summary_lines():
+                logger.info(f"  • {line}")
+            for reason, count in sorted(retry_queue.reason_counts().items()):
+                logger.info(f"  • 🔁 {FAILURE_DESCRIPTIONS.get(reason, reason)}: {count} tentativas com falha")
             
         except Exception as e:
             logger.error(f"❌ Erro no processamento de novelties: {str(e)}")
             logger.error(traceback.format_exc())
+        finally:
+            self.watchdog.stop()
+            if self.watchdog.peak_rss:
+                logger.info(f"🧠 Memória do Chrome: {self.watchdog.headroom_line()}")
 
     def fill_field_by_label(self, form_modal, label_texts, value):
         """Preenche um campo específico do formulário"""
@@ -1073,22 +1448,15 @@ class DroplAutomationBot:
                     
                     for selector in input_selectors:
                         try:
-                            input_fields = self.driver.find_elements(By.XPATH, selector)
+                            input_fields = self.browser.find_visible(selector)
                             for input_field in input_fields:
-                                if input_field.is_displayed():
-                                    # Preenche o campo
-                                    self.driver.execute_script("arguments[0].scrollIntoView(true);", input_field)
-                                    time.sleep(0.5)
-                                    self.driver.execute_script("arguments[0].click();", input_field)
-                                    self.driver.execute_script("arguments[0].value = '';", input_field)
-                                    self.driver.execute_script(f"arguments[0].value = '{value}';", input_field)
-                                    
-                                    # Dispara eventos
-                                    for event in ["input", "change", "blur"]:
-                                        self.driver.execute_script(f"arguments[0].dispatchEvent(new Event('{event}'));", input_field)
-                                    
-                                    logger.info(f"✅ Campo '{label_text}' preenchido com sucesso")
-                                    return True
+                                # Preenche o campo (clique, limpeza, valor e eventos input/change/blur)
+                                self.browser.scroll_into_view(input_field, block="start")
+                                time.sleep(0.5)
+                                self.browser.fill(input_field, value)
+                                
+                                logger.info(f"✅ Campo '{label_text}' preenchido com sucesso")
+                                return True
                         except Exception as e:
                             continue
                 except Exception as e:
@@ -1112,23 +1480,22 @@ class DroplAutomationBot:
             ]
             
             for pattern in save_patterns:
-                save_buttons = self.driver.find_elements(By.XPATH, f"//button[contains(text(), '{pattern}')]")
+                save_buttons = self.browser.find_visible(f"//button[contains(text(), '{pattern}')]")
                 for button in save_buttons:
-                    if button.is_displayed():
-                        try:
-                            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", button)
-                            time.sleep(1)
-                            self.driver.execute_script("arguments[0].click();", button)
-                            logger.info(f"✅ Clicado no botão '{pattern}'")
-                            time.sleep(2)
-                            return True
-                        except:
-                            continue
+                    try:
+                        self.browser.scroll_into_view(button)
+                        time.sleep(1)
+                        # Vaga do governador até a resposta do envio (sem pausa fixa após o clique)
+                        self.submit(lambda: self.browser.click(button))
+                        logger.info(f"✅ Clicado no botão '{pattern}'")
+                        return True
+                    except:
+                        continue
             
             # Último recurso: Enter
             try:
                 active_element = self.driver.switch_to.active_element
-                active_element.send_keys(Keys.ENTER)
+                self.submit(lambda: active_element.send_keys(Keys.ENTER))
                 logger.info("✅ Tecla Enter enviada")
                 return True
             except:
@@ -1140,11 +1507,34 @@ class DroplAutomationBot:
             return False
 
     def run_automation(self):
+        """
+        Executa uma rodada completa; com PROFILE_RUNS ativo, dentro do perfilador
+        (artefatos em profiles/<run_id>.*)
+        """
+        self.run_id = new_run_id()
+        try:
+            if not PROFILE_MODE:
+                self.execute_run()
+                return
+            
+            with RunProfiler(self.run_id) as profiler:
+                self.profiler = profiler
+                try:
+                    self.execute_run()
+                finally:
+                    self.profiler = None
+        finally:
+            # No cron nenhum processo fica vivo para liberar o resumo: cada execução libera ao sair se venceu
+            self.discord_digest.flush_if_due()
+
+    def execute_run(self):
         """
         VERSÃO CORRIGIDA - Executa automação com processamento dinâmico
         """
         try:
             self.execution_start_time = datetime.datetime.now()
+            self.run_started_at = time.monotonic()
+            set_log_context(run_id=self.run_id, country=self.profile.source_country)
             
             # Notificação inicial
             timezone_info = datetime.timezone(datetime.timedelta(hours=-3))
@@ -1158,31 +1548,47 @@ class DroplAutomationBot:
             
             # Setup do driver
             logger.info("🔧 PASSO 1: Configurando driver...")
-            if not self.setup_driver():
-                raise Exception("Falha ao configurar o driver Chrome")
+            with self.timed_step("setup_driver"):
+                if not self.setup_driver():
+                    raise Exception("Falha ao configurar o driver Chrome")
             logger.info("✅ Driver configurado com sucesso")
             
             # Login
             logger.info("🔐 PASSO 2: Fazendo login...")
-            if not self.login():
-                raise Exception("Falha no login")
+            with self.timed_step("login"):
+                if not self.login():
+                    raise Exception("Falha no login")
             logger.info("✅ Login realizado com sucesso")
             
             # Navegar para novelties
             logger.info("🧭 PASSO 3: Navegando para novelties...")
-            if not self.navigate_to_novelties():
-                raise Exception("Falha ao navegar até Novelties")
+            with self.timed_step("navigate"):
+                if not self.navigate_to_novelties():
+                    raise Exception("Falha ao navegar até Novelties")
             logger.info("✅ Navegação para novelties concluída")
             
+            # Pendentes iguais às da última execução completa: nada a fazer
+            with self.timed_step("fingerprint"):
+                skip_run = self.should_skip_run()
+            if skip_run:
+                self.record_noop_run()
+                return
+            
             # Configurar exibição
             logger.info("⚙️ PASSO 4: Configurando exibição de entradas...")
-            if not self.configure_entries_display():
-                raise Exception("Falha ao configurar exibição de entradas")
+            with self.timed_step("configure_entries"):
+                # A verificação de fingerprint já pode ter exibido as 1000 entradas
+                if not (self.all_entries_shown or self.configure_entries_display()):
+                    raise Exception("Falha ao configurar exibição de entradas")
             logger.info("✅ Configuração de exibição concluída")
+            if self.recorder:
+                self.recorder.start(self.driver)
+                self.record_step("table")
             
             # NOVO: Processamento dinâmico
             logger.info("🔄 PASSO 5: Processamento dinâmico de novelties...")
-            self.process_all_novelties()
+            with self.timed_step("process_all"):
+                self.process_all_novelties()
             
             logger.info("📊 PASSO 6: Processamento concluído")
             logger.info(f"✅ Sucessos: {self.success_count}, ❌ Falhas: {self.failed_count}")
@@ -1191,14 +1597,42 @@ class DroplAutomationBot:
             logger.info("📋 PASSO 7: Gerando relatório...")
             self.generate_report()
             
+            # Fingerprint do estado final (mesma visão completa usada no início da próxima execução),
+            # gravado só se todas as pendentes foram tentadas nesta execução. Execução degradada ou
+            # com pendentes não tentadas (orçamento de tempo, linhas novas) fica sem fingerprint
+            self.end_fingerprint = None
+            if FINGERPRINT_SKIP_ENABLED and self.run_status != "degraded":
+                with self.timed_step("fingerprint"):
+                    self.navigate(self.profile.novelties_url)
+                    self.end_fingerprint = self.compute_pending_fingerprint(self.attempted_ids)
+            
             # Salvar no banco de dados
             logger.info("💾 PASSO 8: Salvando no banco de dados...")
-            self.save_to_database()
+            self.skipped_runs = count_skipped_runs(self.profile.source_country)
+            with self.timed_step("save_to_database"):
+                self.save_to_database()
             
             # Notificação de sucesso
             execution_time = (datetime.datetime.now() - self.execution_start_time).total_seconds()
             
-            if self.success_count > 0:
+            if self.run_status == "degraded":
+                success_message = f"""🛑 **Cron Job interrompido - execução degradada**
+
+🚨 **Motivo:** {self.breaker.reason}
+
+📊 **Até a interrupção:**
+• ✅ Processadas: **{self.success_count}**
+• ❌ Falhas: **{self.failed_count}**
+• ⏱️ Tempo: **{execution_time/60:.2f} min**
+
+🩺 **Diagnóstico:** {self.diagnostic_path or 'não foi possível salvar'}
+
+❓ **Possíveis causas:**
+• Dropi lento ou fora do ar
+• Mudança na estrutura do site
+
+🔄 **Próxima execução:** em 6 horas"""
+            elif self.success_count > 0:
                 success_message = f"""✅ **Cron Job concluído (CORRIGIDO)!**
 
 📊 **Resultados:**
@@ -1210,13 +1644,13 @@ class DroplAutomationBot:
 
 🛠️ **Correções aplicadas:**
 • Processamento dinâmico (sem índices fixos)
-• Sempre processa primeira linha disponível
+• Processa as pendentes por prioridade (prazo, tipo e idade)
 • Elimina erro "Linha não encontrada"
 • Detecção inteligente de novelties
 
 🔧 **Detalhes:**
 • 📄 Paginação: {'✅ Sim' if self.found_pagination else '❌ Não'}
-• 📸 Screenshots: {len(os.listdir('screenshots')) if os.path.exists('screenshots') else 0}
+• 📸 Screenshots: {len(os.listdir(self.create_screenshots_folder()))}
 • 🔄 **Próxima execução:** em 6 horas"""
             else:
                 success_message = f"""⚠️ **Cron Job finalizado sem processamentos**
@@ -1234,6 +1668,29 @@ class DroplAutomationBot:
 
 🔄 **Próxima verificação:** em 6 horas"""
 
+            priority_lines = self.scheduler.summary_lines()
+            if priority_lines:
+                success_message += "\n\n🎯 **Por prioridade:**"
+                for line in priority_lines:
+                    success_message += f"\n• {line}"
+
+            failure_reasons = self.retry_queue.reason_counts()
+            if failure_reasons:
+                success_message += "\n\n🔁 **Tentativas com falha por motivo:**"
+                for reason, count in sorted(failure_reasons.items()):
+                    success_message += f"\n• {FAILURE_DESCRIPTIONS.get(reason, reason)}: {count}"
+
+            if self.remaining_backlog:
+                success_message += (
+                    f"\n\n📦 **Backlog restante:** {self.remaining_backlog} novelties "
+                    f"(~{format_duration(self.run_controller.projected_clear_seconds(self.remaining_backlog))} para zerar)"
+                )
+                if self.run_controller.stop_reason:
+                    success_message += f"\n⏰ Parada por orçamento: {self.run_controller.stop_reason}"
+
+            if self.skipped_runs > 0:
+                success_message += f"\n\n⏭️ **Execuções puladas (sem mudanças) desde a última completa:** {self.skipped_runs}"
+
             if self.failed_count > 0:
                 success_message += f"\n\n⚠️ **Falhas encontradas:**"
                 for i, item in enumerate(self.failed_items[:3]):  # Mostra apenas as primeiras 3
@@ -1242,9 +1699,15 @@ class DroplAutomationBot:
                 if len(self.failed_items) > 3:
                     success_message += f"\n• ... e mais {len(self.failed_items) - 3} falhas"
             
+            # Perfil encerrado antes do aviso para entrar na mesma notificação de conclusão
+            if self.profiler and PROFILE_DISCORD:
+                self.profiler.stop()
+                success_message += "\n\n" + self.profiler.discord_message()
+            
             # Determina se é erro baseado nos resultados
-            is_error = (self.success_count == 0 and (self.success_count + self.failed_count) > 0) or (self.failed_count > self.success_count)
-            self.send_discord_notification(success_message, is_error=is_error)
+            is_error = self.run_status == "degraded" or (self.success_count == 0 and (self.success_count + self.failed_count) > 0) or (self.failed_count > self.success_count)
+            # Resumo de conclusão vai completo e na hora (o resumo periódico guardaria só a primeira linha)
+            self.send_discord_notification(success_message, is_error=is_error, digest=False)
             
             logger.info("=" * 50)
             logger.info("🎯 AUTOMAÇÃO CRON JOB CORRIGIDA CONCLUÍDA")
@@ -1286,18 +1749,187 @@ class DroplAutomationBot:
             self.send_discord_notification(error_message, is_error=True)
             
         finally:
-            # Fecha o navegador
-            if self.driver:
+            # Grava métricas da execução (textfile no formato Prometheus)
+            self.sample_chrome_memory()
+            LAST_RUN_TIMESTAMP.set(time.time(), country=self.profile.source_country)
+            REGISTRY.write_textfile()
+            
+            if self.recorder:
+                self.recorder.save()
+            
+            # Fecha o navegador (ou devolve ao pool compartilhado)
+            self.release_driver()
+            
+            # O processo é encerrado por main() (sys.exit) para permitir a próxima execução
+            logger.info(f"🏁 Execução {self.profile.display_name} finalizada")
+
+    def release_driver(self):
+        """Fecha o navegador ou, no modo multi-país, devolve ao pool"""
+        if not self.driver:
+            return
+        if self.browser:
+            self.browser.close()
+            self.browser = None
+            self.modal_watcher = None
+        try:
+            if self.browser_pool:
+                logger.info("♻️ Devolvendo navegador ao pool...")
+                self.browser_pool.release(self.driver)
+            else:
+                logger.info("🔒 Fechando navegador...")
+                self.driver.quit()
+                logger.info("✅ Navegador fechado com sucesso")
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao fechar navegador: {str(e)}")
+        finally:
+            self.driver = None
+
+    def start_session(self):
+        """Abre o navegador, faz login e deixa a tabela de novelties pronta (1000 entradas)"""
+        if not self.driver and not self.setup_driver():
+            raise Exception("Falha ao configurar o driver Chrome")
+        if not self.login():
+            raise Exception("Falha no login")
+        if not self.navigate_to_novelties():
+            raise Exception("Falha ao navegar até Novelties")
+        if not self.configure_entries_display():
+            raise Exception("Falha ao configurar exibição de entradas")
+
+    def run_scrape(self):
+        """
+        Modo scrape (somente leitura): lê a tabela inteira em uma chamada, classifica e faz o
+        parse dos endereços em lote e grava o dataset, sem abrir nenhum modal
+        Retorna o caminho do arquivo gravado (ou None)
+        """
+        set_log_context(run_id=new_run_id(), country=self.profile.source_country)
+        logger.info(f"📥 Modo scrape ({self.profile.display_name}) - somente leitura")
+        try:
+            with self.timed_step("login"):
+                self.start_session()
+            with self.timed_step("scrape"):
+                scraped = self.browser.evaluate(novelty_scrape.SCRAPE_ROWS_SCRIPT) or {}
+                dataset = novelty_scrape.build_novelty_dataset(scraped, self.profile)
+            if dataset.empty:
+                logger.warning("⚠️ Nenhuma linha encontrada na tabela de novelties")
+                return None
+            
+            path = novelty_scrape.write_dataset(dataset, self.profile.source_country)
+            logger.info(f"📥 Dataset gravado: {path}")
+            for line in novelty_scrape.summary_lines(dataset):
+                logger.info(f"  • {line}")
+            return path
+        except Exception as e:
+            logger.error(f"❌ Erro no modo scrape: {str(e)}")
+            logger.error(traceback.format_exc())
+            return None
+        finally:
+            self.release_driver()
+            REGISTRY.write_textfile()
+
+    def refresh_novelties_page(self):
+        """Recarrega a tabela mantendo a sessão; refaz o login se a sessão expirou"""
+        self.navigate(self.profile.novelties_url)
+        time.sleep(3)
+        if not self.verify_authentication():
+            logger.warning("🔐 Sessão expirada - refazendo login")
+            self.start_session()
+            return
+        self.configure_entries_display()
+
+    def request_stop(self, signum=None, frame=None):
+        """Pede o encerramento do daemon ao fim do ciclo atual"""
+        logger.info("🛑 Encerramento solicitado - finalizando após o ciclo atual")
+        self.stop_event.set()
+
+    def run_daemon_cycle(self, previous_ids, full_sweep):
+        """Um ciclo do daemon: detecta pedidos novos e processa apenas eles. Retorna os IDs pendentes"""
+        cycle_start = datetime.datetime.now()
+        self.success_count = 0
+        self.failed_count = 0
+        self.failed_items = []
+        self.run_status = "ok"
+        self.command_stats.reset()
+        set_log_context(run_id=new_run_id(), country=self.profile.source_country)
+        
+        self.refresh_novelties_page()
+        current_ids = {row["order_id"] for row in self.get_pending_snapshot() if row["order_id"]}
+        new_ids = current_ids if full_sweep or previous_ids is None else current_ids - previous_ids
+        
+        logger.info(f"🔎 Pendentes: {len(current_ids)} | Novas: {len(new_ids)}{' (varredura completa)' if full_sweep else ''}")
+        
+        if new_ids:
+            with self.timed_step("process_all"):
+                self.process_all_novelties(
+                    target_ids=new_ids, controller=RunController.for_run(cron_interval_minutes=0)
+                )
+            
+            execution_time = (datetime.datetime.now() - cycle_start).total_seconds()
+            save_execution_result(
+                country=self.profile.source_country,
+                total_processed=self.success_count,
+                successful=self.success_count,
+                failed=self.failed_count,
+                execution_time=execution_time,
+                status=self.run_status
+            )
+            
+            if self.run_status == "degraded":
+                self.send_discord_notification(
+                    f"🛑 **Daemon:** ciclo interrompido - execução degradada\n"
+                    f"• 🚨 Motivo: {self.breaker.reason}\n"
+                    f"• ✅ Processadas: **{self.success_count}**\n"
+                    f"• ❌ Falhas: **{self.failed_count}**\n"
+                    f"• 🩺 Diagnóstico: {self.diagnostic_path or 'não foi possível salvar'}",
+                    is_error=True
+                )
+                # Sessão provavelmente comprometida: o próximo ciclo abre uma nova
+                self.release_driver()
+            elif self.success_count or self.failed_count:
+                self.send_discord_notification(
+                    f"🔁 **Daemon:** {len(new_ids)} novas novelties\n"
+                    f"• ✅ Processadas: **{self.success_count}**\n"
+                    f"• ❌ Falhas: **{self.failed_count}**\n"
+                    f"• ⏱️ Tempo: **{execution_time:.0f}s**",
+                    is_error=self.failed_count > self.success_count,
+                    digest=False
+                )
+        
+        REGISTRY.write_textfile()
+        return current_ids
+
+    def run_daemon(self, poll_minutes=DAEMON_POLL_MINUTES):
+        """
+        Modo daemon: mantém uma sessão autenticada e verifica a tabela a cada poll_minutes,
+        processando apenas os pedidos que apareceram desde a verificação anterior
+        """
+        self.stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, self.request_stop)
+        
+        self.send_discord_notification(f"🔁 **Daemon iniciado** - verificação a cada {poll_minutes:g} min")
+        previous_ids = None
+        cycle = 0
+        
+        try:
+            while not self.stop_event.is_set():
+                cycle += 1
+                full_sweep = DAEMON_FULL_SWEEP_EVERY > 0 and cycle % DAEMON_FULL_SWEEP_EVERY == 0
                 try:
-                    logger.info("🔒 Fechando navegador...")
-                    self.driver.quit()
-                    logger.info("✅ Navegador fechado com sucesso")
+                    if not self.driver:
+                        self.start_session()
+                    previous_ids = self.run_daemon_cycle(previous_ids, full_sweep)
                 except Exception as e:
-                    logger.warning(f"⚠️ Erro ao fechar navegador: {str(e)}")
-            
-            # IMPORTANTE: Termina o processo para permitir próxima execução
-            logger.info("🏁 Terminando processo...")
-            sys.exit(0)
+                    logger.error(f"❌ Erro no ciclo {cycle} do daemon: {str(e)}")
+                    logger.error(traceback.format_exc())
+                    # Recria o navegador no próximo ciclo
+                    self.release_driver()
+                
+                # Ciclos sem notificação também liberam o resumo do Discord quando vence o intervalo
+                self.discord_digest.flush_if_due()
+                self.stop_event.wait(poll_minutes * 60)
+        finally:
+            self.release_driver()
+            self.send_discord_notification("🛑 **Daemon finalizado**")
+            self.discord_digest.flush_if_due()
 
     def generate_report(self):
         """Gera relatório da execução"""
@@ -1306,7 +1938,18 @@ class DroplAutomationBot:
             "total_falhas": self.failed_count,
             "itens_com_falha": self.failed_items,
             "guias_fechadas": self.closed_tabs,
-            "encontrou_paginacao": self.found_pagination
+            "encontrou_paginacao": self.found_pagination,
+            "status": self.run_status,
+            "circuit_breaker": self.breaker.state(),
+            "diagnostico": self.diagnostic_path,
+            "backlog_restante": self.remaining_backlog,
+            "tempo_projetado_para_zerar_s": round(self.run_controller.projected_clear_seconds(self.remaining_backlog)),
+            "custo_estimado_por_novelty_s": round(self.run_controller.estimated_cost(), 1),
+            "parada_por_orcamento": self.run_controller.stop_reason,
+            "reciclagens": dict(self.recycles),
+            "pico_memoria_chrome_mb": round(self.watchdog.peak_rss / (1024 * 1024)),
+            "comandos_webdriver": self.command_stats.rows(),
+            "governador": self.governor.state()
         }
         
         logger.info("=" * 50)
@@ -1316,6 +1959,37 @@ class DroplAutomationBot:
         logger.info(f"❌ Total de novelties com falha: {report['total_falhas']}")
         logger.info(f"🗂️ Total de guias fechadas: {report['guias_fechadas']}")
         logger.info(f"📄 Encontrou paginação: {'Sim' if report['encontrou_paginacao'] else 'Não'}")
+        if report["backlog_restante"]:
+            logger.info(
+                f"📦 Backlog restante: {report['backlog_restante']} "
+                f"(projeção para zerar: {format_duration(report['tempo_projetado_para_zerar_s'])}, "
+                f"~{report['custo_estimado_por_novelty_s']}s por novelty)"
+            )
+        if any(report["reciclagens"].values()) or report["pico_memoria_chrome_mb"]:
+            logger.info(
+                f"🧠 Pico de memória do Chrome: {report['pico_memoria_chrome_mb']} MB | "
+                f"Reciclagens: {report['reciclagens'][RECYCLE_TAB]} guias, {report['reciclagens'][RECYCLE_DRIVER]} navegadores"
+            )
+        if report["parada_por_orcamento"]:
+            logger.info(f"⏰ Parada por orçamento de tempo: {report['parada_por_orcamento']}")
+        if self.run_status == "degraded":
+            logger.info(f"🛑 Execução degradada: {self.breaker.reason} (diagnóstico: {self.diagnostic_path})")
+        
+        governor = report["governador"]
+        logger.info(
+            f"🚦 Governador: {governor['taxa_op_s']} op/s"
+            + (f" | resultados: {governor['resultados']}" if governor["resultados"] else "")
+        )
+        if report["comandos_webdriver"]:
+            logger.info(f"🌐 Comandos WebDriver por método ({self.command_stats.total_commands} no total):")
+            for line in self.command_stats.table_lines(report["comandos_webdriver"]):
+                logger.info(f"  {line}")
+        
+        report["conclusao_por_prioridade"] = self.scheduler.summary_lines()
+        if report["conclusao_por_prioridade"]:
+            logger.info("🎯 Conclusão por prioridade:")
+            for line in report["conclusao_por_prioridade"]:
+                logger.info(f"  • {line}")
         
         if report['total_falhas'] > 0:
             logger.info("❌ Detalhes dos itens com falha:")
@@ -1332,17 +2006,48 @@ class DroplAutomationBot:
             execution_time = (datetime.datetime.now() - self.execution_start_time).total_seconds()
             
             save_execution_result(
-                country=THIS_COUNTRY,
+                country=self.profile.source_country,
                 total_processed=self.success_count,
                 successful=self.success_count,
                 failed=self.failed_count,
-                execution_time=execution_time
+                execution_time=execution_time,
+                status=self.run_status,
+                fingerprint=self.end_fingerprint
             )
             
             logger.info("💾 Resultados salvos no banco de dados com sucesso")
         except Exception as e:
             logger.error(f"❌ Erro ao salvar no banco de dados: {str(e)}")
 
+def run_multi_country(profiles, max_browsers=MAX_BROWSERS):
+    """
+    Executa vários perfis de país em paralelo no mesmo processo,
+    compartilhando um pool limitado de navegadores
+    """
+    # Identifica o país (nome da thread) em cada linha do console
+    set_text_format('%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s')
+    
+    runnable = [profile for profile in profiles if profile.has_credentials()]
+    for profile in profiles:
+        if profile not in runnable:
+            logger.warning(f"⚠️ Perfil {profile.source_country} ignorado: credenciais não configuradas")
+    
+    logger.info(f"🌎 Executando {len(runnable)} países com até {max_browsers} navegadores simultâneos")
+    
+    pool = BrowserPool(max_browsers)
+    threads = []
+    try:
+        for profile in runnable:
+            bot = DroplAutomationBot(profile=profile, browser_pool=pool)
+            thread = threading.Thread(target=bot.run_automation, name=profile.source_country)
+            thread.start()
+            threads.append(thread)
+        
+        for thread in threads:
+            thread.join()
+    finally:
+        pool.close_all()
+
 def main():
     """Função principal - EXECUÇÃO ÚNICA PARA CRON"""
     logger.info("=" * 60)
@@ -1362,8 +2067,28 @@ def main():
         # Executa automação UMA VEZ e termina
         logger.info("🎯 Executando automação única (Cron Job) - VERSÃO CORRIGIDA...")
         
-        bot = DroplAutomationBot()
-        bot.run_automation()
+        profiles = get_enabled_profiles(default=THIS_COUNTRY)
+        if not profiles:
+            raise Exception("Nenhum perfil de país ativo em DROPI_COUNTRIES")
+        if len(profiles) == 1 and not profiles[0].has_credentials():
+            # Credenciais só vêm das variáveis de ambiente do país
+            email_var, password_var = profiles[0].credential_vars
+            raise Exception(f"Credenciais não configuradas: defina {email_var} e {password_var}")
+        daemon_mode = "--daemon" in sys.argv or os.getenv("BOT_MODE", "").lower() == "daemon"
+        scrape_mode = "--scrape" in sys.argv or os.getenv("BOT_MODE", "").lower() == "scrape"
+        if scrape_mode:
+            # Leitura do backlog para análise (sem processar novelties)
+            for profile in profiles:
+                DroplAutomationBot(profile=profile).run_scrape()
+        elif daemon_mode:
+            # Sessão contínua com detecção de novas novelties
+            logger.info(f"🔁 Modo daemon ({profiles[0].display_name})")
+            DroplAutomationBot(profile=profiles[0]).run_daemon()
+        elif len(profiles) > 1:
+            run_multi_country(profiles)
+        else:
+            bot = DroplAutomationBot(profile=profiles[0])
+            bot.run_automation()
         
         logger.info("✅ Cron Job finalizado com sucesso")
         
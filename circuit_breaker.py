@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Circuit breaker do processamento de novelties
+Quando o Dropi está lento ou o DOM mudou, cada tentativa consome todos os sleeps e
+timeouts antes de falhar. O breaker acompanha falhas seguidas, a taxa de falha numa
+janela móvel e a latência das tentativas, e interrompe a execução como "degraded"
+"""
+
+import os
+import logging
+from collections import deque
+
+logger = logging.getLogger("dropi_automation_cron")
+
+# Limites (variáveis de ambiente); 0 desativa o critério correspondente
+BREAKER_CONSECUTIVE_FAILURES = int(os.getenv("BREAKER_CONSECUTIVE_FAILURES", "5"))
+BREAKER_WINDOW_SIZE = int(os.getenv("BREAKER_WINDOW_SIZE", "10"))
+BREAKER_WINDOW_FAILURE_RATE = float(os.getenv("BREAKER_WINDOW_FAILURE_RATE", "0.7"))
+BREAKER_SLOW_ATTEMPT_SECONDS = float(os.getenv("BREAKER_SLOW_ATTEMPT_SECONDS", "90"))
+BREAKER_SLOW_ATTEMPTS = int(os.getenv("BREAKER_SLOW_ATTEMPTS", "3"))
+
+
+class CircuitBreaker:
+    """Acompanha o resultado e a duração das tentativas e abre quando a execução degrada"""
+
+    def __init__(self, consecutive_failures=BREAKER_CONSECUTIVE_FAILURES, window_size=BREAKER_WINDOW_SIZE,
+                 window_failure_rate=BREAKER_WINDOW_FAILURE_RATE, slow_attempt_seconds=BREAKER_SLOW_ATTEMPT_SECONDS,
+                 slow_attempts=BREAKER_SLOW_ATTEMPTS):
+        self.consecutive_failures_limit = consecutive_failures
+        self.window_failure_rate = window_failure_rate
+        self.slow_attempt_seconds = slow_attempt_seconds
+        self.slow_attempts_limit = slow_attempts
+        self.window = deque(maxlen=max(1, window_size))
+        self.window_enabled = window_size > 0
+        self.consecutive_failures = 0
+        self.consecutive_slow = 0
+        self.tripped = False
+        self.reason = None
+
+    def record(self, success, duration):
+        """
+        Registra uma tentativa (sucesso e duração em segundos)
+        Retorna True se o breaker abriu nesta chamada ou já estava aberto
+        """
+        self.window.append((success, duration))
+        self.consecutive_failures = 0 if success else self.consecutive_failures + 1
+        slow = self.slow_attempt_seconds > 0 and duration >= self.slow_attempt_seconds
+        self.consecutive_slow = self.consecutive_slow + 1 if slow else 0
+
+        if self.tripped:
+            return True
+
+        if self.consecutive_failures_limit > 0 and self.consecutive_failures >= self.consecutive_failures_limit:
+            self.trip(f"{self.consecutive_failures} falhas seguidas")
+        elif self.window_enabled and len(self.window) == self.window.maxlen and self.failure_rate() >= self.window_failure_rate:
+            self.trip(f"taxa de falha {self.failure_rate():.0%} nas últimas {len(self.window)} tentativas")
+        elif self.slow_attempts_limit > 0 and self.consecutive_slow >= self.slow_attempts_limit:
+            self.trip(f"{self.consecutive_slow} tentativas seguidas acima de {self.slow_attempt_seconds:g}s")
+        return self.tripped
+
+    def trip(self, reason):
+        self.tripped = True
+        self.reason = reason
+        logger.error(f"🛑 Circuit breaker aberto: {reason}")
+
+    def failure_rate(self):
+        """Taxa de falha na janela móvel"""
+        if not self.window:
+            return 0.0
+        return sum(1 for success, _ in self.window if not success) / len(self.window)
+
+    def state(self):
+        """Estado atual (para o snapshot de diagnóstico)"""
+        durations = [duration for _, duration in self.window]
+        return {
+            "tripped": self.tripped,
+            "reason": self.reason,
+            "consecutive_failures": self.consecutive_failures,
+            "consecutive_slow": self.consecutive_slow,
+            "window_failure_rate": round(self.failure_rate(), 3),
+            "window_attempts": len(self.window),
+            "window_avg_seconds": round(sum(durations) / len(durations), 2) if durations else 0.0,
+            "window_max_seconds": round(max(durations), 2) if durations else 0.0
+        }
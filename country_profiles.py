@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfis de país para o bot Dropi
+Cada perfil reúne URL base, credenciais (variáveis de ambiente), parser de endereço,
+regras de mensagem automática e o source_country usado no histórico
+"""
+
+import os
+import re
+import logging
+
+logger = logging.getLogger("dropi_automation_cron")
+
+# Regras de resposta automática: (tipo de incidência, frases no texto, mensagem)
+INCIDENT_UNKNOWN = "DESCONHECIDO"
+CHILE_INCIDENT_RULES = [
+    (
+        "CLIENTE AUSENTE",
+        ["CLIENTE AUSENTE", "NADIE EN CASA"],
+        "Entramos en contacto con el cliente y él se disculpó y mencionó que estará en casa para recibir el producto en este próximo intento."
+    ),
+    (
+        "PROBLEMA COBRO",
+        ["PROBLEMA COBRO"],
+        "En llamada telefónica, el cliente afirmó que estará con dinero suficiente para comprar el producto, por favor intenten nuevamente."
+    ),
+    (
+        "PROBLEMA DE ENDEREÇO",
+        ["DIRECCIÓN INCORRECTA", "DIRECCION INCORRECTA", "FALTAN DATOS", "INUBICABLE", "COMUNA ERRADA", "CAMBIO DE DOMICILIO"],
+        "En llamada telefónica, el cliente rectificó sus datos para que la entrega suceda de forma más asertiva."
+    ),
+    (
+        "RECHAZO DE ENTREGA",
+        ["RECHAZA", "RECHAZADA"],
+        "En llamada telefónica, el cliente afirma que quiere el producto y mencionó que no fue buscado por la transportadora. Por lo tanto, por favor envíen el producto hasta el cliente."
+    )
+]
+
+
+def parse_chilean_address(address, verbose=True):
+    """Extrai componentes específicos de um endereço chileno (verbose=False no processamento em lote)"""
+    try:
+        if verbose:
+            logger.info(f"🏠 Analisando endereço chileno: {address}")
+        
+        components = {
+            "calle": "",
+            "numero": "",
+            "comuna": "",
+            "region": ""
+        }
+        
+        # Extrai número
+        numero_match = re.search(r'\d+', address)
+        if numero_match:
+            components["numero"] = numero_match.group(0)
+        else:
+            components["numero"] = "1"
+        
+        # Extrai calle
+        dash_index = address.find('-')
+        if dash_index != -1:
+            components["calle"] = address[:dash_index].strip()
+        else:
+            if numero_match:
+                numero = components["numero"]
+                calle_index = address.find(numero)
+                if calle_index > 0:
+                    components["calle"] = address[:calle_index].strip()
+            else:
+                components["calle"] = address
+        
+        # Extrai comuna e região
+        last_comma_index = address.rfind(',')
+        
+        if last_comma_index != -1:
+            comuna_region_part = address[last_comma_index+1:].strip()
+            
+            if "BIO - BIO" in comuna_region_part.upper():
+                bio_index = comuna_region_part.upper().find("BIO - BIO")
+                dash_before_bio = comuna_region_part[:bio_index].rfind('-')
+                
+                if dash_before_bio != -1:
+                    components["comuna"] = comuna_region_part[:dash_before_bio].strip()
+                    components["region"] = "BIO - BIO"
+            else:
+                last_hyphen_index = comuna_region_part.rfind('-')
+                
+                if last_hyphen_index != -1:
+                    components["comuna"] = comuna_region_part[:last_hyphen_index].strip()
+                    components["region"] = comuna_region_part[last_hyphen_index+1:].strip()
+                else:
+                    components["comuna"] = comuna_region_part.strip()
+        
+        return components
+    except Exception as e:
+        logger.error(f"❌ Erro ao analisar endereço chileno: {str(e)}")
+        return {
+            "calle": "",
+            "numero": "",
+            "comuna": "",
+            "region": ""
+        }
+
+
+def parse_generic_address(address, verbose=True):
+    """Parser genérico: extrai rua e número (usado por países sem parser específico)"""
+    components = {
+        "calle": address.strip(),
+        "numero": "1",
+        "comuna": "",
+        "region": ""
+    }
+    try:
+        numero_match = re.search(r'\d+', address)
+        if numero_match:
+            components["numero"] = numero_match.group(0)
+            calle_index = address.find(components["numero"])
+            if calle_index > 0:
+                components["calle"] = address[:calle_index].strip()
+        
+        parts = [part.strip() for part in address.split(',') if part.strip()]
+        if len(parts) > 1:
+            components["comuna"] = parts[-1]
+    except Exception as e:
+        logger.error(f"❌ Erro ao analisar endereço: {str(e)}")
+    return components
+
+
+class CountryProfile:
+    """Configuração de um storefront Dropi"""
+    
+    def __init__(self, source_country, display_name, flag, base_url, address_parser, incident_rules,
+                 login_urls=None):
+        self.source_country = source_country
+        self.display_name = display_name
+        self.flag = flag
+        self.base_url = base_url.rstrip('/')
+        self.address_parser = address_parser
+        self.incident_rules = incident_rules
+        self.login_urls = login_urls or [f"{self.base_url}/auth/login", f"{self.base_url}/login"]
+    
+    @property
+    def novelties_url(self):
+        return f"{self.base_url}/dashboard/novelties"
+    
+    @property
+    def dashboard_urls(self):
+        return [f"{self.base_url}/dashboard", self.novelties_url]
+    
+    @property
+    def enabled(self):
+        """Perfil sem regras de mensagem automática próprias não processa novelties"""
+        return bool(self.incident_rules)
+    
+    @property
+    def credential_vars(self):
+        prefix = f"DROPI_{self.source_country.upper()}"
+        return f"{prefix}_EMAIL", f"{prefix}_PASSWORD"
+    
+    def get_credentials(self):
+        """Lê credenciais apenas de DROPI_<PAIS>_EMAIL / DROPI_<PAIS>_PASSWORD (nada fica no código)"""
+        email_var, password_var = self.credential_vars
+        return os.getenv(email_var, ""), os.getenv(password_var, "")
+    
+    def has_credentials(self):
+        email, password = self.get_credentials()
+        return bool(email and password)
+
+
+COUNTRY_PROFILES = {
+    "chile": CountryProfile(
+        source_country="chile",
+        display_name="Chile",
+        flag="🇨🇱",
+        base_url="https://app.dropi.cl",
+        address_parser=parse_chilean_address,
+        incident_rules=CHILE_INCIDENT_RULES,
+        login_urls=[
+            "https://app.dropi.cl",
+            "https://app.dropi.cl/auth/login",
+            "https://app.dropi.cl/login",
+            "https://dropi.cl/login",
+            "https://app.dropi.co/auth/login",
+            "https://panel.dropi.cl/login",
+            "https://admin.dropi.cl/login"
+        ]
+    ),
+    "colombia": CountryProfile(
+        source_country="colombia",
+        display_name="Colombia",
+        flag="🇨🇴",
+        base_url="https://app.dropi.co",
+        address_parser=parse_generic_address,
+        # Sem regras próprias ainda (as do Chile não valem para as mensagens da Colombia):
+        # o perfil fica desativado até que existam
+        incident_rules=[]
+    )
+}
+
+
+def get_profile(name):
+    """Retorna o perfil pelo nome (ex: 'chile')"""
+    key = name.strip().lower()
+    if key not in COUNTRY_PROFILES:
+        raise ValueError(f"País desconhecido: {name} (disponíveis: {', '.join(COUNTRY_PROFILES)})")
+    return COUNTRY_PROFILES[key]
+
+
+def get_enabled_profiles(default="chile"):
+    """Perfis listados em DROPI_COUNTRIES (ex: 'chile,colombia'), exceto os desativados"""
+    names = [name for name in os.getenv("DROPI_COUNTRIES", default).split(',') if name.strip()]
+    profiles = []
+    for profile in [get_profile(name) for name in names]:
+        if profile.enabled:
+            profiles.append(profile)
+        else:
+            logger.warning(f"⚠️ Perfil {profile.source_country} desativado: sem regras de mensagem automática")
+    return profiles
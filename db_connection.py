@@ -10,113 +10,526 @@ import pandas as pd
 import psycopg2
 from sqlalchemy import create_engine, text
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 
+from metrics import DB_CALL_DURATION, HISTORY_CACHE_REQUESTS, MONITOR_DB_CALL_DURATION, MONITOR_HISTORY_CACHE_REQUESTS
+
 logger = logging.getLogger(__name__)
 
+# Linhas lidas por vez em iter_execution_history
+HISTORY_CHUNK_SIZE = 500
+
+# Períodos agregados na tabela de rollup (valor aceito por date_trunc)
+ROLLUP_PERIODS = ("day", "week")
+
+# Cache de get_execution_history (por processo): validade, nº de entradas e tamanho máximo
+HISTORY_CACHE_TTL = int(os.getenv("HISTORY_CACHE_TTL", "300"))
+HISTORY_CACHE_MAX_ENTRIES = int(os.getenv("HISTORY_CACHE_MAX_ENTRIES", "64"))
+HISTORY_CACHE_MAX_BYTES = int(os.getenv("HISTORY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Engine compartilhada e controle de criação do schema (uma vez por processo, sob lock)
+_engine = None
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+SCHEMA_STATEMENTS = [
+    """
+    CREATE INDEX IF NOT EXISTS idx_execution_history_country_date
+    ON execution_history (source_country, execution_date)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS execution_history_rollup (
+        period VARCHAR(10) NOT NULL,
+        period_start TIMESTAMP NOT NULL,
+        source_country VARCHAR(50) NOT NULL,
+        runs INTEGER NOT NULL,
+        total_processed BIGINT NOT NULL,
+        successful BIGINT NOT NULL,
+        failed BIGINT NOT NULL,
+        total_execution_time DOUBLE PRECISION NOT NULL,
+        max_execution_time DOUBLE PRECISION NOT NULL,
+        last_execution_date TIMESTAMP NOT NULL,
+        PRIMARY KEY (period, source_country, period_start)
+    )
+    """,
+    # Status da execução ('ok', 'noop' = pulada por não haver mudanças) e fingerprint das pendentes
+    """
+    ALTER TABLE execution_history
+    ADD COLUMN IF NOT EXISTS status VARCHAR(20) NOT NULL DEFAULT 'ok',
+    ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(64)
+    """,
+    """
+    ALTER TABLE execution_history_rollup
+    ADD COLUMN IF NOT EXISTS skipped_runs INTEGER NOT NULL DEFAULT 0
+    """
+]
+
+# Recalcula os períodos a partir do último já agregado (idempotente)
+ROLLUP_REFRESH_QUERY = """
+    INSERT INTO execution_history_rollup
+    (period, period_start, source_country, runs, total_processed, successful, failed,
+     total_execution_time, max_execution_time, last_execution_date, skipped_runs)
+    SELECT :period, date_trunc(:period, execution_date), source_country, COUNT(*),
+           COALESCE(SUM(total_processed), 0), COALESCE(SUM(successful), 0), COALESCE(SUM(failed), 0),
+           COALESCE(SUM(execution_time), 0), COALESCE(MAX(execution_time), 0), MAX(execution_date),
+           COUNT(*) FILTER (WHERE status = 'noop')
+    FROM execution_history
+    WHERE source_country = :country
+    AND execution_date >= COALESCE(
+        (SELECT MAX(period_start) FROM execution_history_rollup
+         WHERE period = :period AND source_country = :country),
+        CAST('-infinity' AS TIMESTAMP)
+    )
+    GROUP BY date_trunc(:period, execution_date), source_country
+    ON CONFLICT (period, source_country, period_start) DO UPDATE SET
+        runs = EXCLUDED.runs,
+        total_processed = EXCLUDED.total_processed,
+        successful = EXCLUDED.successful,
+        failed = EXCLUDED.failed,
+        total_execution_time = EXCLUDED.total_execution_time,
+        max_execution_time = EXCLUDED.max_execution_time,
+        last_execution_date = EXCLUDED.last_execution_date,
+        skipped_runs = EXCLUDED.skipped_runs
+"""
+
+class HistoryCache:
+    """Cache LRU com TTL e limite em bytes para DataFrames do histórico"""
+    
+    def __init__(self, ttl=HISTORY_CACHE_TTL, max_entries=HISTORY_CACHE_MAX_ENTRIES, max_bytes=HISTORY_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def make_key(start_date, end_date, country_filter):
+        """
+        Normaliza as datas (ISO) para que consultas equivalentes compartilhem a entrada.
+        O país entra como foi passado para a consulta
+        """
+        try:
+            start_key = pd.Timestamp(start_date).isoformat()
+            end_key = pd.Timestamp(end_date).isoformat()
+        except Exception:
+            start_key, end_key = str(start_date), str(end_date)
+        return (start_key, end_key, country_filter)
+    
+    def _remove(self, key):
+        _, size, _, _ = self.entries.pop(key)
+        self.total_bytes -= size
+    
+    def _hit(self, key, entry):
+        self.entries.move_to_end(key)
+        self.hits += 1
+        HISTORY_CACHE_REQUESTS.inc(result="hit")
+        return entry[2].copy()
+    
+    def get(self, key):
+        """
+        Retorna uma cópia do DataFrame se a entrada está dentro do TTL, sem consultar o banco.
+        Entrada vencida ou ausente retorna None e fica para revalidate
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return self._hit(key, entry)
+            return None
+    
+    def revalidate(self, key, version):
+        """
+        Entrada vencida: se a versão dos dados no banco não mudou (nenhuma execução salva
+        desde a gravação, em nenhum processo), renova o TTL e retorna uma cópia; senão descarta
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[3] == version:
+                self.entries[key] = (time.monotonic() + self.ttl,) + entry[1:]
+                return self._hit(key, entry)
+            if entry:
+                self._remove(key)
+            self.misses += 1
+            HISTORY_CACHE_REQUESTS.inc(result="miss")
+            return None
+    
+    def put(self, key, df, version=None):
+        """Armazena o DataFrame, removendo os menos usados até caber nos limites"""
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, size, df.copy(), version)
+            self.total_bytes += size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest_key = next(iter(self.entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+    
+    def invalidate_country(self, country):
+        """Remove todas as entradas de um país (chamado após salvar uma execução)"""
+        with self.lock:
+            for key in [k for k in self.entries if k[2] == country]:
+                self._remove(key)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+    
+    def stats(self):
+        with self.lock:
+            requests_count = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / requests_count, 3) if requests_count else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.total_bytes
+            }
+
+_history_cache = HistoryCache()
+
+def get_history_cache_stats():
+    """Retorna contadores de acerto/erro do cache de histórico"""
+    return _history_cache.stats()
+
 def is_railway():
     """Verifica se está rodando no Railway"""
     return "RAILWAY_ENVIRONMENT" in os.environ
 
+def get_database_url():
+    """Obtém URL do banco conforme o ambiente (None se não configurada)"""
+    if is_railway():
+        return os.getenv("DATABASE_URL")
+    return os.getenv("LOCAL_DATABASE_URL", os.getenv("DATABASE_URL"))
+
+def get_engine():
+    """Retorna a engine do SQLAlchemy compartilhada pelo processo"""
+    global _engine
+    if _engine is None:
+        database_url = get_database_url()
+        if not database_url:
+            raise Exception("URL do banco de dados não configurada")
+        _engine = create_engine(database_url, pool_pre_ping=True)
+    return _engine
+
+def use_monitor_metrics():
+    """
+    Registra as chamadas ao banco deste processo nas métricas do monitor (servidas no /metrics
+    dele, com nomes distintos das do bot lidas do textfile)
+    """
+    global DB_CALL_DURATION, HISTORY_CACHE_REQUESTS
+    DB_CALL_DURATION = MONITOR_DB_CALL_DURATION
+    HISTORY_CACHE_REQUESTS = MONITOR_HISTORY_CACHE_REQUESTS
+
+def ensure_schema():
+    """Cria índice composto e tabela de rollup se ainda não existirem"""
+    global _schema_ready
+    if _schema_ready:
+        return True
+    # Threads do modo multi-país chegam juntas: apenas uma executa o DDL
+    with _schema_lock:
+        if _schema_ready:
+            return True
+        try:
+            with DB_CALL_DURATION.time(operation="ensure_schema"):
+                with get_engine().begin() as conn:
+                    for statement in SCHEMA_STATEMENTS:
+                        conn.execute(text(statement))
+            _schema_ready = True
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao preparar schema do histórico: {str(e)}")
+            return False
+
+def refresh_execution_rollups(country):
+    """Atualiza incrementalmente os agregados diários/semanais de um país"""
+    try:
+        if not ensure_schema():
+            return False
+        with DB_CALL_DURATION.time(operation="refresh_execution_rollups"):
+            with get_engine().begin() as conn:
+                for period in ROLLUP_PERIODS:
+                    conn.execute(text(ROLLUP_REFRESH_QUERY), {"period": period, "country": country})
+        return True
+    except Exception as e:
+        logger.error(f"Erro ao atualizar agregados do histórico: {str(e)}")
+        return False
+
+def get_history_version(conn, country_filter):
+    """
+    Versão dos dados de um país: a última execution_date gravada (busca só no índice
+    source_country, execution_date). Muda a cada save_execution_result, em qualquer processo
+    """
+    row = conn.execute(
+        text("SELECT MAX(execution_date) FROM execution_history WHERE source_country = :country_filter"),
+        {'country_filter': country_filter}
+    ).fetchone()
+    return str(row[0]) if row and row[0] is not None else ""
+
 def get_execution_history(start_date, end_date, country_filter):
     """
     VERSÃO CORRIGIDA - Obtém histórico de execuções do banco de dados
-    Corrige o erro de sintaxe SQL com placeholders duplos
+    Usa parâmetros nomeados (:nome) do SQLAlchemy e a engine compartilhada
     """
     try:
-        # Obtém URL do banco
-        if is_railway():
-            database_url = os.getenv("DATABASE_URL")
-        else:
-            database_url = os.getenv("LOCAL_DATABASE_URL", os.getenv("DATABASE_URL"))
-        
-        if not database_url:
+        if not get_database_url():
             logger.error("URL do banco de dados não configurada")
             return pd.DataFrame()
         
-        # Cria engine do SQLAlchemy
-        engine = create_engine(database_url)
+        cache_key = HistoryCache.make_key(start_date, end_date, country_filter)
         
-        # Query corrigida com placeholders simples
+        # Dentro do TTL o cache responde sem ir ao banco
+        cached_df = _history_cache.get(cache_key)
+        if cached_df is not None:
+            logger.info(f"Histórico obtido do cache ({len(cached_df)} linhas)")
+            return cached_df
+        
+        # Query com parâmetros nomeados (usa o índice source_country, execution_date)
         base_query = """
             SELECT execution_date, total_processed, successful, failed, execution_time, source_country
             FROM execution_history
-            WHERE execution_date BETWEEN %(start_date)s AND %(end_date)s
-            AND source_country = %(country_filter)s 
+            WHERE execution_date BETWEEN :start_date AND :end_date
+            AND source_country = :country_filter
             ORDER BY execution_date DESC
         """
         
         # Parâmetros
         params = {
             'start_date': start_date,
-            'end_date': end_date, 
+            'end_date': end_date,
             'country_filter': country_filter
         }
         
-        logger.info(f"Executando query para período: {start_date} até {end_date}, país: {country_filter}")
-        
-        # Executa query
-        with engine.connect() as conn:
-            df = pd.read_sql_query(text(base_query), conn, params=params)
+        with get_engine().connect() as conn:
+            # TTL vencido: o cache é por processo, a versão no banco revela execuções salvas
+            # pelos outros (uma consulta no índice por janela de TTL)
+            with DB_CALL_DURATION.time(operation="get_history_version"):
+                version = get_history_version(conn, country_filter)
+            cached_df = _history_cache.revalidate(cache_key, version)
+            if cached_df is not None:
+                logger.info(f"Histórico obtido do cache, revalidado ({len(cached_df)} linhas)")
+                return cached_df
+            
+            # Executa query na mesma conexão
+            logger.info(f"Executando query para período: {start_date} até {end_date}, país: {country_filter}")
+            with DB_CALL_DURATION.time(operation="get_execution_history"):
+                df = pd.read_sql_query(text(base_query), conn, params=params)
         
         logger.info(f"Retornadas {len(df)} linhas do histórico")
+        _history_cache.put(cache_key, df, version)
         return df
-        
+    
     except Exception as e:
         logger.error(f"Erro ao buscar histórico de execução: {str(e)}")
         return pd.DataFrame()
 
-def save_execution_result(country, total_processed, successful, failed, execution_time):
-    """Salva resultado da execução no banco de dados"""
+def iter_execution_history(start_date, end_date, country_filter, chunksize=HISTORY_CHUNK_SIZE):
+    """
+    Percorre o histórico em blocos de DataFrames (cursor no servidor),
+    sem carregar todas as linhas na memória
+    """
+    query = """
+        SELECT execution_date, total_processed, successful, failed, execution_time, source_country
+        FROM execution_history
+        WHERE execution_date BETWEEN :start_date AND :end_date
+        AND source_country = :country_filter
+        ORDER BY execution_date DESC
+    """
+    params = {
+        'start_date': start_date,
+        'end_date': end_date,
+        'country_filter': country_filter
+    }
+    
+    try:
+        with get_engine().connect() as conn:
+            conn = conn.execution_options(stream_results=True)
+            for chunk in pd.read_sql_query(text(query), conn, params=params, chunksize=chunksize):
+                yield chunk
+    except Exception as e:
+        logger.error(f"Erro ao percorrer histórico de execução: {str(e)}")
+
+def get_execution_summary(start_date, end_date, country_filter, period="day"):
+    """
+    Obtém o resumo por dia/semana a partir da tabela de rollup (sem ler as linhas brutas).
+    Os agregados são atualizados na gravação (save_execution_result), não na leitura
+    """
+    try:
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"Período inválido: {period} (use {', '.join(ROLLUP_PERIODS)})")
+        
+        query = """
+            SELECT period_start, runs, skipped_runs, total_processed, successful, failed,
+                   total_execution_time, max_execution_time, last_execution_date, source_country
+            FROM execution_history_rollup
+            WHERE period = :period
+            AND source_country = :country_filter
+            AND period_start BETWEEN date_trunc(:period, CAST(:start_date AS TIMESTAMP)) AND :end_date
+            ORDER BY period_start DESC
+        """
+        params = {
+            'period': period,
+            'start_date': start_date,
+            'end_date': end_date,
+            'country_filter': country_filter
+        }
+        
+        with DB_CALL_DURATION.time(operation="get_execution_summary"):
+            with get_engine().connect() as conn:
+                df = pd.read_sql_query(text(query), conn, params=params)
+        
+        if not df.empty:
+            attempted = df["successful"] + df["failed"]
+            df["success_rate"] = (df["successful"] / attempted.where(attempted > 0)).fillna(0)
+            df["avg_execution_time"] = df["total_execution_time"] / df["runs"]
+        
+        return df
+    
+    except Exception as e:
+        logger.error(f"Erro ao buscar resumo do histórico: {str(e)}")
+        return pd.DataFrame()
+
+def save_execution_result(country, total_processed, successful, failed, execution_time,
+                          status="ok", fingerprint=None):
+    """
+    Salva resultado da execução no banco de dados
+    status: 'ok' (execução completa) ou 'noop' (pulada: pendentes iguais à última execução completa)
+    fingerprint: hash das novelties pendentes ao final da execução
+    """
     try:
         # Obtém URL do banco
-        if is_railway():
-            database_url = os.getenv("DATABASE_URL")
-        else:
-            database_url = os.getenv("LOCAL_DATABASE_URL", os.getenv("DATABASE_URL"))
+        database_url = get_database_url()
         
         if not database_url:
             logger.error("URL do banco de dados não configurada")
             return False
         
-        # Conecta usando psycopg2 diretamente para inserção
-        conn = psycopg2.connect(database_url)
-        cursor = conn.cursor()
+        # Query de inserção (colunas status/fingerprint só se o schema foi preparado)
+        if ensure_schema():
+            insert_query = """
+            INSERT INTO execution_history
+            (execution_date, source_country, total_processed, successful, failed, execution_time, status, fingerprint)
+            VALUES (CURRENT_TIMESTAMP, %s, %s, %s, %s, %s, %s, %s)
+            """
+            insert_params = (country, total_processed, successful, failed, execution_time, status, fingerprint)
+        else:
+            insert_query = """
+            INSERT INTO execution_history
+            (execution_date, source_country, total_processed, successful, failed, execution_time)
+            VALUES (CURRENT_TIMESTAMP, %s, %s, %s, %s, %s)
+            """
+            insert_params = (country, total_processed, successful, failed, execution_time)
         
-        # Query de inserção
-        insert_query = """
-        INSERT INTO execution_history 
-        (execution_date, source_country, total_processed, successful, failed, execution_time)
-        VALUES (CURRENT_TIMESTAMP, %s, %s, %s, %s, %s)
-        """
+        with DB_CALL_DURATION.time(operation="save_execution_result"):
+            # Conecta usando psycopg2 diretamente para inserção
+            conn = psycopg2.connect(database_url)
+            cursor = conn.cursor()
+            
+            cursor.execute(insert_query, insert_params)
+            
+            conn.commit()
+            cursor.close()
+            conn.close()
         
-        cursor.execute(insert_query, (country, total_processed, successful, failed, execution_time))
+        logger.info(f"Resultado da execução salvo: {country} - {total_processed} processados ({status})")
         
-        conn.commit()
-        cursor.close()
-        conn.close()
+        # Consultas em cache deste país ficaram desatualizadas
+        _history_cache.invalidate_country(country)
         
-        logger.info(f"Resultado da execução salvo: {country} - {total_processed} processados")
+        # Mantém os agregados em dia (apenas o período corrente é recalculado)
+        refresh_execution_rollups(country)
         return True
-        
+    
     except Exception as e:
         logger.error(f"Erro ao salvar resultado da execução: {str(e)}")
         return False
 
+def get_last_fingerprint(country):
+    """
+    Retorna o fingerprint da última execução 'ok' ou 'noop', ou None (nesse caso a próxima
+    execução deve processar normalmente). Execuções com falhas também contam: o fingerprint
+    só é gravado quando todas as pendentes, inclusive as que falharam, foram tentadas
+    """
+    try:
+        if not ensure_schema():
+            return None
+        
+        query = """
+            SELECT status, fingerprint
+            FROM execution_history
+            WHERE source_country = :country
+            ORDER BY execution_date DESC
+            LIMIT 1
+        """
+        with DB_CALL_DURATION.time(operation="get_last_fingerprint"):
+            with get_engine().connect() as conn:
+                row = conn.execute(text(query), {"country": country}).fetchone()
+        
+        if row and row.status in ("ok", "noop"):
+            return row.fingerprint
+        return None
+    
+    except Exception as e:
+        logger.error(f"Erro ao buscar último fingerprint: {str(e)}")
+        return None
+
+def count_skipped_runs(country):
+    """Conta execuções puladas ('noop') desde a última execução completa do país"""
+    try:
+        if not ensure_schema():
+            return 0
+        
+        query = """
+            SELECT COUNT(*)
+            FROM execution_history
+            WHERE source_country = :country
+            AND status = 'noop'
+            AND execution_date > COALESCE(
+                (SELECT MAX(execution_date) FROM execution_history
+                 WHERE source_country = :country AND status <> 'noop'),
+                CAST('-infinity' AS TIMESTAMP)
+            )
+        """
+        with DB_CALL_DURATION.time(operation="count_skipped_runs"):
+            with get_engine().connect() as conn:
+                return conn.execute(text(query), {"country": country}).scalar() or 0
+    
+    except Exception as e:
+        logger.error(f"Erro ao contar execuções puladas: {str(e)}")
+        return 0
+
 # Função de compatibilidade (se necessário)
-def get_connection():
-    """Cria conexão direta com PostgreSQL"""
+def get_connection(connect_timeout=None, statement_timeout_ms=None):
+    """
+    Cria conexão direta com PostgreSQL
+    connect_timeout (segundos) e statement_timeout_ms limitam o tempo de espera
+    quando o banco está lento ou travado
+    """
     try:
-        if is_railway():
-            database_url = os.getenv("DATABASE_URL")
-        else:
-            database_url = os.getenv("LOCAL_DATABASE_URL", os.getenv("DATABASE_URL"))
+        database_url = get_database_url()
         
         if not database_url:
             raise Exception("URL do banco de dados não configurada")
         
-        conn = psycopg2.connect(database_url)
+        connect_kwargs = {}
+        if connect_timeout:
+            connect_kwargs["connect_timeout"] = int(connect_timeout)
+        if statement_timeout_ms:
+            connect_kwargs["options"] = f"-c statement_timeout={int(statement_timeout_ms)}"
+        
+        conn = psycopg2.connect(database_url, **connect_kwargs)
         return conn
     except Exception as e:
         logger.error(f"Erro ao conectar com o banco de dados: {str(e)}")
-        raise
\ No newline at end of file
+        raise
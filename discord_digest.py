@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Resumo periódico das notificações do Discord (bot e monitor)
+Eventos não críticos (início de execução, execuções puladas, relatórios sem problemas) ficam
+em um arquivo local compartilhado pelos processos e saem juntos em um único embed a cada
+DISCORD_DIGEST_MINUTES, uma linha por evento; resumos de conclusão com estatísticas não passam
+por aqui. Alertas críticos são enviados na hora; o mesmo alerta repetido
+dentro de DISCORD_SUPPRESS_MINUTES é suprimido e contado
+Para enviar o resumo pendente na hora: python monitor.py digest
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import datetime
+import threading
+import logging
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger("dropi_automation_cron")
+
+# Arquivo compartilhado entre bot e monitor (eventos pendentes e alertas enviados)
+DISCORD_DIGEST_FILE = os.getenv("DISCORD_DIGEST_FILE", "discord_digest.json")
+
+# Intervalo do resumo (0 desativa: toda notificação é enviada na hora, como antes)
+DISCORD_DIGEST_MINUTES = float(os.getenv("DISCORD_DIGEST_MINUTES", "60"))
+
+# Janela em que o mesmo alerta crítico não é reenviado (0 desativa)
+DISCORD_SUPPRESS_MINUTES = float(os.getenv("DISCORD_SUPPRESS_MINUTES", "30"))
+
+# Limites do arquivo e do embed (o Discord aceita até 4096 caracteres na descrição)
+MAX_PENDING_EVENTS = 500
+MAX_DESCRIPTION_CHARS = 3900
+SUMMARY_LINE_CHARS = 120
+
+DIGEST_COLOR = 0x0099FF
+
+_thread_lock = threading.Lock()
+
+
+def summary_line(message):
+    """Primeira linha não vazia da mensagem, sem markdown, para o resumo"""
+    for line in message.splitlines():
+        line = line.replace("**", "").replace("`", "").strip()
+        if line:
+            return line[:SUMMARY_LINE_CHARS]
+    return ""
+
+
+def alert_key(source, message):
+    """Chave do alerta: números (horários, contagens, percentuais) não diferenciam alertas"""
+    normalized = re.sub(r"\d+(?:[.,]\d+)?", "#", message.strip())
+    return hashlib.sha1(f"{source}|{normalized}".encode("utf-8")).hexdigest()[:16]
+
+
+class DiscordDigest:
+    """
+    Roteia as notificações de uma origem (ex: '🇨🇱 Chile', '🔍 Monitor'):
+    críticas vão direto ao webhook, as demais esperam o próximo resumo
+    make_embed(mensagem, crítica) monta o embed da origem; post_embed(embed) envia
+    um embed ao webhook e retorna True em caso de sucesso
+    """
+
+    def __init__(self, source, make_embed, post_embed, path=DISCORD_DIGEST_FILE,
+                 interval_minutes=DISCORD_DIGEST_MINUTES, suppress_minutes=DISCORD_SUPPRESS_MINUTES):
+        self.source = source
+        self.make_embed = make_embed
+        self.post_embed = post_embed
+        self.path = path
+        self.interval = interval_minutes * 60
+        self.suppress = suppress_minutes * 60
+
+    def send_now(self, message, critical=False):
+        return self.post_embed(self.make_embed(message, critical))
+
+    @property
+    def enabled(self):
+        return self.interval > 0
+
+    @contextmanager
+    def _locked_state(self):
+        """Estado do arquivo com lock entre threads e processos; gravado ao sair do bloco"""
+        with _thread_lock:
+            lock_file = None
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                if fcntl is not None:
+                    lock_file = open(f"{self.path}.lock", "a")
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                state = self._read()
+                yield state
+                self._write(state)
+            finally:
+                if lock_file is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    lock_file.close()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            state = {}
+        except Exception as e:
+            logger.warning(f"⚠️ Arquivo do resumo Discord ilegível ({str(e)}) - recomeçando")
+            state = {}
+        state.setdefault("events", [])
+        state.setdefault("alerts", {})
+        state.setdefault("dropped", 0)
+        return state
+
+    def _write(self, state):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def notify(self, message, critical=False, key=None, now=None):
+        """
+        Encaminha uma notificação. key identifica alertas repetidos (padrão: o texto sem números)
+        Retorna True se algo foi enviado ao Discord nesta chamada
+        """
+        now = now if now is not None else time.time()
+        try:
+            if critical:
+                return self._send_alert(message, key or alert_key(self.source, message), now)
+            if not self.enabled:
+                return self.send_now(message)
+            with self._locked_state() as state:
+                state["events"].append({"source": self.source, "timestamp": now, "line": summary_line(message)})
+                overflow = len(state["events"]) - MAX_PENDING_EVENTS
+                if overflow > 0:
+                    del state["events"][:overflow]
+                    state["dropped"] += overflow
+                state.setdefault("last_flush", now)
+            return self.flush_if_due(now)
+        except Exception as e:
+            logger.error(f"❌ Erro no resumo Discord: {str(e)} - enviando direto")
+            return self.send_now(message, critical)
+
+    def _send_alert(self, message, key, now):
+        # O envio acontece com o lock: dois processos não mandam o mesmo alerta ao mesmo tempo
+        with self._locked_state() as state:
+            alerts = state["alerts"]
+            for old_key in [k for k, a in alerts.items() if now - a["last_sent"] >= self.suppress]:
+                if not alerts[old_key]["suppressed"]:
+                    del alerts[old_key]
+            alert = alerts.get(key)
+            if alert and now - alert["last_sent"] < self.suppress:
+                alert["suppressed"] += 1
+                logger.info(f"🔕 Alerta repetido suprimido ({alert['suppressed']}x desde o último envio)")
+                return False
+
+            suppressed = alert["suppressed"] if alert else 0
+            if suppressed:
+                message += f"\n\n🔕 Repetido {suppressed}x desde o último envio (suprimido)"
+            if not self.send_now(message, critical=True):
+                return False
+            alerts[key] = {"last_sent": now, "suppressed": 0}
+            return True
+
+    def flush_if_due(self, now=None):
+        """Envia o resumo se o intervalo passou desde o último; retorna True se enviou"""
+        now = now if now is not None else time.time()
+        if not self.enabled:
+            return False
+        with self._locked_state() as state:
+            if now - state.get("last_flush", now) < self.interval:
+                return False
+        return self.flush(now)
+
+    def flush(self, now=None):
+        """Envia os eventos pendentes em um único embed (mantidos no arquivo se o envio falhar)"""
+        now = now if now is not None else time.time()
+        with self._locked_state() as state:
+            events = state["events"]
+            suppressed = sum(alert["suppressed"] for alert in state["alerts"].values())
+            if not events and not suppressed:
+                state["last_flush"] = now
+                return False
+            if not self.post_embed(build_digest_embed(events, state["dropped"], suppressed, now)):
+                return False
+            state["events"] = []
+            state["dropped"] = 0
+            for alert in state["alerts"].values():
+                alert["suppressed"] = 0
+            state["last_flush"] = now
+        logger.info(f"🗞️ Resumo Discord enviado ({len(events)} eventos)")
+        return True
+
+
+def build_digest_embed(events, dropped=0, suppressed=0, now=None):
+    """Embed do resumo: eventos iguais (a menos de números) agrupados por origem, com contagem"""
+    now = now if now is not None else time.time()
+    groups = {}
+    for event in events:
+        group_key = (event["source"], re.sub(r"\d+(?:[.,]\d+)?", "#", event["line"]))
+        group = groups.setdefault(group_key, {"count": 0, "first": event["timestamp"]})
+        group["count"] += 1
+        group["last"] = event["timestamp"]
+        group["line"] = event["line"]
+        group["source"] = event["source"]
+
+    lines = []
+    for group in sorted(groups.values(), key=lambda g: g["first"]):
+        last = datetime.datetime.fromtimestamp(group["last"]).strftime("%d/%m %H:%M")
+        count = f" ×{group['count']}" if group["count"] > 1 else ""
+        lines.append(f"• `{last}` {group['source']}: {group['line']}{count}")
+
+    description = ""
+    for position, line in enumerate(lines):
+        if len(description) + len(line) + 1 > MAX_DESCRIPTION_CHARS:
+            description += f"\n• ... e mais {len(lines) - position} tipos de evento"
+            break
+        description += ("\n" if description else "") + line
+    if dropped:
+        description += f"\n\n⚠️ {dropped} eventos antigos descartados (limite do arquivo)"
+    if suppressed:
+        description += f"\n\n🔕 Alertas repetidos suprimidos: **{suppressed}**"
+
+    start = min((event["timestamp"] for event in events), default=now)
+    return {
+        "title": f"🗞️ Resumo Dropi ({len(events)} eventos desde {datetime.datetime.fromtimestamp(start).strftime('%d/%m %H:%M')})",
+        "description": description or "Sem eventos",
+        "color": DIGEST_COLOR,
+        "timestamp": datetime.datetime.fromtimestamp(now).isoformat(),
+        "footer": {"text": "Resumo periódico"}
+    }
+
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Resolução do chromedriver com cache por versão do Chrome
+Detecta a versão do Chrome instalado e usa o chromedriver guardado em
+CHROMEDRIVER_CACHE_DIR/<versão>/. Só na primeira vez (ou quando o Chrome é atualizado)
+procura um chromedriver compatível no PATH ou baixa pelo webdriver_manager;
+depois disso funciona offline. Usado localmente e no Railway (o Dockerfile já resolve no build)
+
+Uso:
+    python driver_resolver.py    # resolve e mostra o caminho (pré-aquecimento do cache)
+"""
+
+import os
+import re
+import sys
+import time
+import shutil
+import platform
+import threading
+import subprocess
+import logging
+
+logger = logging.getLogger("dropi_automation_cron")
+
+# Caminho fixo (ignora detecção e cache)
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "")
+CHROMEDRIVER_CACHE_DIR = os.getenv(
+    "CHROMEDRIVER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "dropi", "chromedriver")
+)
+
+DRIVER_FILE = "chromedriver.exe" if platform.system() == "Windows" else "chromedriver"
+VERSION_PATTERN = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+
+CHROME_CANDIDATES = (
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+)
+WINDOWS_VERSION_QUERY = ["reg", "query", r"HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon", "/v", "version"]
+
+_resolved = {}
+_lock = threading.Lock()
+
+
+def _run_version(command):
+    """Saída de '<comando> --version' (ou da consulta ao registro); None se falhar"""
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=10)
+        match = VERSION_PATTERN.search(result.stdout or "")
+        return match.group(0) if match else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def detect_chrome_version():
+    """Versão completa do Chrome instalado (CHROME_BIN tem prioridade), ex: '120.0.6099.109'"""
+    if platform.system() == "Windows":
+        return _run_version(WINDOWS_VERSION_QUERY)
+    candidates = [os.getenv("CHROME_BIN")] + list(CHROME_CANDIDATES)
+    for candidate in candidates:
+        if not candidate:
+            continue
+        binary = candidate if os.path.isabs(candidate) else shutil.which(candidate)
+        if binary and os.path.exists(binary):
+            version = _run_version([binary, "--version"])
+            if version:
+                return version
+    return None
+
+
+def driver_version(path):
+    return _run_version([path, "--version"])
+
+
+def major(version):
+    return version.split(".")[0] if version else None
+
+
+def _cached_path(chrome_version, cache_dir):
+    return os.path.join(cache_dir, chrome_version, DRIVER_FILE)
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _same_major_in_cache(chrome_version, cache_dir):
+    """Driver em cache de outra versão com o mesmo major (Chrome atualizado sem rede)"""
+    if not os.path.isdir(cache_dir):
+        return None
+    for entry in sorted(os.listdir(cache_dir), reverse=True):
+        path = _cached_path(entry, cache_dir)
+        if major(entry) == major(chrome_version) and _is_executable(path):
+            return path
+    return None
+
+
+def _store(source, chrome_version, cache_dir):
+    """Copia o binário para o cache da versão (escrita atômica); retorna o caminho final"""
+    target = _cached_path(chrome_version, cache_dir)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    shutil.copy2(source, tmp_path)
+    os.chmod(tmp_path, 0o755)
+    os.replace(tmp_path, target)
+    return target
+
+
+def _download(chrome_version):
+    """Baixa o chromedriver compatível pelo webdriver_manager (só em cache miss)"""
+    from webdriver_manager.chrome import ChromeDriverManager
+    try:
+        return ChromeDriverManager(driver_version=chrome_version).install()
+    except Exception as e:
+        logger.warning(f"⚠️ chromedriver {chrome_version} não encontrado para download ({str(e)}) - tentando o mais recente")
+        return ChromeDriverManager().install()
+
+
+def _resolve(cache_dir):
+    """(caminho ou None, origem, versão do Chrome)"""
+    if CHROMEDRIVER_PATH:
+        return CHROMEDRIVER_PATH, "CHROMEDRIVER_PATH", None
+
+    chrome_version = detect_chrome_version()
+    if not chrome_version:
+        logger.warning("⚠️ Versão do Chrome não detectada - o Selenium resolverá o chromedriver")
+        return None, "selenium", None
+
+    cached = _cached_path(chrome_version, cache_dir)
+    if _is_executable(cached):
+        return cached, "cache", chrome_version
+
+    # Cache miss: chromedriver compatível já instalado no sistema
+    on_path = shutil.which(DRIVER_FILE)
+    if on_path and major(driver_version(on_path)) == major(chrome_version):
+        return _store(on_path, chrome_version, cache_dir), "PATH", chrome_version
+
+    try:
+        downloaded = _download(chrome_version)
+        return _store(downloaded, chrome_version, cache_dir), "download", chrome_version
+    except Exception as e:
+        fallback = _same_major_in_cache(chrome_version, cache_dir)
+        if fallback:
+            logger.warning(f"⚠️ Download do chromedriver falhou ({str(e)}) - usando {fallback}")
+            return fallback, "cache (mesmo major)", chrome_version
+        logger.error(f"❌ Não foi possível obter o chromedriver: {str(e)}")
+        return None, "selenium", chrome_version
+
+
+def resolve_chromedriver(cache_dir=CHROMEDRIVER_CACHE_DIR):
+    """
+    Caminho do chromedriver para o Chrome instalado (resolvido uma vez por processo).
+    None deixa o Service() do Selenium procurar sozinho
+    """
+    with _lock:
+        if cache_dir in _resolved:
+            return _resolved[cache_dir]
+
+        started = time.perf_counter()
+        path, source, chrome_version = _resolve(cache_dir)
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"🔧 chromedriver resolvido em {elapsed:.2f}s via {source}"
+            f"{f' (Chrome {chrome_version})' if chrome_version else ''}: {path or 'Selenium Manager'}"
+        )
+        _resolved[cache_dir] = path
+        return path
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    resolved = resolve_chromedriver()
+    print(resolved or "")
+    sys.exit(0 if resolved else 1)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Análise de vazão do histórico de execuções (get_execution_history)
+Taxa de sucesso móvel, novelties por minuto, p50/p95 do execution_time e variação
+das últimas execuções em relação à linha de base, tudo vetorizado com pandas.
+Sinaliza regressão quando a vazão recente cai HISTORY_REGRESSION_PCT abaixo da base
+"""
+
+import os
+import datetime
+
+import pandas as pd
+
+# Execuções analisadas por país (as mais recentes) e período consultado no banco
+HISTORY_ANALYTICS_RUNS = int(os.getenv("HISTORY_ANALYTICS_RUNS", "50"))
+HISTORY_ANALYTICS_DAYS = int(os.getenv("HISTORY_ANALYTICS_DAYS", "30"))
+
+# Janela móvel (execuções); a janela mais recente é comparada com as anteriores (linha de base)
+HISTORY_ROLLING_WINDOW = int(os.getenv("HISTORY_ROLLING_WINDOW", "10"))
+
+# Queda da vazão (%) em relação à linha de base considerada regressão
+HISTORY_REGRESSION_PCT = float(os.getenv("HISTORY_REGRESSION_PCT", "20"))
+
+
+def _delta_pct(recent, baseline):
+    if baseline is None or pd.isna(baseline) or baseline == 0 or recent is None or pd.isna(recent):
+        return None
+    return round(float((recent - baseline) / baseline * 100), 1)
+
+
+def _rate(numerator, denominator):
+    return None if not denominator else float(numerator / denominator)
+
+
+def compute_history_analytics(df, runs=HISTORY_ANALYTICS_RUNS, window=HISTORY_ROLLING_WINDOW,
+                              regression_pct=HISTORY_REGRESSION_PCT):
+    """
+    Métricas por país a partir do DataFrame do histórico. Execuções sem nenhuma novelty
+    (noop ou tabela vazia) ficam fora da vazão e da taxa de sucesso
+    Retorna {país: métricas}
+    """
+    if df is None or df.empty:
+        return {}
+
+    data = df.copy()
+    data["execution_date"] = pd.to_datetime(data["execution_date"])
+    data = data.sort_values("execution_date")
+    data = data[(data["successful"] + data["failed"]) > 0]
+    data = data.groupby("source_country", group_keys=False).tail(runs)
+
+    data["attempted"] = data["successful"] + data["failed"]
+    data["minutes"] = data["execution_time"].clip(lower=1) / 60
+    grouped = data.groupby("source_country")
+
+    # Somas móveis por país: taxa de sucesso da janela = razão das somas (não média das razões)
+    rolling = grouped[["successful", "attempted"]].rolling(window, min_periods=1).sum()
+    rolling = rolling.reset_index(level=0, drop=True)
+    data["rolling_success_rate"] = rolling["successful"] / rolling["attempted"]
+
+    # Janela recente (últimas `window` execuções) x linha de base (as anteriores)
+    data["position_from_end"] = grouped.cumcount(ascending=False)
+    data["period"] = (data["position_from_end"] < window).map({True: "recent", False: "baseline"})
+    sums = data.groupby(["source_country", "period"])[["successful", "attempted", "total_processed", "minutes"]].sum()
+    medians = data.groupby(["source_country", "period"])["execution_time"].median()
+    quantiles = grouped["execution_time"].quantile([0.5, 0.95]).unstack()
+
+    analytics = {}
+    for country, country_data in grouped:
+        def period_value(period, numerator, denominator):
+            if (country, period) not in sums.index:
+                return None
+            row = sums.loc[(country, period)]
+            return _rate(row[numerator], row[denominator])
+
+        recent_per_minute = period_value("recent", "total_processed", "minutes")
+        baseline_per_minute = period_value("baseline", "total_processed", "minutes")
+        recent_success = period_value("recent", "successful", "attempted")
+        baseline_success = period_value("baseline", "successful", "attempted")
+        recent_time = medians.get((country, "recent"))
+        baseline_time = medians.get((country, "baseline"))
+
+        throughput_delta = _delta_pct(recent_per_minute, baseline_per_minute)
+        last = country_data.iloc[-1]
+        analytics[country] = {
+            "runs": int(len(country_data)),
+            "window": window,
+            "last_run": last["execution_date"].isoformat(),
+            "rolling_success_rate": round(float(last["rolling_success_rate"]), 3),
+            "novelties_per_minute": round(recent_per_minute, 2) if recent_per_minute is not None else None,
+            "baseline_novelties_per_minute": round(baseline_per_minute, 2) if baseline_per_minute is not None else None,
+            "execution_time_p50": round(float(quantiles.loc[country, 0.5]), 1),
+            "execution_time_p95": round(float(quantiles.loc[country, 0.95]), 1),
+            "delta_novelties_per_minute_pct": throughput_delta,
+            "delta_success_rate_pct": _delta_pct(recent_success, baseline_success),
+            "delta_execution_time_p50_pct": _delta_pct(recent_time, baseline_time),
+            "regression": bool(throughput_delta is not None and throughput_delta <= -regression_pct)
+        }
+    return analytics
+
+
+def load_history_analytics(countries, days=HISTORY_ANALYTICS_DAYS):
+    """Consulta o histórico dos países (get_execution_history) e calcula as métricas"""
+    from db_connection import get_execution_history
+
+    end_date = datetime.datetime.now()
+    start_date = end_date - datetime.timedelta(days=days)
+    frames = [get_execution_history(start_date, end_date, country) for country in countries]
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return {}
+    return compute_history_analytics(pd.concat(frames, ignore_index=True))
+
+
+def report_lines(analytics):
+    """Linhas do relatório do monitor (uma seção por país)"""
+    lines = []
+    for country, data in sorted(analytics.items()):
+        per_minute = data["novelties_per_minute"]
+        baseline = data["baseline_novelties_per_minute"]
+        delta = data["delta_novelties_per_minute_pct"]
+        flag = " ⚠️ REGRESSÃO" if data["regression"] else ""
+        lines.append(f"• {country} ({data['runs']} execuções){flag}")
+        lines.append(
+            f"  Vazão: {per_minute if per_minute is not None else '-'} novelties/min"
+            + (f" (base {baseline}, {delta:+.1f}%)" if delta is not None else "")
+        )
+        success_delta = data["delta_success_rate_pct"]
+        lines.append(
+            f"  Sucesso (últimas {data['window']}): {data['rolling_success_rate']:.0%}"
+            + (f" ({success_delta:+.1f}%)" if success_delta is not None else "")
+        )
+        time_delta = data["delta_execution_time_p50_pct"]
+        lines.append(
+            f"  Duração: p50 {data['execution_time_p50']:.0f}s, p95 {data['execution_time_p95']:.0f}s"
+            + (f" (p50 recente {time_delta:+.1f}%)" if time_delta is not None else "")
+        )
+    return lines
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitor incremental do log do bot (automation.jsonl ou o antigo automation.log em texto)
+Lê apenas os bytes novos desde a última verificação (checkpoint persistido em disco)
+e mantém contadores de erros por minuto, com memória constante mesmo em logs de vários GB
+"""
+
+import os
+import json
+import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tamanho dos blocos lidos do disco
+CHUNK_SIZE = 64 * 1024
+
+# Na primeira execução (sem checkpoint) analisa apenas o final do arquivo
+INITIAL_BACKFILL_BYTES = 8 * 1024 * 1024
+
+# Por quanto tempo os contadores por minuto são mantidos no checkpoint
+RETENTION_HOURS = 24
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+BUCKET_FORMAT = "%Y-%m-%d %H:%M"
+
+# Linhas JSON começam sempre com {"ts": "YYYY-MM-DD HH:MM:SS" (ver structured_logging.py)
+JSON_TS_PREFIX = '{"ts": "'
+
+
+def is_error_line(line):
+    """Verifica se a linha representa um erro (mesmo critério usado pelo monitor)"""
+    return "ERROR" in line or "ERRO" in line
+
+
+def parse_line_timestamp(line):
+    """Extrai o timestamp do início da linha (texto ou JSON, formato YYYY-MM-DD HH:MM:SS) ou None"""
+    if line.startswith(JSON_TS_PREFIX):
+        # Posição fixa: não precisa decodificar o JSON
+        line = line[len(JSON_TS_PREFIX):]
+    if not line.startswith("20") or len(line) < 19:
+        return None
+    try:
+        return datetime.datetime.strptime(line[:19], TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def format_log_line(line):
+    """Converte uma linha JSON para o formato de texto 'data - nível - mensagem' (texto passa direto)"""
+    if not line.startswith(JSON_TS_PREFIX):
+        return line
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return line
+    order = f" [{entry['order_id']}]" if entry.get("order_id") else ""
+    return f"{entry.get('ts')} - {entry.get('level')} -{order} {entry.get('msg', '')}"
+
+
+def read_last_lines(path, count=3):
+    """Lê as últimas linhas do arquivo buscando a partir do final, sem carregar o arquivo inteiro"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            buffer = b""
+
+            # Lê blocos de trás para frente até ter linhas suficientes
+            while position > 0 and buffer.count(b"\n") <= count:
+                read_size = min(CHUNK_SIZE, position)
+                position -= read_size
+                f.seek(position)
+                buffer = f.read(read_size) + buffer
+
+            lines = buffer.decode('utf-8', errors='replace').splitlines()
+            return [line.strip() for line in lines if line.strip()][-count:]
+    except OSError as e:
+        logger.error(f"Erro ao ler final do log: {str(e)}")
+        return []
+
+
+class LogScanner:
+    """Analisa o log de forma incremental a partir de um checkpoint em bytes"""
+
+    def __init__(self, log_file, state_file=None):
+        self.log_file = log_file
+        self.state_file = state_file or f"{log_file}.checkpoint.json"
+        self.state = self._load_state()
+
+    def _load_state(self):
+        """Carrega o checkpoint salvo pela última execução"""
+        empty_state = {"inode": None, "offset": None, "last_timestamp": None, "buckets": {}}
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                empty_state.update(state)
+        except Exception as e:
+            logger.warning(f"Checkpoint do log inválido, recomeçando: {str(e)}")
+        return empty_state
+
+    def _save_state(self):
+        """Persiste o checkpoint de forma atômica"""
+        try:
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            logger.warning(f"Não foi possível salvar checkpoint do log: {str(e)}")
+
+    def _consume(self, f, start, end):
+        """Lê o intervalo [start, end) e contabiliza erros. Retorna o offset da última linha completa"""
+        f.seek(start)
+        position = start
+        pending = b""
+        buckets = self.state["buckets"]
+        last_timestamp = self.state.get("last_timestamp")
+
+        while position < end:
+            chunk = f.read(min(CHUNK_SIZE, end - position))
+            if not chunk:
+                break
+            position += len(chunk)
+            data = pending + chunk
+            lines = data.split(b"\n")
+            # A última parte pode ser uma linha incompleta ainda sendo escrita
+            pending = lines.pop()
+
+            for raw_line in lines:
+                line = raw_line.decode('utf-8', errors='replace')
+                timestamp = parse_line_timestamp(line)
+                if timestamp:
+                    last_timestamp = timestamp.strftime(TIMESTAMP_FORMAT)
+                if not is_error_line(line):
+                    continue
+                # Linhas sem timestamp (ex: traceback) herdam o da última linha conhecida
+                bucket_source = timestamp or (
+                    datetime.datetime.strptime(last_timestamp, TIMESTAMP_FORMAT) if last_timestamp else datetime.datetime.now()
+                )
+                bucket = bucket_source.strftime(BUCKET_FORMAT)
+                buckets[bucket] = buckets.get(bucket, 0) + 1
+
+        self.state["last_timestamp"] = last_timestamp
+        return position - len(pending)
+
+    def _prune_buckets(self):
+        """Remove contadores mais antigos que a retenção"""
+        limit = (datetime.datetime.now() - datetime.timedelta(hours=RETENTION_HOURS)).strftime(BUCKET_FORMAT)
+        self.state["buckets"] = {k: v for k, v in self.state["buckets"].items() if k >= limit}
+
+    def _scan_rotated_remainder(self):
+        """Após uma rotação, termina de ler o arquivo antigo (.1) a partir do checkpoint"""
+        rotated_file = f"{self.log_file}.1"
+        try:
+            if not os.path.exists(rotated_file):
+                return
+            rotated_stat = os.stat(rotated_file)
+            if rotated_stat.st_ino != self.state["inode"] or rotated_stat.st_size < self.state["offset"]:
+                return
+            with open(rotated_file, 'rb') as f:
+                self._consume(f, self.state["offset"], rotated_stat.st_size)
+        except OSError as e:
+            logger.debug(f"Não foi possível ler log rotacionado: {str(e)}")
+
+    def scan(self):
+        """Lê os bytes novos do log e atualiza os contadores. Retorna o stat do arquivo"""
+        stat = os.stat(self.log_file)
+        offset = self.state.get("offset")
+
+        if offset is None:
+            # Primeira execução: começa perto do final do arquivo
+            offset = max(0, stat.st_size - INITIAL_BACKFILL_BYTES)
+        elif self.state.get("inode") != stat.st_ino or stat.st_size < offset:
+            # Arquivo foi rotacionado ou truncado
+            logger.info("Rotação do log detectada, reiniciando leitura")
+            if self.state.get("inode") is not None and self.state.get("offset") is not None:
+                self._scan_rotated_remainder()
+            offset = 0
+
+        with open(self.log_file, 'rb') as f:
+            if offset > 0 and self.state.get("offset") is None:
+                # Descarta a linha parcial do ponto de partida inicial
+                f.seek(offset)
+                f.readline()
+                offset = f.tell()
+            self.state["offset"] = self._consume(f, offset, stat.st_size)
+
+        self.state["inode"] = stat.st_ino
+        self._prune_buckets()
+        self._save_state()
+        return stat
+
+    def count_errors(self, minutes=60):
+        """Conta erros registrados nos últimos N minutos"""
+        limit = (datetime.datetime.now() - datetime.timedelta(minutes=minutes)).strftime(BUCKET_FORMAT)
+        return sum(count for bucket, count in self.state["buckets"].items() if bucket >= limit)
+
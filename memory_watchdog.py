@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Watchdog de memória do Chrome
+Amostra em segundo plano a RSS do chromedriver e de todos os processos do Chrome abaixo dele
+e indica quando a guia ou o navegador inteiro devem ser reciclados (por memória ou por
+quantidade de novelties processadas)
+"""
+
+import os
+import threading
+import logging
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger("dropi_automation_cron")
+
+MB = 1024 * 1024
+
+# Limites de RSS (MB) da árvore de processos do Chrome; 0 desativa
+CHROME_TAB_RECYCLE_MB = float(os.getenv("CHROME_TAB_RECYCLE_MB", "1500"))
+CHROME_DRIVER_RECYCLE_MB = float(os.getenv("CHROME_DRIVER_RECYCLE_MB", "2500"))
+
+# Reciclagem periódica por quantidade de novelties desde a última reciclagem; 0 desativa
+RECYCLE_TAB_EVERY = int(os.getenv("RECYCLE_TAB_EVERY", "150"))
+RECYCLE_DRIVER_EVERY = int(os.getenv("RECYCLE_DRIVER_EVERY", "600"))
+
+# Novelties mínimas entre duas reciclagens por memória (a RSS que não cai não recicla a cada novelty)
+RECYCLE_MIN_NOVELTIES = int(os.getenv("RECYCLE_MIN_NOVELTIES", "10"))
+
+# Intervalo (s) entre amostras e entre logs de margem de memória
+WATCHDOG_SAMPLE_SECONDS = float(os.getenv("WATCHDOG_SAMPLE_SECONDS", "15"))
+WATCHDOG_LOG_SECONDS = float(os.getenv("WATCHDOG_LOG_SECONDS", "300"))
+
+RECYCLE_TAB = "tab"
+RECYCLE_DRIVER = "driver"
+
+
+def measure_process_tree_rss(pid):
+    """RSS (bytes) do processo pid e de todos os descendentes; 0 se não for possível medir"""
+    if psutil is None or not pid:
+        return 0
+    try:
+        root = psutil.Process(pid)
+        total_rss = root.memory_info().rss
+        for child in root.children(recursive=True):
+            try:
+                total_rss += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total_rss
+    except Exception as e:
+        logger.debug(f"Não foi possível medir memória do Chrome: {str(e)}")
+        return 0
+
+
+def driver_pid(driver):
+    """PID do chromedriver (raiz da árvore de processos do Chrome)"""
+    try:
+        return driver.service.process.pid
+    except Exception:
+        return None
+
+
+class MemoryWatchdog:
+    """Thread de amostragem de memória + decisão de reciclagem entre novelties"""
+
+    def __init__(self, pid_getter, on_sample=None, tab_limit_mb=CHROME_TAB_RECYCLE_MB,
+                 driver_limit_mb=CHROME_DRIVER_RECYCLE_MB, tab_every=RECYCLE_TAB_EVERY,
+                 driver_every=RECYCLE_DRIVER_EVERY, min_novelties=RECYCLE_MIN_NOVELTIES,
+                 interval=WATCHDOG_SAMPLE_SECONDS, log_interval=WATCHDOG_LOG_SECONDS):
+        self.pid_getter = pid_getter
+        self.on_sample = on_sample
+        self.tab_limit = tab_limit_mb * MB
+        self.driver_limit = driver_limit_mb * MB
+        self.tab_every = tab_every
+        self.driver_every = driver_every
+        self.min_novelties = min_novelties
+        self.interval = interval
+        self.log_interval = log_interval
+        self.last_rss = 0
+        self.peak_rss = 0
+        self.since_tab_recycle = 0
+        self.since_driver_recycle = 0
+        # Primeira reciclagem por memória pode acontecer já na primeira verificação
+        self.since_recycle = min_novelties
+        self.escalation = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def sample(self):
+        """Mede a árvore de processos agora e atualiza o último valor"""
+        rss = measure_process_tree_rss(self.pid_getter())
+        if rss:
+            self.last_rss = rss
+            self.peak_rss = max(self.peak_rss, rss)
+            if self.on_sample:
+                self.on_sample(rss)
+        return rss
+
+    def headroom_line(self):
+        """Resumo: RSS atual, margem até as reciclagens e memória livre do sistema"""
+        parts = [f"RSS Chrome {self.last_rss / MB:.0f} MB (pico {self.peak_rss / MB:.0f} MB)"]
+        if self.tab_limit:
+            parts.append(f"margem até reciclar guia {(self.tab_limit - self.last_rss) / MB:.0f} MB")
+        if self.driver_limit:
+            parts.append(f"até reciclar navegador {(self.driver_limit - self.last_rss) / MB:.0f} MB")
+        if psutil is not None:
+            parts.append(f"livre no sistema {psutil.virtual_memory().available / MB:.0f} MB")
+        return " | ".join(parts)
+
+    def _loop(self):
+        elapsed_since_log = 0.0
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+            elapsed_since_log += self.interval
+            if elapsed_since_log >= self.log_interval:
+                elapsed_since_log = 0.0
+                logger.info(f"🧠 {self.headroom_line()}")
+
+    def start(self):
+        """Inicia a amostragem em segundo plano (sem psutil, só a reciclagem por contagem funciona)"""
+        if psutil is None:
+            logger.warning("⚠️ psutil indisponível - watchdog de memória só recicla por contagem")
+            return
+        self.stop_event.clear()
+        self.sample()
+        logger.info(f"🧠 Watchdog de memória iniciado: {self.headroom_line()}")
+        self.thread = threading.Thread(target=self._loop, name="memory-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=self.interval + 1)
+            self.thread = None
+
+    def record_novelty(self):
+        """Conta uma novelty processada (com sucesso ou não) desde as últimas reciclagens"""
+        self.since_tab_recycle += 1
+        self.since_driver_recycle += 1
+        self.since_recycle += 1
+
+    def recycled(self, kind):
+        """
+        Zera os contadores após reciclar e mede de novo para a próxima decisão
+        Se a guia nova continua acima do limite, a próxima verificação recicla o navegador
+        Retorna o motivo da escalada ou None
+        """
+        self.since_tab_recycle = 0
+        self.since_recycle = 0
+        if kind == RECYCLE_DRIVER:
+            self.since_driver_recycle = 0
+        self.last_rss = 0
+        self.escalation = None
+        rss = self.sample()
+        if kind == RECYCLE_TAB and self.tab_limit and rss >= self.tab_limit:
+            self.escalation = f"RSS {rss / MB:.0f} MB continua ≥ {self.tab_limit / MB:.0f} MB após reciclar a guia"
+            logger.warning(f"⚠️ {self.escalation} - reciclando o navegador")
+        return self.escalation
+
+    def check(self):
+        """
+        Chamado entre novelties (nunca com modal aberto)
+        Retorna (RECYCLE_DRIVER | RECYCLE_TAB | None, motivo)
+        """
+        if self.escalation:
+            return RECYCLE_DRIVER, self.escalation
+        rss = self.last_rss
+        # Por memória só depois de min_novelties desde a última reciclagem
+        memory_due = self.since_recycle >= self.min_novelties
+        if memory_due and self.driver_limit and rss >= self.driver_limit:
+            return RECYCLE_DRIVER, f"RSS {rss / MB:.0f} MB ≥ {self.driver_limit / MB:.0f} MB"
+        if self.driver_every and self.since_driver_recycle >= self.driver_every:
+            return RECYCLE_DRIVER, f"{self.since_driver_recycle} novelties com o mesmo navegador"
+        if memory_due and self.tab_limit and rss >= self.tab_limit:
+            return RECYCLE_TAB, f"RSS {rss / MB:.0f} MB ≥ {self.tab_limit / MB:.0f} MB"
+        if self.tab_every and self.since_tab_recycle >= self.tab_every:
+            return RECYCLE_TAB, f"{self.since_tab_recycle} novelties na mesma guia"
+        return None, None
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métricas compartilhadas entre o bot e o monitor
+Contadores, gauges e histogramas exportados no formato texto do Prometheus,
+gravados em arquivo (textfile) ou servidos pelo endpoint /metrics do monitor
+"""
+
+import os
+import time
+import threading
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Arquivo onde o bot grava as métricas ao final de cada execução
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE", os.path.join("metrics", "dropi_bot.prom"))
+
+# Buckets padrão (segundos) para latências
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape_label_value(value):
+    """Escapa valores de label conforme o formato texto do Prometheus"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    """Formata o bloco {label="valor",...}"""
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.extend(f'{name}="{_escape_label_value(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    """Formata número no padrão do Prometheus"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base comum: nome, ajuda, labels e valores por combinação de labels"""
+    metric_type = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values = {}
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels):
+        missing = set(self.labelnames) - set(labels)
+        if missing:
+            raise ValueError(f"Labels ausentes para {self.name}: {sorted(missing)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+        with self.lock:
+            lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self.values.items())
+        ]
+
+
+class Counter(_Metric):
+    """Contador monotônico"""
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        with self.lock:
+            return self.values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Valor instantâneo"""
+    metric_type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def get(self, **labels):
+        with self.lock:
+            return self.values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Histograma com buckets cumulativos, soma e contagem"""
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self.values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Mede a duração do bloco (registra mesmo se houver exceção)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_samples(self):
+        lines = []
+        for key, state in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas de um processo"""
+
+    def __init__(self):
+        self.metrics = []
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            self.metrics.append(metric)
+
+    def render(self):
+        """Gera o texto no formato de exposição do Prometheus"""
+        with self.lock:
+            metrics = list(self.metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path=METRICS_TEXTFILE):
+        """Grava as métricas de forma atômica (compatível com o textfile collector)"""
+        try:
+            directory = os.path.dirname(path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+            logger.info(f"📈 Métricas gravadas em {path}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Erro ao gravar métricas: {str(e)}")
+            return False
+
+
+# Registro do bot (gravado em METRICS_TEXTFILE) e do monitor (servido em /metrics junto com o do bot)
+REGISTRY = MetricsRegistry()
+MONITOR_REGISTRY = MetricsRegistry()
+
+# Métricas do bot
+NOVELTIES_PROCESSED = Counter(
+    "dropi_novelties_processed_total", "Novelties processadas com sucesso",
+    ["country", "incident_type"]
+)
+NOVELTIES_FAILED = Counter(
+    "dropi_novelties_failed_total", "Novelties com falha no processamento",
+    ["country", "incident_type"]
+)
+STEP_DURATION = Histogram(
+    "dropi_step_duration_seconds", "Duração de cada etapa da automação",
+    ["step"]
+)
+WEBDRIVER_COMMANDS = Counter(
+    "dropi_webdriver_commands_total", "Comandos enviados ao chromedriver",
+    ["command"]
+)
+WEBDRIVER_COMMAND_DURATION = Histogram(
+    "dropi_webdriver_command_duration_seconds", "Latência dos comandos ao chromedriver por método do bot",
+    ["method"], buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+CHROME_RSS_BYTES = Gauge(
+    "dropi_chrome_rss_bytes", "Memória residente do chromedriver e processos do Chrome",
+    ["country"]
+)
+NOVELTY_RETRIES = Counter(
+    "dropi_novelty_failures_by_reason_total", "Tentativas com falha por motivo (inclusive as recuperadas em retentativa)",
+    ["country", "reason"]
+)
+CHROME_RECYCLES = Counter(
+    "dropi_chrome_recycles_total", "Reciclagens da guia ou do navegador pelo watchdog de memória",
+    ["kind"]
+)
+GOVERNOR_RATE = Gauge(
+    "dropi_governor_rate_per_second", "Taxa atual do governador de navegações e envios"
+)
+GOVERNOR_WAIT = Histogram(
+    "dropi_governor_wait_seconds", "Espera por uma vaga no governador de taxa",
+    ["kind"], buckets=(0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+)
+GOVERNOR_BACKOFFS = Counter(
+    "dropi_governor_backoffs_total", "Reduções da taxa do governador por motivo",
+    ["outcome"]
+)
+LAST_RUN_TIMESTAMP = Gauge(
+    "dropi_last_run_timestamp_seconds", "Horário (epoch) do fim da última execução",
+    ["country"]
+)
+
+# Métricas do banco (db_connection.py) no bot; o monitor usa as equivalentes abaixo
+DB_CALL_DURATION = Histogram(
+    "dropi_db_call_duration_seconds", "Duração das chamadas ao banco de dados",
+    ["operation"]
+)
+HISTORY_CACHE_REQUESTS = Counter(
+    "dropi_history_cache_requests_total", "Consultas ao cache de get_execution_history",
+    ["result"]
+)
+DISCORD_CALL_DURATION = Histogram(
+    "dropi_discord_call_duration_seconds", "Duração das chamadas ao webhook do Discord"
+)
+
+# Métricas do monitor (nomes distintos para não colidir com as do bot no /metrics)
+MONITOR_PROBE_DURATION = Histogram(
+    "dropi_monitor_probe_duration_seconds", "Duração das verificações do monitor",
+    ["probe"], registry=MONITOR_REGISTRY
+)
+MONITOR_DISCORD_CALL_DURATION = Histogram(
+    "dropi_monitor_discord_call_duration_seconds", "Duração das chamadas do monitor ao webhook do Discord",
+    registry=MONITOR_REGISTRY
+)
+MONITOR_DB_CALL_DURATION = Histogram(
+    "dropi_monitor_db_call_duration_seconds", "Duração das chamadas do monitor ao banco de dados",
+    ["operation"], registry=MONITOR_REGISTRY
+)
+MONITOR_HISTORY_CACHE_REQUESTS = Counter(
+    "dropi_monitor_history_cache_requests_total", "Consultas do monitor ao cache de get_execution_history",
+    ["result"], registry=MONITOR_REGISTRY
+)
+
+
+def read_textfile(path=METRICS_TEXTFILE):
+    """Lê métricas gravadas por outro processo (ex: o bot) para reexposição"""
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+    except Exception as e:
+        logger.warning(f"Não foi possível ler métricas de {path}: {str(e)}")
+    return ""
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estado do modal de novelties acompanhado dentro da página
+Um MutationObserver (instalado uma vez por carregamento de página) recalcula o estado do modal
+a cada mutação do DOM e registra as transições em uma fila no JS:
+    closed -> open -> confirm (botão Yes/Sim) -> form (campos visíveis) -> closed
+O Python lê a fila em uma única ida ao navegador por etapa: a espera é uma Promise que resolve
+assim que a transição acontece, sem polling nem pausas fixas (o timeout só vale no pior caso)
+"""
+
+import os
+import logging
+
+from browser_backend import IS_VISIBLE_JS
+
+logger = logging.getLogger("dropi_automation_cron")
+
+MODAL_CLOSED = "closed"
+MODAL_OPEN = "open"
+MODAL_CONFIRM = "confirm"
+MODAL_FORM = "form"
+MODAL_VISIBLE_STATES = (MODAL_OPEN, MODAL_CONFIRM, MODAL_FORM)
+
+# Tempo máximo (s) de cada etapa; equivalem às pausas fixas + esperas que existiam antes
+MODAL_OPEN_TIMEOUT = float(os.getenv("MODAL_OPEN_TIMEOUT", "15"))
+MODAL_CONFIRM_TIMEOUT = float(os.getenv("MODAL_CONFIRM_TIMEOUT", "5"))
+MODAL_FORM_TIMEOUT = float(os.getenv("MODAL_FORM_TIMEOUT", "5"))
+MODAL_CLOSE_TIMEOUT = float(os.getenv("MODAL_CLOSE_TIMEOUT", "8"))
+
+MAX_QUEUED_EVENTS = 100
+
+# Instala o observer se a página ainda não tem um (cada carregamento começa sem window.__dropiModal)
+INSTALL_JS = """
+const installed = !window.__dropiModal;
+if (installed) {
+    const isVisible = %(is_visible)s;
+    const confirmPattern = /\\b(yes|sim)\\b/i;
+    const modal = window.__dropiModal = {state: null, events: [], waiters: []};
+    modal.confirmButton = () => Array.from(document.querySelectorAll('button'))
+        .find(b => confirmPattern.test(b.textContent) && isVisible(b));
+    const currentState = () => {
+        if (modal.confirmButton()) return 'confirm';
+        const open = Array.from(document.querySelectorAll('.modal'))
+            .filter(m => m.style.display === 'block' || isVisible(m));
+        if (!open.length) return 'closed';
+        return open.some(m => Array.from(m.querySelectorAll('input, textarea, select')).some(isVisible)) ? 'form' : 'open';
+    };
+    modal.update = () => {
+        const state = currentState();
+        if (state === modal.state) return;
+        modal.state = state;
+        modal.events.push({state: state, at: Math.round(performance.now())});
+        if (modal.events.length > %(max_events)d) modal.events.shift();
+        modal.waiters = modal.waiters.filter(waiter => !waiter(state));
+    };
+    modal.drain = () => ({state: modal.state, events: modal.events.splice(0)});
+    new MutationObserver(modal.update).observe(document.documentElement, {
+        childList: true, subtree: true, attributes: true, attributeFilter: ['style', 'class']
+    });
+    modal.update();
+}
+""" % {"is_visible": IS_VISIBLE_JS, "max_events": MAX_QUEUED_EVENTS}
+
+INSTALL_SCRIPT = INSTALL_JS + "return installed;"
+
+# Resolve na primeira transição para um dos estados pedidos (ou no timeout) com a fila drenada
+WAIT_SCRIPT = INSTALL_JS + """
+const states = arguments[0];
+const timeoutMs = arguments[1] * 1000;
+const modal = window.__dropiModal;
+modal.update();
+if (states.includes(modal.state)) return modal.drain();
+return new Promise(resolve => {
+    const waiter = (state) => {
+        if (!states.includes(state)) return false;
+        clearTimeout(timer);
+        resolve(modal.drain());
+        return true;
+    };
+    const timer = setTimeout(() => {
+        modal.waiters = modal.waiters.filter(w => w !== waiter);
+        resolve(modal.drain());
+    }, timeoutMs);
+    modal.waiters.push(waiter);
+});
+"""
+
+CLICK_CONFIRM_SCRIPT = INSTALL_JS + """
+const button = window.__dropiModal.confirmButton();
+if (!button) return null;
+button.click();
+return button.textContent.trim();
+"""
+
+
+class ModalWatcher:
+    """Lê o estado do modal mantido pelo MutationObserver da página (via backend do navegador)"""
+
+    def __init__(self, browser):
+        self.browser = browser
+
+    def install(self):
+        """Instala o observer na página atual; True se acabou de instalar"""
+        try:
+            return bool(self.browser.evaluate(INSTALL_SCRIPT))
+        except Exception as e:
+            logger.debug(f"Observer do modal não instalado: {str(e)}")
+            return False
+
+    def wait_for(self, states, timeout):
+        """
+        Espera o modal chegar a um dos estados (retorna na hora se já estiver).
+        Retorna o estado atual ao fim da espera, ou None se a página não respondeu
+        (ex: navegação no meio da espera)
+        """
+        try:
+            result = self.browser.evaluate(WAIT_SCRIPT, list(states), timeout)
+        except Exception as e:
+            logger.debug(f"Estado do modal indisponível: {str(e)}")
+            return None
+        result = result or {}
+        events = result.get("events") or []
+        if events:
+            logger.debug("🪟 Modal: " + " → ".join(f"{event['state']} ({event['at']}ms)" for event in events))
+        return result.get("state")
+
+    def click_confirm(self):
+        """Clica no botão Yes/Sim visível; retorna o texto do botão ou None"""
+        return self.browser.evaluate(CLICK_CONFIRM_SCRIPT)
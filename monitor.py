@@ -13,8 +13,18 @@ import json
 import subprocess
 import psutil
 import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from pathlib import Path
 
+from log_scanner import LogScanner, read_last_lines, format_log_line
+from history_analytics import load_history_analytics, report_lines as analytics_report_lines
+from country_profiles import get_enabled_profiles
+from discord_digest import DiscordDigest
+from metrics import MONITOR_REGISTRY, MONITOR_PROBE_DURATION, MONITOR_DISCORD_CALL_DURATION, read_textfile
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,52 +35,163 @@ logger = logging.getLogger(__name__)
 # Discord webhook para notificações de monitoramento
 DISCORD_WEBHOOK_URL = "https://discord.com/api/webhooks/1379273630290284606/h1I670CtBauZ0J7_Oq2K5pPJOIZEAHkfI_9-gexG4jmMI0g5bMxRODt85BEcMyX_vkN_"
 
+# Timeout (segundos) de cada verificação executada em paralelo
+PROBE_TIMEOUTS = {
+    "process": 5,
+    "log": 5,
+    "resources": 3,
+    "database": 5,
+    "analytics": 15
+}
+
+# Tempo (segundos) que o resultado de cada verificação permanece em cache
+# (a análise do histórico só muda quando o bot termina uma execução)
+PROBE_TTL = {
+    "process": 10,
+    "log": 15,
+    "resources": 5,
+    "database": 30,
+    "analytics": int(os.getenv("HISTORY_ANALYTICS_TTL", "600"))
+}
+
+# Modo serve: endpoint HTTP local e intervalo de amostragem em segundo plano
+MONITOR_HOST = os.getenv("MONITOR_HOST", "0.0.0.0")
+MONITOR_PORT = int(os.getenv("MONITOR_PORT", os.getenv("PORT", "8080")))
+MONITOR_SAMPLE_INTERVAL = int(os.getenv("MONITOR_SAMPLE_INTERVAL", "30"))
+
+# Problemas que não tornam o /health indisponível: o bot roda por cron e fica parado entre
+# as execuções, e a regressão de vazão é tendência do histórico, não falha do serviço
+HEALTH_IGNORED_PROBLEMS = ("bot_parado", "regressao_vazao")
+
+# Janela mínima (s) das medições de CPU: leituras sem bloqueio mais próximas que isso são ruído
+# e a CPU é informada como indisponível (nenhuma verificação espera pela janela)
+CPU_SAMPLE_SECONDS = 1.0
+
+# Resultado usado quando a verificação não termina dentro do timeout
+PROBE_TIMEOUT_RESULTS = {
+    "process": {"running": False},
+    "log": {"exists": False},
+    "resources": {},
+    "database": {"connected": False},
+    "analytics": {}
+}
+
+def format_cpu(cpu_percent):
+    """CPU para o relatório (None = primeira leitura, ainda sem janela de medição)"""
+    return "indisponível (primeira leitura)" if cpu_percent is None else f"{cpu_percent:.1f}%"
+
+def health_problems(problems):
+    """Problemas que fazem o /health responder 503"""
+    return [problem for problem in problems if problem not in HEALTH_IGNORED_PROBLEMS]
+
+def problems_key(problems):
+    """Chave de supressão dos alertas do monitor: o mesmo conjunto de problemas é o mesmo alerta"""
+    return "monitor:" + ",".join(sorted(problems))
+
 class DroplMonitor:
     def __init__(self):
         self.bot_process_name = "chile_background_bot.py"
-        self.log_file = "automation.log"
+        self.log_file = os.getenv("LOG_FILE", "automation.jsonl")
+        self.log_scanner = LogScanner(self.log_file)
+        
+        # Verificações em paralelo com cache por TTL
+        self.probe_executor = ThreadPoolExecutor(max_workers=len(PROBE_TIMEOUTS), thread_name_prefix="probe")
+        self.probe_cache = {}
+        self.probe_futures = {}
+        self.probe_lock = threading.Lock()
+        self.bot_pid = None
+        self.bot_proc = None
+        self.discord_digest = DiscordDigest("🔍 Monitor", self.build_discord_embed, self.post_discord_embed)
         
-    def send_discord_notification(self, message, is_error=False):
-        """Envia notificação para Discord"""
+        # Consultas do monitor ao banco entram no /metrics do monitor
         try:
-            color = 0xFF0000 if is_error else 0x0099FF  # Vermelho para erro, azul para info
-            
-            embed = {
-                "embeds": [{
-                    "title": "🔍 Monitor Dropi Chile",
-                    "description": message,
-                    "color": color,
-                    "timestamp": datetime.datetime.now().isoformat(),
-                    "footer": {
-                        "text": "Railway Monitor"
-                    }
-                }]
+            from db_connection import use_monitor_metrics
+            use_monitor_metrics()
+        except ImportError:
+            logger.warning("Módulo db_connection não encontrado - sem métricas do banco no monitor")
+        
+        # Primeira leitura de CPU sem bloqueio (as seguintes medem desde esta)
+        psutil.cpu_percent(interval=None)
+        self.cpu_sampled_at = time.monotonic()
+        
+    def send_discord_notification(self, message, is_error=False, key=None):
+        """
+        Notifica o Discord: relatórios críticos vão na hora (o mesmo conjunto de problemas
+        é suprimido na janela), os demais entram no resumo periódico
+        """
+        self.discord_digest.notify(message, critical=is_error, key=key)
+    
+    def build_discord_embed(self, message, is_error=False):
+        """Embed das notificações do monitor"""
+        color = 0xFF0000 if is_error else 0x0099FF  # Vermelho para erro, azul para info
+        
+        return {
+            "title": "🔍 Monitor Dropi Chile",
+            "description": message,
+            "color": color,
+            "timestamp": datetime.datetime.now().isoformat(),
+            "footer": {
+                "text": "Railway Monitor"
             }
-            
-            response = requests.post(DISCORD_WEBHOOK_URL, json=embed, timeout=10)
+        }
+    
+    def post_discord_embed(self, embed):
+        """Envia um embed via webhook; retorna True em caso de sucesso"""
+        try:
+            with MONITOR_DISCORD_CALL_DURATION.time():
+                response = requests.post(DISCORD_WEBHOOK_URL, json={"embeds": [embed]}, timeout=10)
             if response.status_code == 204:
                 logger.info("Notificação de monitoramento enviada")
-            else:
-                logger.warning(f"Falha ao enviar notificação: {response.status_code}")
+                return True
+            logger.warning(f"Falha ao enviar notificação: {response.status_code}")
+            return False
                 
         except Exception as e:
             logger.error(f"Erro ao enviar notificação: {str(e)}")
+            return False
+    
+    def _describe_bot_process(self, proc):
+        """
+        Monta o status a partir do processo do bot. O psutil.Process fica guardado entre as
+        verificações: cpu_percent sem bloqueio mede desde a chamada anterior no mesmo objeto
+        """
+        if self.bot_proc is None or self.bot_proc.pid != proc.pid:
+            # Processo novo: a leitura sem bloqueio só inicia a medição, a CPU fica indisponível
+            self.bot_proc = proc
+            proc.cpu_percent(interval=None)
+            cpu_percent = None
+        else:
+            cpu_percent = self.bot_proc.cpu_percent(interval=None)
+        proc = self.bot_proc
+        return {
+            "running": True,
+            "pid": proc.pid,
+            "memory_mb": proc.memory_info().rss / 1024 / 1024,
+            "cpu_percent": cpu_percent,
+            "create_time": datetime.datetime.fromtimestamp(proc.create_time())
+        }
     
     def check_process_status(self):
         """Verifica se o processo do bot está rodando"""
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+            # Primeiro confere o PID encontrado na verificação anterior
+            if self.bot_pid:
+                try:
+                    proc = self.bot_proc if self.bot_proc and self.bot_proc.pid == self.bot_pid else psutil.Process(self.bot_pid)
+                    if proc.is_running() and self.bot_process_name in ' '.join(proc.cmdline()):
+                        return self._describe_bot_process(proc)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+                self.bot_pid = None
+                self.bot_proc = None
+            
+            for proc in psutil.process_iter(['pid', 'cmdline']):
                 try:
                     if proc.info['cmdline']:
                         cmdline = ' '.join(proc.info['cmdline'])
                         if self.bot_process_name in cmdline:
-                            return {
-                                "running": True,
-                                "pid": proc.info['pid'],
-                                "memory_mb": proc.memory_info().rss / 1024 / 1024,
-                                "cpu_percent": proc.cpu_percent(),
-                                "create_time": datetime.datetime.fromtimestamp(proc.create_time())
-                            }
+                            self.bot_pid = proc.info['pid']
+                            return self._describe_bot_process(proc)
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     continue
             
@@ -80,43 +201,26 @@ class DroplMonitor:
             return {"running": False, "error": str(e)}
     
     def check_log_file(self):
-        """Verifica logs recentes"""
+        """Verifica logs recentes (leitura incremental a partir do último checkpoint)"""
         try:
             if not os.path.exists(self.log_file):
                 return {"exists": False}
             
-            # Obtém informações do arquivo
-            stat = os.stat(self.log_file)
+            # Lê apenas os bytes novos desde a última verificação
+            stat = self.log_scanner.scan()
             last_modified = datetime.datetime.fromtimestamp(stat.st_mtime)
             file_size_mb = stat.st_size / 1024 / 1024
             
-            # Lê últimas linhas do log
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                last_lines = lines[-10:] if len(lines) >= 10 else lines
-            
-            # Conta erros recentes (última hora)
-            recent_errors = 0
-            one_hour_ago = datetime.datetime.now() - datetime.timedelta(hours=1)
-            
-            for line in last_lines:
-                if "ERROR" in line or "ERRO" in line:
-                    try:
-                        # Tenta extrair timestamp da linha
-                        if line.startswith("20"):  # Formato YYYY-MM-DD
-                            timestamp_str = line[:19]  # YYYY-MM-DD HH:MM:SS
-                            timestamp = datetime.datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-                            if timestamp > one_hour_ago:
-                                recent_errors += 1
-                    except:
-                        recent_errors += 1  # Conta mesmo se não conseguir parsear timestamp
+            # Conta erros recentes (última hora) pelos contadores por minuto
+            recent_errors = self.log_scanner.count_errors(minutes=60)
             
             return {
                 "exists": True,
                 "last_modified": last_modified,
                 "size_mb": round(file_size_mb, 2),
                 "recent_errors": recent_errors,
-                "last_lines": [line.strip() for line in last_lines[-3:]]  # Últimas 3 linhas
+                "errors_24h": self.log_scanner.count_errors(minutes=24 * 60),
+                "last_lines": [format_log_line(line) for line in read_last_lines(self.log_file, 3)]  # Últimas 3 linhas
             }
             
         except Exception as e:
@@ -126,8 +230,12 @@ class DroplMonitor:
     def check_system_resources(self):
         """Verifica recursos do sistema"""
         try:
-            # CPU
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU sem bloqueio (mede desde a leitura anterior); em status/health a leitura
+            # anterior é a do __init__, milissegundos antes: sem janela real, fica indisponível
+            cpu_percent = None
+            if time.monotonic() - self.cpu_sampled_at >= CPU_SAMPLE_SECONDS:
+                cpu_percent = psutil.cpu_percent(interval=None)
+                self.cpu_sampled_at = time.monotonic()
             
             # Memória
             memory = psutil.virtual_memory()
@@ -159,7 +267,10 @@ class DroplMonitor:
             
             try:
                 from db_connection import get_connection
-                conn = get_connection()
+                conn = get_connection(
+                    connect_timeout=PROBE_TIMEOUTS["database"],
+                    statement_timeout_ms=PROBE_TIMEOUTS["database"] * 1000
+                )
                 cursor = conn.cursor()
                 cursor.execute("SELECT 1")
                 cursor.fetchone()
@@ -173,15 +284,101 @@ class DroplMonitor:
             logger.error(f"Erro ao verificar banco de dados: {str(e)}")
             return {"connected": False, "error": str(e)}
     
-    def generate_status_report(self):
+    def check_history_analytics(self):
+        """Vazão, taxa de sucesso e duração das últimas execuções por país (ver history_analytics.py)"""
+        try:
+            countries = [profile.source_country for profile in get_enabled_profiles(default="chile")]
+            return load_history_analytics(countries)
+        except Exception as e:
+            logger.error(f"Erro ao analisar histórico de execuções: {str(e)}")
+            return {"error": str(e)}
+    
+    def _timed_probe(self, name, probe):
+        """Executa a verificação registrando sua duração nas métricas"""
+        with MONITOR_PROBE_DURATION.time(probe=name):
+            return probe()
+    
+    def run_probes(self):
+        """
+        Executa as verificações em paralelo, cada uma com seu timeout e cache por TTL.
+        Uma verificação travada (ex: banco) retorna erro de timeout sem atrasar as demais
+        """
+        probes = {
+            "process": self.check_process_status,
+            "log": self.check_log_file,
+            "resources": self.check_system_resources,
+            "database": self.check_database_connection,
+            "analytics": self.check_history_analytics
+        }
+        
+        results = {}
+        pending = {}
+        now = time.monotonic()
+        
+        with self.probe_lock:
+            for name, probe in probes.items():
+                cached = self.probe_cache.get(name)
+                if cached and now - cached[0] < PROBE_TTL[name]:
+                    results[name] = cached[1]
+                    continue
+                
+                # Reaproveita uma execução ainda em andamento em vez de empilhar outra
+                future = self.probe_futures.get(name)
+                if future is None or future.done():
+                    future = self.probe_executor.submit(self._timed_probe, name, probe)
+                    self.probe_futures[name] = future
+                pending[name] = future
+        
+        for name, future in pending.items():
+            remaining = max(0, PROBE_TIMEOUTS[name] - (time.monotonic() - now))
+            try:
+                result = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                logger.warning(f"Verificação '{name}' excedeu {PROBE_TIMEOUTS[name]}s")
+                results[name] = dict(PROBE_TIMEOUT_RESULTS[name], error=f"Timeout após {PROBE_TIMEOUTS[name]}s")
+                continue
+            except Exception as e:
+                results[name] = dict(PROBE_TIMEOUT_RESULTS[name], error=str(e))
+                continue
+            
+            with self.probe_lock:
+                self.probe_cache[name] = (time.monotonic(), result)
+            results[name] = result
+        
+        return results
+    
+    def detect_problems(self, probe_results):
+        """Retorna a lista de problemas críticos encontrados nas verificações"""
+        process_status = probe_results["process"]
+        log_info = probe_results["log"]
+        system_resources = probe_results["resources"]
+        db_status = probe_results["database"]
+        
+        checks = [
+            ("bot_parado", not process_status.get('running')),
+            ("log_ausente", not log_info.get('exists')),
+            ("muitos_erros", log_info.get('recent_errors', 0) > 5),
+            ("banco_desconectado", not db_status.get('connected')),
+            ("memoria_alta", system_resources.get('memory_percent', 0) > 90),
+            ("disco_cheio", system_resources.get('disk_percent', 0) > 90),
+            ("regressao_vazao", any(
+                isinstance(data, dict) and data.get("regression")
+                for data in probe_results.get("analytics", {}).values()
+            ))
+        ]
+        return [name for name, failed in checks if failed]
+    
+    def generate_status_report(self, probe_results=None):
         """Gera relatório completo de status"""
         logger.info("Gerando relatório de status...")
         
-        # Coleta informações
-        process_status = self.check_process_status()
-        log_info = self.check_log_file()
-        system_resources = self.check_system_resources()
-        db_status = self.check_database_connection()
+        # Coleta informações (em paralelo)
+        if probe_results is None:
+            probe_results = self.run_probes()
+        process_status = probe_results["process"]
+        log_info = probe_results["log"]
+        system_resources = probe_results["resources"]
+        db_status = probe_results["database"]
         
         # Monta relatório
         report = f"""📊 **Relatório de Status - {datetime.datetime.now().strftime('%d/%m/%Y %H:%M')}**
@@ -194,7 +391,7 @@ class DroplMonitor:
             report += f"""
 • PID: {process_status.get('pid')}
 • Memória: {process_status.get('memory_mb', 0):.1f} MB
-• CPU: {process_status.get('cpu_percent', 0):.1f}%
+• CPU: {format_cpu(process_status.get('cpu_percent'))}
 • Uptime: {str(uptime).split('.')[0]}"""
         
         report += f"""
@@ -207,7 +404,7 @@ class DroplMonitor:
             report += f"""
 • Tamanho: {log_info.get('size_mb', 0)} MB
 • Última atualização: {time_since_update.seconds // 60} min atrás
-• Erros recentes: {log_info.get('recent_errors', 0)}"""
+• Erros recentes: {log_info.get('recent_errors', 0)} (24h: {log_info.get('errors_24h', 0)})"""
             
             if log_info.get('last_lines'):
                 report += f"\n• Última linha: `{log_info['last_lines'][-1][:50]}...`"
@@ -218,7 +415,7 @@ class DroplMonitor:
         
         if 'error' not in system_resources:
             report += f"""
-• CPU: {system_resources.get('cpu_percent', 0):.1f}%
+• CPU: {format_cpu(system_resources.get('cpu_percent'))}
 • Memória: {system_resources.get('memory_percent', 0):.1f}% (livre: {system_resources.get('memory_available_gb', 0)} GB)
 • Disco: {system_resources.get('disk_percent', 0):.1f}% (livre: {system_resources.get('disk_free_gb', 0)} GB)"""
         else:
@@ -232,15 +429,14 @@ class DroplMonitor:
         if not db_status.get('connected') and db_status.get('error'):
             report += f"\n• Erro: {db_status['error'][:100]}"
         
+        analytics = probe_results.get("analytics", {})
+        if analytics.get("error"):
+            report += f"\n\n📈 **Vazão do Bot:**\n❌ Erro na análise do histórico: {analytics['error'][:100]}"
+        elif analytics:
+            report += "\n\n📈 **Vazão do Bot:**\n" + "\n".join(analytics_report_lines(analytics))
+        
         # Determina se há problemas críticos
-        is_critical = (
-            not process_status.get('running') or
-            not log_info.get('exists') or
-            log_info.get('recent_errors', 0) > 5 or
-            not db_status.get('connected') or
-            system_resources.get('memory_percent', 0) > 90 or
-            system_resources.get('disk_percent', 0) > 90
-        )
+        is_critical = bool(self.detect_problems(probe_results))
         
         return report, is_critical
     
@@ -249,10 +445,13 @@ class DroplMonitor:
         try:
             logger.info("Iniciando verificação de saúde...")
             
-            report, is_critical = self.generate_status_report()
+            probe_results = self.run_probes()
+            report, is_critical = self.generate_status_report(probe_results)
             
-            # Envia notificação
-            self.send_discord_notification(report, is_error=is_critical)
+            # Envia notificação (alertas identificados pelo conjunto de problemas)
+            self.send_discord_notification(
+                report, is_error=is_critical, key=problems_key(self.detect_problems(probe_results))
+            )
             
             if is_critical:
                 logger.warning("⚠️ Problemas críticos detectados!")
@@ -267,6 +466,130 @@ class DroplMonitor:
             self.send_discord_notification(error_report, is_error=True)
             return False
 
+class MonitorDaemon:
+    """
+    Modo serve: amostra o estado em segundo plano e serve o último snapshot em JSON.
+    O Discord só é notificado quando o conjunto de problemas muda
+    """
+    
+    def __init__(self, monitor, host=MONITOR_HOST, port=MONITOR_PORT, interval=MONITOR_SAMPLE_INTERVAL):
+        self.monitor = monitor
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.snapshot_lock = threading.Lock()
+        self.snapshot_body = b'{"status": "starting"}'
+        self.is_healthy = False
+        self.last_problems = None
+        self.stop_event = threading.Event()
+    
+    def build_snapshot(self, probe_results, problems):
+        """Monta o snapshot serializável a partir das verificações"""
+        if health_problems(problems):
+            status = "critical"
+        else:
+            status = "warning" if problems else "ok"
+        return {
+            "timestamp": datetime.datetime.now().isoformat(),
+            "status": status,
+            "problems": problems,
+            "process": probe_results["process"],
+            "log": probe_results["log"],
+            "resources": probe_results["resources"],
+            "database": probe_results["database"],
+            "analytics": probe_results.get("analytics", {})
+        }
+    
+    def sample_once(self):
+        """Executa as verificações, atualiza o snapshot e alerta em mudanças de estado"""
+        probe_results = self.monitor.run_probes()
+        problems = self.monitor.detect_problems(probe_results)
+        snapshot = self.build_snapshot(probe_results, problems)
+        
+        # Serializa uma vez por amostra; as requisições apenas devolvem os bytes
+        body = json.dumps(snapshot, default=str, ensure_ascii=False).encode('utf-8')
+        with self.snapshot_lock:
+            self.snapshot_body = body
+            self.is_healthy = not health_problems(problems)
+        
+        if self.last_problems is None or set(problems) != set(self.last_problems):
+            if self.last_problems is not None or problems:
+                report, is_critical = self.monitor.generate_status_report(probe_results)
+                self.monitor.send_discord_notification(report, is_error=is_critical, key=problems_key(problems))
+            logger.info(f"Estado do monitor: {snapshot['status']} {problems}")
+        self.last_problems = problems
+    
+    def sampler_loop(self):
+        """Loop de amostragem em segundo plano"""
+        while not self.stop_event.is_set():
+            try:
+                self.sample_once()
+            except Exception as e:
+                logger.error(f"Erro na amostragem do monitor: {str(e)}")
+            self.monitor.discord_digest.flush_if_due()
+            self.stop_event.wait(self.interval)
+    
+    def get_snapshot(self):
+        """Retorna (saudável, corpo JSON) do último snapshot"""
+        with self.snapshot_lock:
+            return self.is_healthy, self.snapshot_body
+    
+    def make_handler(self):
+        """Cria o handler HTTP ligado a este daemon"""
+        daemon = self
+        
+        class SnapshotHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if path == "/health":
+                    healthy, body = daemon.get_snapshot()
+                    status_code = 200 if healthy else 503
+                elif path in ("/", "/status"):
+                    _, body = daemon.get_snapshot()
+                    status_code = 200
+                elif path == "/metrics":
+                    # Métricas do monitor + últimas métricas gravadas pelo bot
+                    body = (MONITOR_REGISTRY.render() + read_textfile()).encode('utf-8')
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                else:
+                    body = b'{"error": "not found"}'
+                    status_code = 404
+                
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                # Evita uma linha de log por requisição de health check
+                logger.debug(f"HTTP {self.address_string()} - {format % args}")
+        
+        return SnapshotHandler
+    
+    def serve_forever(self):
+        """Inicia a amostragem e o servidor HTTP (bloqueia até interrupção)"""
+        sampler = threading.Thread(target=self.sampler_loop, name="monitor-sampler", daemon=True)
+        sampler.start()
+        
+        server = ThreadingHTTPServer((self.host, self.port), self.make_handler())
+        server.daemon_threads = True
+        logger.info(f"🌐 Monitor servindo em http://{self.host}:{self.port} (amostragem a cada {self.interval}s)")
+        
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Monitor interrompido")
+        finally:
+            self.stop_event.set()
+            server.server_close()
+
 def main():
     """Função principal"""
     logger.info("=== INICIANDO MONITOR DROPI CHILE ===")
@@ -287,8 +610,19 @@ def main():
             success = monitor.run_health_check()
             return 0 if success else 1
             
+        elif command == "serve":
+            # Daemon com endpoint HTTP de health
+            MonitorDaemon(monitor).serve_forever()
+            return 0
+            
+        elif command == "digest":
+            # Envia agora o resumo pendente do Discord
+            sent = monitor.discord_digest.flush()
+            print("Resumo enviado" if sent else "Nada para enviar")
+            return 0
+            
         else:
-            print("Uso: python monitor.py [status|health]")
+            print("Uso: python monitor.py [status|health|serve|digest]")
             return 1
     else:
         # Execução padrão - verificação completa
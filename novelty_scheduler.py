@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agendador de novelties por prioridade
+Ordena as linhas pendentes por prazo da transportadora, tipo de incidência e idade,
+para que as mais urgentes/antigas não fiquem esperando atrás das demais
+"""
+
+import os
+import re
+import json
+import hashlib
+import datetime
+import logging
+
+from country_profiles import INCIDENT_UNKNOWN
+
+logger = logging.getLogger("dropi_automation_cron")
+
+# Prioridade por tipo de incidência (menor = mais urgente). Sobrescreva com NOVELTY_PRIORITIES (JSON)
+DEFAULT_INCIDENT_PRIORITIES = {
+    "RECHAZO DE ENTREGA": 1,
+    "CLIENTE AUSENTE": 2,
+    "PROBLEMA DE ENDEREÇO": 2,
+    "PROBLEMA COBRO": 3,
+    INCIDENT_UNKNOWN: 4
+}
+
+# Prazos da transportadora que vencem dentro deste intervalo passam na frente de tudo
+DEADLINE_URGENT_HOURS = float(os.getenv("NOVELTY_DEADLINE_URGENT_HOURS", "24"))
+
+DATE_PATTERNS = [
+    (re.compile(r'\b(\d{4})-(\d{2})-(\d{2})(?:[ T](\d{2}):(\d{2}))?'), "ymd"),
+    (re.compile(r'\b(\d{2})[/-](\d{2})[/-](\d{4})(?:\s+(\d{2}):(\d{2}))?'), "dmy")
+]
+
+
+def load_incident_priorities():
+    """Prioridades padrão combinadas com NOVELTY_PRIORITIES (ex: '{"PROBLEMA COBRO": 1}')"""
+    priorities = dict(DEFAULT_INCIDENT_PRIORITIES)
+    raw = os.getenv("NOVELTY_PRIORITIES")
+    if raw:
+        try:
+            priorities.update({key.upper(): int(value) for key, value in json.loads(raw).items()})
+        except Exception as e:
+            logger.warning(f"⚠️ NOVELTY_PRIORITIES inválido, usando padrão: {str(e)}")
+    return priorities
+
+
+def extract_dates(texts):
+    """Extrai todas as datas (YYYY-MM-DD ou DD/MM/YYYY, com hora opcional) das células"""
+    dates = []
+    for text in texts:
+        for pattern, order in DATE_PATTERNS:
+            for match in pattern.finditer(text):
+                try:
+                    if order == "ymd":
+                        year, month, day = int(match.group(1)), int(match.group(2)), int(match.group(3))
+                    else:
+                        day, month, year = int(match.group(1)), int(match.group(2)), int(match.group(3))
+                    hour = int(match.group(4) or 0)
+                    minute = int(match.group(5) or 0)
+                    dates.append(datetime.datetime(year, month, day, hour, minute))
+                except ValueError:
+                    continue
+    return dates
+
+
+def pending_fingerprint(snapshot, classify_incident, attempted_ids=None):
+    """
+    Hash das pendentes: IDs dos pedidos + tipo de incidência, ordenados.
+    attempted_ids (fim da execução): retorna None se alguma pendente não foi tentada nesta
+    execução. As que falharam em todas as tentativas entram no hash, então um backlog
+    inalterado de pedidos travados não impede que a próxima execução seja pulada
+    """
+    if attempted_ids is not None and any(row["order_id"] not in attempted_ids for row in snapshot):
+        return None
+    entries = sorted(f"{row['order_id']}|{classify_incident(' '.join(row['cells']))[0]}" for row in snapshot)
+    return hashlib.sha256("\n".join(entries).encode('utf-8')).hexdigest()
+
+
+class NoveltyScheduler:
+    """Classifica o snapshot de pendentes e acompanha a conclusão por nível de prioridade"""
+
+    def __init__(self, classify_incident, priorities=None, deadline_urgent_hours=DEADLINE_URGENT_HOURS):
+        self.classify_incident = classify_incident
+        self.priorities = priorities or load_incident_priorities()
+        self.deadline_urgent_hours = deadline_urgent_hours
+        self.stats = {}
+        self.seen_ids = set()
+
+    def describe_row(self, row, now=None):
+        """Anota a linha com tipo de incidência, prioridade, idade (h) e prazo"""
+        now = now or datetime.datetime.now()
+        incident_type = self.classify_incident(" ".join(row["cells"]))[0]
+        dates = extract_dates(row["cells"])
+        past_dates = [d for d in dates if d <= now]
+        future_dates = [d for d in dates if d > now]
+
+        age_hours = (now - min(past_dates)).total_seconds() / 3600 if past_dates else 0.0
+        deadline = min(future_dates) if future_dates else None
+        urgent = deadline is not None and (deadline - now).total_seconds() / 3600 <= self.deadline_urgent_hours
+
+        priority = 0 if urgent else self.priorities.get(incident_type, self.priorities.get(INCIDENT_UNKNOWN, 99))
+        return dict(row, incident_type=incident_type, priority=priority, age_hours=age_hours, deadline=deadline)
+
+    def rank(self, snapshot):
+        """Ordena as linhas: prazo urgente, prioridade do tipo, mais antiga primeiro, posição na tabela"""
+        now = datetime.datetime.now()
+        ranked = [self.describe_row(row, now) for row in snapshot]
+        ranked.sort(key=lambda row: (row["priority"], -row["age_hours"], row["index"]))
+
+        # Contabiliza cada pedido uma única vez no total por prioridade
+        for row in ranked:
+            if row["order_id"] not in self.seen_ids:
+                self.seen_ids.add(row["order_id"])
+                self._level(row["priority"])["pending"] += 1
+        return ranked
+
+    def _level(self, priority):
+        return self.stats.setdefault(priority, {"pending": 0, "processed": 0, "failed": 0})
+
+    def record(self, row, success):
+        """Registra o resultado do processamento de uma linha ranqueada"""
+        self._level(row["priority"])["processed" if success else "failed"] += 1
+
+    def summary_lines(self):
+        """Linhas de resumo por prioridade (para log e Discord)"""
+        lines = []
+        for priority, level in sorted(self.stats.items()):
+            label = "P0 (prazo urgente)" if priority == 0 else f"P{priority}"
+            lines.append(
+                f"{label}: {level['processed']}/{level['pending']} concluídas, {level['failed']} falhas"
+            )
+        return lines
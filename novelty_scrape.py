@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitura em lote da tabela de novelties (modo scrape, somente leitura)
+Todas as linhas vêm em uma única chamada de script; a classificação da incidência
+(regras das mensagens automáticas) e o parse dos endereços são feitos em lote com pandas,
+sem abrir nenhum modal. O resultado é gravado em Parquet (ou CSV) em SCRAPE_DIR
+"""
+
+import os
+import re
+import datetime
+import logging
+
+import pandas as pd
+
+from country_profiles import INCIDENT_UNKNOWN
+from novelty_scheduler import extract_dates
+
+logger = logging.getLogger("dropi_automation_cron")
+
+SCRAPE_DIR = os.getenv("SCRAPE_DIR", "scrapes")
+
+# parquet (requer pyarrow ou fastparquet; sem eles grava CSV) ou csv
+SCRAPE_FORMAT = os.getenv("SCRAPE_FORMAT", "parquet").strip().lower()
+
+# Coluna da tabela com o endereço (padrão: detectada pelo cabeçalho)
+SCRAPE_ADDRESS_COLUMN = os.getenv("SCRAPE_ADDRESS_COLUMN", "")
+ADDRESS_HEADER_HINTS = ("DIRECCI", "ADDRESS", "ENDERE", "DOMICILIO")
+
+# Cabeçalhos e todas as linhas visíveis da tabela em uma única ida ao navegador
+SCRAPE_ROWS_SCRIPT = """
+const table = document.querySelector('table');
+if (!table) return {headers: [], rows: []};
+const headers = Array.from(table.querySelectorAll('thead th')).map(th => th.innerText.trim());
+const rows = [];
+table.querySelectorAll('tbody tr').forEach((row, index) => {
+    if (row.offsetParent === null) return;
+    const pending = Array.from(row.querySelectorAll('button.btn-success')).some(b => b.offsetParent !== null);
+    rows.push({index: index, pending: pending, cells: Array.from(row.querySelectorAll('td')).map(c => c.innerText.trim())});
+});
+return {headers: headers, rows: rows};
+"""
+
+
+def column_names(headers, width):
+    """Nomes das colunas das células: cabeçalho normalizado ou col_<n>, sem repetições"""
+    names = []
+    for position in range(width):
+        header = headers[position] if position < len(headers) else ""
+        name = re.sub(r'\W+', '_', header.strip().lower()).strip('_') or f"col_{position}"
+        while name in names:
+            name = f"{name}_{position}"
+        names.append(name)
+    return names
+
+
+def classify_incidents(texts, incident_rules):
+    """
+    Tipo e mensagem automática para uma Series de textos (maiúsculos), na ordem das regras:
+    a primeira regra que corresponde vence, como em classify_incident
+    """
+    incident_type = pd.Series(INCIDENT_UNKNOWN, index=texts.index)
+    message = pd.Series("", index=texts.index)
+    unmatched = pd.Series(True, index=texts.index)
+    for rule_type, phrases, rule_message in incident_rules:
+        pattern = "|".join(re.escape(phrase) for phrase in phrases)
+        matched = unmatched & texts.str.contains(pattern, regex=True)
+        incident_type[matched] = rule_type
+        message[matched] = rule_message
+        unmatched &= ~matched
+    return incident_type, message
+
+
+def parse_addresses(addresses, address_parser):
+    """Componentes de endereço para uma Series, chamando o parser uma vez por endereço distinto"""
+    unique = addresses.dropna().unique()
+    parsed = {address: address_parser(address, verbose=False) for address in unique}
+    components = pd.DataFrame.from_dict(parsed, orient="index")
+    return components.reindex(addresses.values).set_axis(addresses.index)
+
+
+def find_address_column(columns, headers):
+    if SCRAPE_ADDRESS_COLUMN:
+        return SCRAPE_ADDRESS_COLUMN if SCRAPE_ADDRESS_COLUMN in columns else None
+    for column, header in zip(columns, headers):
+        if any(hint in header.upper() for hint in ADDRESS_HEADER_HINTS):
+            return column
+    return None
+
+
+def build_novelty_dataset(scraped, profile, now=None):
+    """DataFrame com uma linha por novelty: células, pendente, tipo, mensagem, idade e endereço"""
+    now = now or datetime.datetime.now()
+    rows = scraped.get("rows") or []
+    headers = scraped.get("headers") or []
+    if not rows:
+        return pd.DataFrame()
+
+    width = max(len(row["cells"]) for row in rows)
+    columns = column_names(headers, width)
+    df = pd.DataFrame([row["cells"] + [""] * (width - len(row["cells"])) for row in rows], columns=columns)
+    df.insert(0, "country", profile.source_country)
+    df.insert(1, "order_id", df[columns[0]])
+    df.insert(2, "table_index", [row["index"] for row in rows])
+    df.insert(3, "pending", [row["pending"] for row in rows])
+
+    row_text = df[columns].agg(" ".join, axis=1).str.upper().str.strip()
+    df["incident_type"], df["automatic_message"] = classify_incidents(row_text, profile.incident_rules)
+
+    # Idade pela data mais antiga já passada nas células; prazo pela próxima data futura
+    dates = df[columns].apply(lambda cells: extract_dates(list(cells)), axis=1)
+    oldest = dates.map(lambda values: min((d for d in values if d <= now), default=None))
+    deadline = dates.map(lambda values: min((d for d in values if d > now), default=None))
+    df["age_hours"] = ((now - pd.to_datetime(oldest)).dt.total_seconds() / 3600).round(1)
+    df["deadline"] = pd.to_datetime(deadline)
+
+    address_column = find_address_column(columns, headers)
+    if address_column:
+        df = df.join(parse_addresses(df[address_column], profile.address_parser).add_prefix("address_"))
+    else:
+        logger.warning("⚠️ Coluna de endereço não encontrada na tabela (SCRAPE_ADDRESS_COLUMN) - sem parse de endereços")
+
+    df["scraped_at"] = now
+    return df
+
+
+def write_dataset(df, country, output_dir=SCRAPE_DIR, file_format=SCRAPE_FORMAT):
+    """Grava o dataset em <dir>/<pais>_<data>.parquet (ou .csv). Retorna o caminho ou None"""
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        base_path = os.path.join(output_dir, f"{country}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        if file_format == "parquet":
+            try:
+                df.to_parquet(f"{base_path}.parquet", index=False)
+                return f"{base_path}.parquet"
+            except ImportError:
+                logger.warning("⚠️ Parquet indisponível (instale pyarrow) - gravando CSV")
+        df.to_csv(f"{base_path}.csv", index=False)
+        return f"{base_path}.csv"
+    except Exception as e:
+        logger.error(f"❌ Erro ao gravar dataset de novelties: {str(e)}")
+        return None
+
+
+def summary_lines(df, top_n=10):
+    """Resumo do backlog para o log: tipos de incidência, comunas e idade"""
+    if df.empty:
+        return []
+    pending = df[df["pending"]]
+    lines = [f"Linhas: {len(df)} ({len(pending)} pendentes)"]
+    for incident_type, count in pending["incident_type"].value_counts().items():
+        lines.append(f"{incident_type}: {count}")
+    if "address_comuna" in pending:
+        comunas = pending["address_comuna"].replace("", pd.NA).dropna().value_counts().head(top_n)
+        if not comunas.empty:
+            lines.append("Comunas: " + ", ".join(f"{comuna} ({count})" for comuna, count in comunas.items()))
+    ages = pending["age_hours"].dropna()
+    if not ages.empty:
+        lines.append(f"Idade (h): mediana {ages.median():.0f}, p90 {ages.quantile(0.9):.0f}, máx {ages.max():.0f}")
+    return lines
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfil de desempenho por execução
+PROFILE_RUNS=sample: amostra a pilha da thread da execução e grava stacks no formato "folded"
+(flamegraph.pl, speedscope, inferno), separando o tempo em Python, chamadas HTTP ao
+chromedriver, esperas de página e sleeps fixos.
+PROFILE_RUNS=cprofile: perfil determinístico (cProfile) gravado em .pstats.
+Nos dois modos é gerado um resumo com os top-N pontos quentes: profiles/<run_id>.top.txt
+"""
+
+import os
+import sys
+import time
+import pstats
+import cProfile
+import linecache
+import threading
+import logging
+
+logger = logging.getLogger("dropi_automation_cron")
+
+PROFILE_MODES = ("sample", "cprofile")
+
+_raw_mode = os.getenv("PROFILE_RUNS", "").strip().lower()
+PROFILE_MODE = "sample" if _raw_mode in ["true", "1", "yes"] else (_raw_mode if _raw_mode in PROFILE_MODES else None)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.01"))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "15"))
+PROFILE_DISCORD = os.getenv("PROFILE_DISCORD", "false").lower() in ["true", "1", "yes"]
+
+# Categorias do tempo amostrado (pelo frame mais interno da pilha)
+CATEGORY_SLEEP = "sleep fixo"
+CATEGORY_PAGE_WAIT = "espera de página (WebDriverWait)"
+CATEGORY_WEBDRIVER_HTTP = "HTTP ao chromedriver"
+CATEGORY_PYTHON = "Python"
+
+WEBDRIVER_HTTP_MODULES = (
+    os.sep + "http" + os.sep + "client.py", os.sep + "socket.py", os.sep + "urllib3" + os.sep,
+    "remote_connection.py"
+)
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def classify_frame(frame):
+    """Classifica onde a thread está: sleep, espera de página, HTTP ao chromedriver ou Python"""
+    # Qualquer WebDriverWait na pilha conta como espera de página (inclusive o HTTP de cada tentativa)
+    current = frame
+    while current is not None:
+        code = current.f_code
+        if code.co_name in ("until", "until_not") and code.co_filename.endswith("wait.py"):
+            return CATEGORY_PAGE_WAIT
+        current = current.f_back
+
+    filename = frame.f_code.co_filename
+    if any(marker in filename for marker in WEBDRIVER_HTTP_MODULES):
+        return CATEGORY_WEBDRIVER_HTTP
+    if "time.sleep(" in linecache.getline(filename, frame.f_lineno):
+        return CATEGORY_SLEEP
+    return CATEGORY_PYTHON
+
+
+class SamplingProfiler:
+    """Amostra periodicamente a pilha de uma thread (sys._current_frames)"""
+
+    def __init__(self, thread_ident, interval=PROFILE_SAMPLE_INTERVAL):
+        self.thread_ident = thread_ident
+        self.interval = interval
+        self.stacks = {}
+        self.categories = {}
+        self.self_counts = {}
+        self.total_counts = {}
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_ident)
+        if frame is None:
+            return
+        category = classify_frame(frame)
+        labels = []
+        while frame is not None:
+            labels.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+
+        stack = ";".join(labels + [f"[{category}]"])
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.categories[category] = self.categories.get(category, 0) + 1
+        self.self_counts[labels[-1]] = self.self_counts.get(labels[-1], 0) + 1
+        for label in set(labels):
+            self.total_counts[label] = self.total_counts.get(label, 0) + 1
+        self.samples += 1
+
+    def _loop(self):
+        while not self.stop_event.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._loop, name="profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+    def write_folded(self, path):
+        """Uma linha 'frame;frame;...;frame N' por pilha (entrada do flamegraph.pl / speedscope)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+    def category_lines(self):
+        """Fração e tempo estimado por categoria (sleep, espera de página, HTTP, Python)"""
+        total = max(1, self.samples)
+        return [
+            f"{count / total:6.1%}  ~{count * self.interval:8.1f}s  {category}"
+            for category, count in sorted(self.categories.items(), key=lambda item: -item[1])
+        ]
+
+    def summary_lines(self, top_n=PROFILE_TOP_N):
+        total = max(1, self.samples)
+        seconds = lambda count: count * self.interval
+        lines = [f"Amostras: {self.samples} (a cada {self.interval * 1000:g} ms)", "", "Tempo por categoria:"]
+        lines += [f"  {line}" for line in self.category_lines()]
+        lines += ["", f"Top {top_n} (tempo próprio):"]
+        for label, count in sorted(self.self_counts.items(), key=lambda item: -item[1])[:top_n]:
+            lines.append(f"  {count / total:6.1%}  ~{seconds(count):8.1f}s  {label}")
+        lines += ["", f"Top {top_n} (tempo acumulado):"]
+        for label, count in sorted(self.total_counts.items(), key=lambda item: -item[1])[:top_n]:
+            lines.append(f"  {count / total:6.1%}  ~{seconds(count):8.1f}s  {label}")
+        return lines
+
+    def top_offenders(self, count=5):
+        """(rótulo, fração) das funções com mais tempo próprio, para o Discord"""
+        total = max(1, self.samples)
+        ranked = sorted(self.self_counts.items(), key=lambda item: -item[1])[:count]
+        return [(label, value / total) for label, value in ranked]
+
+
+class RunProfiler:
+    """
+    Context manager que perfila o bloco (na thread atual) e grava os artefatos em
+    profiles/<run_id>.* ao sair
+    """
+
+    def __init__(self, run_id, mode=PROFILE_MODE, output_dir=PROFILE_DIR, top_n=PROFILE_TOP_N):
+        self.run_id = run_id
+        self.mode = mode
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.profiler = None
+        self.artifacts = []
+        self.summary = []
+        self.offenders = []
+        self.elapsed = 0.0
+        self.stopped = False
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        if self.mode == "cprofile":
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.profiler = SamplingProfiler(threading.get_ident())
+            self.profiler.start()
+        logger.info(f"🔬 Perfil de desempenho ativado ({self.mode}) para a execução {self.run_id}")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def stop(self):
+        """Encerra o perfil e grava os artefatos (só na primeira chamada; o bloco with também chama)"""
+        if self.stopped:
+            return
+        self.stopped = True
+        self.elapsed = time.perf_counter() - self.started
+        try:
+            if self.mode == "cprofile":
+                self.profiler.disable()
+            else:
+                self.profiler.stop()
+            self.write_artifacts()
+        except Exception as e:
+            logger.error(f"❌ Erro ao gravar perfil de desempenho: {str(e)}")
+
+    def _path(self, suffix):
+        return os.path.join(self.output_dir, f"{self.run_id}{suffix}")
+
+    def write_artifacts(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        if self.mode == "cprofile":
+            stats_path = self._path(".pstats")
+            self.profiler.dump_stats(stats_path)
+            self.artifacts.append(stats_path)
+            stats = pstats.Stats(self.profiler)
+            self.summary = self._cprofile_summary(stats)
+        else:
+            folded_path = self._path(".folded")
+            self.profiler.write_folded(folded_path)
+            self.artifacts.append(folded_path)
+            self.summary = self.profiler.summary_lines(self.top_n)
+            self.offenders = self.profiler.top_offenders()
+
+        summary_path = self._path(".top.txt")
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write(f"Execução {self.run_id} - {self.elapsed:.1f}s ({self.mode})\n\n")
+            f.write("\n".join(self.summary) + "\n")
+        self.artifacts.append(summary_path)
+
+        logger.info(f"🔬 Perfil gravado: {', '.join(self.artifacts)}")
+        for line in self.summary[:12]:
+            if line:
+                logger.info(f"  {line}")
+
+    def _cprofile_summary(self, stats):
+        """Top-N por tempo próprio e por tempo acumulado a partir do cProfile"""
+        entries = stats.stats.items()
+        total = max(stats.total_tt, 1e-9)
+        lines = [f"Chamadas: {stats.total_calls}, tempo total de CPU perfilado: {stats.total_tt:.1f}s", ""]
+
+        lines.append(f"Top {self.top_n} (tempo próprio):")
+        by_self = sorted(entries, key=lambda item: -item[1][2])[:self.top_n]
+        for (filename, lineno, name), (_, calls, tottime, _, _) in by_self:
+            lines.append(f"  {tottime / total:6.1%}  {tottime:8.2f}s  {calls:7d}x  {name} ({os.path.basename(filename)}:{lineno})")
+
+        lines += ["", f"Top {self.top_n} (tempo acumulado):"]
+        by_cumulative = sorted(entries, key=lambda item: -item[1][3])[:self.top_n]
+        for (filename, lineno, name), (_, calls, _, cumtime, _) in by_cumulative:
+            lines.append(f"  {cumtime:8.2f}s  {calls:7d}x  {name} ({os.path.basename(filename)}:{lineno})")
+
+        self.offenders = [
+            (f"{name} ({os.path.basename(filename)}:{lineno})", tottime / total)
+            for (filename, lineno, name), (_, _, tottime, _, _) in by_self[:5]
+        ]
+        return lines
+
+    def discord_message(self):
+        """Resumo curto dos maiores ofensores para a notificação"""
+        message = f"🔬 **Perfil da execução {self.run_id}** ({self.mode}, {self.elapsed / 60:.1f} min)"
+        if self.mode != "cprofile" and self.profiler.samples:
+            message += "\n\n⏱️ **Por categoria:**\n" + "\n".join(
+                f"• {line.strip()}" for line in self.profiler.category_lines()
+            )
+        if self.offenders:
+            message += "\n\n🔥 **Top ofensores:**"
+            for label, fraction in self.offenders:
+                message += f"\n• {fraction:.1%} {label}"
+        message += f"\n\n📁 {', '.join(self.artifacts)}"
+        return message
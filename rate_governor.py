@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Governador de taxa das navegações e envios ao Dropi
+Um token bucket compartilhado por todos os bots do processo (inclusive os países em paralelo
+no pool) limita operações por segundo, e um semáforo limita quantas ficam em andamento ao
+mesmo tempo. A taxa se ajusta sozinha (AIMD): sobe um pouco a cada operação saudável e cai
+pela metade, com pausa, em 429/5xx ou página de erro; respostas lentas reduzem de leve.
+As respostas vêm do log de performance do Chrome (eventos Network.*)
+"""
+
+import os
+import re
+import json
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from metrics import GOVERNOR_RATE, GOVERNOR_WAIT, GOVERNOR_BACKOFFS
+
+logger = logging.getLogger("dropi_automation_cron")
+
+# Operações por segundo: inicial, limites e rajada máxima do token bucket
+GOVERNOR_RATE_PER_SECOND = float(os.getenv("GOVERNOR_RATE_PER_SECOND", "0.5"))
+GOVERNOR_MIN_RATE = float(os.getenv("GOVERNOR_MIN_RATE", "0.05"))
+GOVERNOR_MAX_RATE = float(os.getenv("GOVERNOR_MAX_RATE", "2"))
+GOVERNOR_BURST = float(os.getenv("GOVERNOR_BURST", "2"))
+
+# Operações em andamento ao mesmo tempo (somando todos os países)
+GOVERNOR_MAX_CONCURRENCY = int(os.getenv("GOVERNOR_MAX_CONCURRENCY", "2"))
+
+# Aumento aditivo por operação saudável e fatores de redução
+GOVERNOR_RATE_STEP = float(os.getenv("GOVERNOR_RATE_STEP", "0.05"))
+GOVERNOR_BACKOFF_FACTOR = 0.5
+GOVERNOR_SLOW_FACTOR = 0.8
+
+# Resposta acima deste tempo (s) conta como lenta
+GOVERNOR_SLOW_SECONDS = float(os.getenv("GOVERNOR_SLOW_SECONDS", "5"))
+
+# Pausa após 429/5xx (dobra a cada ocorrência seguida, até o máximo); Retry-After tem prioridade
+GOVERNOR_COOLDOWN_SECONDS = float(os.getenv("GOVERNOR_COOLDOWN_SECONDS", "10"))
+GOVERNOR_MAX_COOLDOWN_SECONDS = float(os.getenv("GOVERNOR_MAX_COOLDOWN_SECONDS", "300"))
+
+# Leitura do log de performance do Chrome (desligado: sem ajuste por rede, só pelo tempo de página)
+GOVERNOR_NETWORK_LOG = os.getenv("GOVERNOR_NETWORK_LOG", "true").lower() in ["true", "1", "yes"]
+
+# Hosts observados (trechos do nome; respostas de terceiros não afetam a taxa)
+GOVERNOR_HOSTS = [host.strip() for host in os.getenv("GOVERNOR_HOSTS", "dropi").split(",") if host.strip()]
+
+# Tempo máximo esperando a resposta de um envio antes de liberar a vaga
+GOVERNOR_SUBMIT_TIMEOUT = float(os.getenv("GOVERNOR_SUBMIT_TIMEOUT", "10"))
+
+OUTCOME_OK = "ok"
+OUTCOME_SLOW = "lento"
+OUTCOME_THROTTLED = "http_429"
+OUTCOME_SERVER_ERROR = "http_5xx"
+OUTCOME_ERROR_PAGE = "pagina_erro"
+
+# Gravidade para escolher o pior resultado de um lote de respostas
+OUTCOME_SEVERITY = {OUTCOME_OK: 0, OUTCOME_SLOW: 1, OUTCOME_ERROR_PAGE: 2, OUTCOME_SERVER_ERROR: 3, OUTCOME_THROTTLED: 4}
+BACKOFF_OUTCOMES = (OUTCOME_THROTTLED, OUTCOME_SERVER_ERROR, OUTCOME_ERROR_PAGE)
+
+OBSERVED_RESOURCE_TYPES = ("XHR", "Fetch", "Document")
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+MAX_PENDING_REQUESTS = 500
+
+# Título e início do texto da página, para reconhecer páginas de erro do servidor/proxy
+ERROR_PAGE_SCRIPT = "return document.title + ' ' + (document.body ? document.body.innerText.slice(0, 300) : '');"
+ERROR_PAGE_PATTERN = re.compile(
+    r"too many requests|bad gateway|service (temporarily )?unavailable|gateway time-?out|"
+    r"internal server error|rate limit exceeded",
+    re.IGNORECASE
+)
+
+
+def is_error_page(text):
+    return bool(text) and bool(ERROR_PAGE_PATTERN.search(text))
+
+
+def worst_outcome(responses, slow_seconds=GOVERNOR_SLOW_SECONDS):
+    """(resultado, retry_after) mais grave de uma lista de respostas; (None, None) se vazia"""
+    outcome, retry_after = None, None
+    for response in responses:
+        status = response["status"]
+        if status == 429:
+            current = OUTCOME_THROTTLED
+        elif status >= 500:
+            current = OUTCOME_SERVER_ERROR
+        elif response["latency"] > slow_seconds:
+            current = OUTCOME_SLOW
+        else:
+            current = OUTCOME_OK
+        if outcome is None or OUTCOME_SEVERITY[current] > OUTCOME_SEVERITY[outcome]:
+            outcome = current
+        if response.get("retry_after"):
+            retry_after = max(retry_after or 0, response["retry_after"])
+    return outcome, retry_after
+
+
+def _retry_after(headers):
+    for name, value in (headers or {}).items():
+        if name.lower() == "retry-after":
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+class NetworkLogWatcher:
+    """Respostas do Dropi no log de performance de um navegador (um por bot: requestIds são por navegador)"""
+
+    def __init__(self, hosts=None):
+        self.hosts = hosts if hosts is not None else GOVERNOR_HOSTS
+        self.pending = {}
+
+    def _observed(self, url):
+        host = urlparse(url).hostname or ""
+        return any(fragment in host for fragment in self.hosts)
+
+    def responses(self, entries):
+        """Respostas concluídas nas entradas: status, latência (s), método e Retry-After"""
+        responses = []
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+            request_id = params.get("requestId")
+
+            if method == "Network.requestWillBeSent":
+                request = params.get("request", {})
+                if params.get("type") in OBSERVED_RESOURCE_TYPES and self._observed(request.get("url", "")):
+                    self.pending[request_id] = (params.get("timestamp", 0), request.get("method", "GET"))
+            elif method == "Network.responseReceived" and request_id in self.pending:
+                started, request_method = self.pending.pop(request_id)
+                response = params.get("response", {})
+                responses.append({
+                    "status": int(response.get("status") or 0),
+                    "latency": max(0.0, params.get("timestamp", started) - started),
+                    "method": request_method,
+                    "retry_after": _retry_after(response.get("headers"))
+                })
+            elif method == "Network.loadingFailed":
+                self.pending.pop(request_id, None)
+
+        # Requisições sem resposta (ex: página trocada no meio) não acumulam para sempre
+        if len(self.pending) > MAX_PENDING_REQUESTS:
+            for request_id in sorted(self.pending, key=lambda key: self.pending[key][0])[:len(self.pending) - MAX_PENDING_REQUESTS]:
+                del self.pending[request_id]
+        return responses
+
+
+class RateGovernor:
+    """Token bucket + limite de concorrência com taxa adaptativa (AIMD)"""
+
+    def __init__(self, rate=GOVERNOR_RATE_PER_SECOND, min_rate=GOVERNOR_MIN_RATE, max_rate=GOVERNOR_MAX_RATE,
+                 burst=GOVERNOR_BURST, max_concurrency=GOVERNOR_MAX_CONCURRENCY):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.burst = max(1.0, burst)
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.consecutive_backoffs = 0
+        self.outcomes = {}
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        GOVERNOR_RATE.set(self.rate)
+
+    def _refill(self, now):
+        # Durante a pausa por backoff o bucket não acumula (sem rajada logo depois)
+        if now < self.paused_until:
+            self.updated = now
+            return
+        self.tokens = min(self.burst, self.tokens + (now - max(self.updated, self.paused_until)) * self.rate)
+        self.updated = now
+
+    def _take_token(self):
+        """Espera um token (e o fim de uma pausa por backoff); retorna o tempo esperado"""
+        started = time.monotonic()
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return now - started
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(min(wait, 1.0))
+
+    @contextmanager
+    def slot(self, kind):
+        """Vaga para uma operação (navegar, enviar): token do bucket e limite de concorrência"""
+        waited = self._take_token()
+        self.slots.acquire()
+        GOVERNOR_WAIT.observe(waited, kind=kind)
+        if waited >= 1:
+            logger.debug(f"🚦 {kind}: aguardou {waited:.1f}s pelo governador ({self.rate:.2f} op/s)")
+        try:
+            yield
+        finally:
+            self.slots.release()
+
+    def record(self, outcome, retry_after=None):
+        """Ajusta a taxa pelo resultado de uma operação"""
+        if outcome is None:
+            return
+        with self.lock:
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            previous = self.rate
+            if outcome == OUTCOME_OK:
+                self.consecutive_backoffs = 0
+                self.rate = min(self.max_rate, self.rate + GOVERNOR_RATE_STEP)
+            elif outcome == OUTCOME_SLOW:
+                self.rate = max(self.min_rate, self.rate * GOVERNOR_SLOW_FACTOR)
+            else:
+                self.consecutive_backoffs += 1
+                self.rate = max(self.min_rate, self.rate * GOVERNOR_BACKOFF_FACTOR)
+                pause = retry_after or min(
+                    GOVERNOR_MAX_COOLDOWN_SECONDS, GOVERNOR_COOLDOWN_SECONDS * 2 ** (self.consecutive_backoffs - 1)
+                )
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+                self.tokens = 0.0
+            rate = self.rate
+        GOVERNOR_RATE.set(rate)
+
+        if outcome in BACKOFF_OUTCOMES:
+            GOVERNOR_BACKOFFS.inc(outcome=outcome)
+            logger.warning(f"🚦 {outcome}: taxa {previous:.2f} → {rate:.2f} op/s, pausa de {pause:.0f}s")
+        elif outcome == OUTCOME_SLOW:
+            GOVERNOR_BACKOFFS.inc(outcome=outcome)
+            logger.info(f"🐢 Resposta lenta do Dropi: taxa {previous:.2f} → {rate:.2f} op/s")
+
+    def state(self):
+        with self.lock:
+            return {
+                "taxa_op_s": round(self.rate, 2),
+                "pausado_por_s": round(max(0.0, self.paused_until - time.monotonic()), 1),
+                "resultados": dict(self.outcomes)
+            }
+
+
+# Compartilhado por todos os bots do processo
+GOVERNOR = RateGovernor()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor de replay das gravações (run_recorder.py)
+Serve os snapshots do DOM de uma execução real com os tempos de rede originais,
+para rodar benchmarks e testes de regressão de process_all_novelties sem acessar o Dropi
+
+Uso:
+    python replay_server.py serve recordings/chile_20240101_120000 [porta]
+    python replay_server.py benchmark recordings/chile_20240101_120000
+    python replay_server.py compare-backends recordings/chile_20240101_120000 [rodadas]
+"""
+
+import os
+import re
+import sys
+import copy
+import json
+import base64
+import time
+import threading
+import logging
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from run_recorder import MANIFEST_FILE
+
+logger = logging.getLogger("dropi_automation_cron")
+
+REPLAY_HOST = os.getenv("REPLAY_HOST", "127.0.0.1")
+REPLAY_PORT = int(os.getenv("REPLAY_PORT", "8765"))
+
+# 1.0 = tempos originais, 2.0 = duas vezes mais rápido, 0 = sem espera
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", "1.0"))
+
+SCRIPT_TAG = re.compile(r'<script\b[^>]*>.*?</script\s*>', re.IGNORECASE | re.DOTALL)
+STYLESHEET_LINK = re.compile(r'<link\b[^>]*rel=["\']?(?:stylesheet|preload|modulepreload)[^>]*>', re.IGNORECASE)
+HTML_INNER = re.compile(r'<html\b[^>]*>(.*)</html\s*>', re.IGNORECASE | re.DOTALL)
+
+YES_TEXTS = ("yes", "sim")
+
+# Shim injetado nas páginas: cada clique em botão pede ao servidor a próxima etapa gravada
+REPLAY_SHIM = """
+<script>
+document.addEventListener('click', function (event) {
+    var button = event.target.closest ? event.target.closest('button') : null;
+    if (!button) { return; }
+    var request = new XMLHttpRequest();
+    request.open('POST', '/__replay/advance', true);
+    request.setRequestHeader('Content-Type', 'application/json');
+    request.onload = function () {
+        if (request.status === 200) { document.documentElement.innerHTML = request.responseText; }
+    };
+    request.send(JSON.stringify({text: (button.innerText || '').trim(), className: button.className || ''}));
+}, true);
+</script>
+"""
+
+
+def is_close_button(button):
+    class_name = button.get("className", "")
+    return "close" in class_name.split() or button.get("text", "").strip() in ("×", "Close", "Cerrar", "Fechar")
+
+
+# Clique que leva a cada etapa gravada (cliques que não combinam são ignorados)
+STEP_TRIGGERS = {
+    "modal": lambda button: "btn-success" in button.get("className", ""),
+    "form": lambda button: button.get("text", "").strip().lower() in YES_TEXTS,
+    "after_save": lambda button: not is_close_button(button) and button.get("text", "").strip().lower() not in YES_TEXTS
+}
+
+
+class Recording:
+    """Gravação carregada do disco: snapshots (limpos para replay) e respostas de rede por URL"""
+
+    def __init__(self, folder):
+        self.folder = folder
+        with open(os.path.join(folder, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.snapshots = self.manifest["snapshots"]
+        if not self.snapshots:
+            raise ValueError(f"Gravação sem snapshots: {folder}")
+
+        self.styles = ""
+        if self.manifest.get("styles"):
+            with open(os.path.join(folder, self.manifest["styles"]), 'r', encoding='utf-8') as f:
+                self.styles = f.read()
+
+        # Respostas por (método, caminho+query), na ordem em que foram gravadas
+        self.responses = {}
+        for entry in self.manifest["network"]:
+            self.responses.setdefault(self.network_key(entry["method"], entry["url"]), []).append(entry)
+        self.html_cache = {}
+
+    @staticmethod
+    def network_key(method, url):
+        parts = urlsplit(url)
+        return method.upper(), parts.path + (f"?{parts.query}" if parts.query else "")
+
+    def _load_html(self, seq):
+        if seq not in self.html_cache:
+            with open(os.path.join(self.folder, self.snapshots[seq]["file"]), 'r', encoding='utf-8') as f:
+                html = f.read()
+            # Sem os scripts do SPA: a página gravada não tenta falar com o Dropi
+            html = SCRIPT_TAG.sub("", html)
+            html = STYLESHEET_LINK.sub("", html)
+            self.html_cache[seq] = html
+        return self.html_cache[seq]
+
+    def page(self, seq):
+        """Documento completo da etapa, com o CSS gravado e o shim de replay"""
+        html = self._load_html(seq)
+        head = f"<style>{self.styles}</style>{REPLAY_SHIM}"
+        if "</head>" in html:
+            return html.replace("</head>", head + "</head>", 1)
+        return head + html
+
+    def inner(self, seq):
+        """Conteúdo de <html> da etapa (substituído pelo shim sem recarregar a página)"""
+        html = self._load_html(seq)
+        match = HTML_INNER.search(html)
+        inner_html = match.group(1) if match else html
+        return f"<style>{self.styles}</style>" + inner_html
+
+    def response(self, method, path, index):
+        """Resposta gravada para method+path (em ordem, repetindo a última)"""
+        entries = self.responses.get((method.upper(), path))
+        if not entries:
+            return None
+        entry = entries[min(index, len(entries) - 1)]
+        with open(os.path.join(self.folder, entry["file"]), 'r', encoding='utf-8') as f:
+            return entry, json.load(f)
+
+
+class ReplayState:
+    """Posição atual na linha do tempo da gravação"""
+
+    def __init__(self, recording, speed=REPLAY_SPEED):
+        self.recording = recording
+        self.speed = speed
+        self.lock = threading.Lock()
+        self.cursor = 0
+        self.response_counts = {}
+
+    def reset(self):
+        with self.lock:
+            self.cursor = 0
+            self.response_counts = {}
+
+    def wait(self, seconds):
+        if self.speed > 0 and seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    def advance(self, button):
+        """Avança para a próxima etapa se o clique for o que a provocou na gravação. Retorna o seq ou None"""
+        with self.lock:
+            next_seq = self.cursor + 1
+            if next_seq >= len(self.recording.snapshots):
+                return None
+            trigger = STEP_TRIGGERS.get(self.recording.snapshots[next_seq]["step"])
+            if trigger is None or not trigger(button):
+                return None
+            self.cursor = next_seq
+        # Espera fora do lock: o tempo de rede original da transição
+        self.wait(self.recording.snapshots[next_seq]["latency"])
+        return next_seq
+
+    def next_response_index(self, key):
+        with self.lock:
+            index = self.response_counts.get(key, 0)
+            self.response_counts[key] = index + 1
+            return index
+
+
+def make_handler(state):
+    recording = state.recording
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def _send(self, status_code, body=b"", content_type="text/html; charset=utf-8"):
+            self.send_response(status_code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _recorded_response(self, method):
+            key = Recording.network_key(method, self.path)
+            found = recording.response(method, key[1], state.next_response_index(key))
+            if not found:
+                return False
+            entry, data = found
+            state.wait(entry["duration"])
+            body = data.get("body", "")
+            if data.get("base64"):
+                payload = base64.b64decode(body)
+            else:
+                payload = body.encode('utf-8')
+            self._send(entry["status"] or 200, payload, entry.get("mime_type") or "application/octet-stream")
+            return True
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/__replay/state":
+                snapshot = recording.snapshots[state.cursor]
+                body = json.dumps({"cursor": state.cursor, "step": snapshot["step"], "total": len(recording.snapshots)})
+                self._send(200, body.encode('utf-8'), "application/json")
+                return
+            # Navegação recebe a etapa atual; chamadas de API recebem a resposta gravada
+            is_navigation = self.headers.get("Accept", "").startswith("text/html")
+            if is_navigation or not self._recorded_response("GET"):
+                self._send(200, recording.page(state.cursor).encode('utf-8'))
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw_body = self.rfile.read(length) if length else b""
+            path = self.path.split("?")[0]
+
+            if path == "/__replay/advance":
+                try:
+                    button = json.loads(raw_body or b"{}")
+                except ValueError:
+                    button = {}
+                seq = state.advance(button)
+                if seq is None:
+                    self._send(204)
+                else:
+                    self._send(200, recording.inner(seq).encode('utf-8'))
+                return
+            if path == "/__replay/reset":
+                state.reset()
+                self._send(204)
+                return
+            if not self._recorded_response("POST"):
+                self._send(404)
+
+        def log_message(self, format, *args):
+            logger.debug(f"replay {self.address_string()} - {format % args}")
+
+    return ReplayHandler
+
+
+class ReplayServer:
+    """Servidor HTTP local de uma gravação (em thread própria)"""
+
+    def __init__(self, folder, host=REPLAY_HOST, port=REPLAY_PORT, speed=REPLAY_SPEED):
+        self.recording = Recording(folder)
+        self.state = ReplayState(self.recording, speed)
+        self.server = ThreadingHTTPServer((host, port), make_handler(self.state))
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="replay-server", daemon=True)
+        self.thread.start()
+        logger.info(
+            f"▶️ Replay de {self.recording.folder} em {self.url} "
+            f"({len(self.recording.snapshots)} etapas, velocidade {self.state.speed:g}x)"
+        )
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def run_benchmark(folder, speed=REPLAY_SPEED):
+    """
+    Executa process_all_novelties contra a gravação e retorna o relatório
+    (sem login, sem banco e sem Discord)
+    """
+    from chile_background_bot import DroplAutomationBot
+    from country_profiles import get_profile
+    from run_controller import RunController
+    from metrics import STEP_DURATION
+
+    server = ReplayServer(folder, port=0, speed=speed).start()
+    profile = copy.copy(get_profile(server.recording.manifest.get("country", "chile")))
+    profile.base_url = server.url
+    profile.login_urls = [server.url]
+
+    bot = DroplAutomationBot(profile=profile)
+    bot.recorder = None
+    bot.send_discord_notification = lambda *args, **kwargs: None
+    started = time.monotonic()
+    try:
+        if not bot.setup_driver():
+            raise Exception("Falha ao configurar o driver Chrome")
+        bot.navigate(profile.novelties_url)
+        bot.process_all_novelties(controller=RunController())
+        report = bot.generate_report()
+    finally:
+        bot.release_driver()
+        server.stop()
+
+    report["tempo_total_s"] = round(time.monotonic() - started, 2)
+    report["etapas_s"] = {
+        key[0]: {"count": value["count"], "sum": round(value["sum"], 2)}
+        for key, value in STEP_DURATION.values.items()
+    }
+    return report
+
+
+def compare_backends(folder, rounds=20):
+    """
+    Mede a vazão das operações de página com cada backend (selenium e cdp) no mesmo Chrome,
+    contra a gravação servida sem esperas de rede. Retorna uma linha de resultado por backend
+    """
+    from chile_background_bot import DroplAutomationBot
+    from browser_backend import BACKEND_SELENIUM, BACKEND_CDP, create_backend, run_workload
+
+    server = ReplayServer(folder, port=0, speed=0).start()
+    bot = DroplAutomationBot()
+    bot.recorder = None
+    results = []
+    try:
+        if not bot.setup_driver():
+            raise Exception("Falha ao configurar o driver Chrome")
+        for name in (BACKEND_SELENIUM, BACKEND_CDP):
+            server.state.reset()
+            backend = create_backend(bot.driver, name)
+            try:
+                results.append(run_workload(backend, server.url, rounds))
+            finally:
+                backend.close()
+    finally:
+        bot.release_driver()
+        server.stop()
+    return results
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("serve", "benchmark", "compare-backends"):
+        print(__doc__)
+        sys.exit(1)
+
+    command, folder = sys.argv[1], sys.argv[2]
+    if command == "serve":
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        port = int(sys.argv[3]) if len(sys.argv) > 3 else REPLAY_PORT
+        server = ReplayServer(folder, port=port).start()
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            server.stop()
+    elif command == "compare-backends":
+        rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+        for result in compare_backends(folder, rounds):
+            print(
+                f"{result['backend']:>9}: {result['operacoes']} operações em {result['tempo_s']:.2f}s "
+                f"({result['operacoes_por_s']:.1f} op/s)"
+            )
+    else:
+        report = run_benchmark(folder)
+        print(json.dumps(report, ensure_ascii=False, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
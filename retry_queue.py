@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fila de retentativas dentro da execução
+Cada falha é classificada pelo motivo; cada motivo tem seu limite de tentativas e backoff
+exponencial. Enquanto espera, o pedido sai da fila de candidatos e as demais linhas seguem
+"""
+
+import time
+import logging
+
+logger = logging.getLogger("dropi_automation_cron")
+
+# Motivos de falha em process_single_novelty
+FAILURE_SAVE_BUTTON_MISSING = "botao_save_ausente"
+FAILURE_MODAL_NOT_SHOWN = "modal_nao_apareceu"
+FAILURE_YES_NOT_CLICKED = "sim_nao_clicado"
+FAILURE_NO_FIELDS = "nenhum_campo_preenchido"
+FAILURE_SAVE_FAILED = "falha_ao_salvar"
+FAILURE_MODAL_STILL_OPEN = "modal_ainda_aberto"
+FAILURE_UNEXPECTED = "erro_inesperado"
+
+FAILURE_DESCRIPTIONS = {
+    FAILURE_SAVE_BUTTON_MISSING: "Botão Save não encontrado",
+    FAILURE_MODAL_NOT_SHOWN: "Modal não apareceu",
+    FAILURE_YES_NOT_CLICKED: "Yes/Sim não clicado",
+    FAILURE_NO_FIELDS: "Nenhum campo preenchido",
+    FAILURE_SAVE_FAILED: "Falha ao salvar formulário",
+    FAILURE_MODAL_STILL_OPEN: "Modal ainda aberto após salvar",
+    FAILURE_UNEXPECTED: "Erro inesperado"
+}
+
+# Política por motivo: tentativas máximas por pedido e atraso base (s) do backoff exponencial
+RETRY_POLICIES = {
+    FAILURE_SAVE_BUTTON_MISSING: {"max_attempts": 2, "base_delay": 10},
+    FAILURE_MODAL_NOT_SHOWN: {"max_attempts": 2, "base_delay": 30},   # geralmente já processado
+    FAILURE_YES_NOT_CLICKED: {"max_attempts": 3, "base_delay": 10},
+    FAILURE_NO_FIELDS: {"max_attempts": 2, "base_delay": 60},         # provável mudança no formulário
+    FAILURE_SAVE_FAILED: {"max_attempts": 3, "base_delay": 15},
+    FAILURE_MODAL_STILL_OPEN: {"max_attempts": 3, "base_delay": 20},
+    FAILURE_UNEXPECTED: {"max_attempts": 2, "base_delay": 20}
+}
+
+MAX_BACKOFF_SECONDS = 300
+
+
+class RetryQueue:
+    """Controla tentativas por pedido e quando cada um pode voltar a ser processado"""
+
+    def __init__(self, policies=None):
+        self.policies = policies or RETRY_POLICIES
+        self.entries = {}
+        self.failure_counts = {}
+
+    def record_failure(self, order_id, reason, row=None, now=None):
+        """
+        Registra uma falha. Retorna True se o pedido será retentado (após o backoff)
+        ou False se esgotou as tentativas do motivo
+        """
+        now = now if now is not None else time.monotonic()
+        policy = self.policies.get(reason, self.policies[FAILURE_UNEXPECTED])
+        entry = self.entries.setdefault(order_id, {"attempts": 0, "reasons": [], "row": row})
+        entry["attempts"] += 1
+        entry["reasons"].append(reason)
+        self.failure_counts[reason] = self.failure_counts.get(reason, 0) + 1
+        entry["last_reason"] = reason
+        if row is not None:
+            entry["row"] = row
+
+        if entry["attempts"] >= policy["max_attempts"]:
+            entry["exhausted"] = True
+            entry["next_at"] = None
+            logger.warning(f"🚫 {order_id}: {FAILURE_DESCRIPTIONS.get(reason, reason)} - tentativas esgotadas ({entry['attempts']})")
+            return False
+
+        delay = min(policy["base_delay"] * (2 ** (entry["attempts"] - 1)), MAX_BACKOFF_SECONDS)
+        entry["exhausted"] = False
+        entry["next_at"] = now + delay
+        logger.info(f"🔁 {order_id}: {FAILURE_DESCRIPTIONS.get(reason, reason)} - nova tentativa em {delay:.0f}s")
+        return True
+
+    def record_success(self, order_id):
+        """Remove o pedido da fila após sucesso numa retentativa"""
+        self.entries.pop(order_id, None)
+
+    def blocked_ids(self, now=None):
+        """Pedidos que não devem ser processados agora (em backoff ou esgotados)"""
+        now = now if now is not None else time.monotonic()
+        return {
+            order_id for order_id, entry in self.entries.items()
+            if entry["exhausted"] or entry["next_at"] > now
+        }
+
+    def seconds_until_next_retry(self, pending_ids, now=None):
+        """Tempo até a próxima retentativa entre os pedidos ainda pendentes na tabela (None se não houver)"""
+        now = now if now is not None else time.monotonic()
+        waits = [
+            entry["next_at"] - now for order_id, entry in self.entries.items()
+            if not entry["exhausted"] and order_id in pending_ids
+        ]
+        return max(0.0, min(waits)) if waits else None
+
+    def unresolved(self):
+        """Pedidos que terminaram a execução sem sucesso"""
+        return dict(self.entries)
+
+    def reason_counts(self):
+        """Quantidade de falhas por motivo (todas as tentativas, inclusive as recuperadas)"""
+        return dict(self.failure_counts)
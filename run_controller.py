@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Controle de tempo da execução
+Substitui o limite fixo de iterações por um orçamento de relógio: a execução termina
+antes do próximo horário do cron, estimando o custo por novelty a partir da vazão real
+"""
+
+import os
+import time
+import logging
+
+logger = logging.getLogger("dropi_automation_cron")
+
+# Intervalo do cron (min) e folga antes do próximo horário; a execução precisa terminar antes dele
+CRON_INTERVAL_MINUTES = float(os.getenv("CRON_INTERVAL_MINUTES", "360"))
+RUN_DEADLINE_MARGIN_MINUTES = float(os.getenv("RUN_DEADLINE_MARGIN_MINUTES", "10"))
+
+# Limite adicional (min) só para o processamento; 0 = apenas o prazo do cron
+RUN_TIME_BUDGET_MINUTES = float(os.getenv("RUN_TIME_BUDGET_MINUTES", "0"))
+
+# Custo estimado (s) por novelty antes da primeira medição
+DEFAULT_NOVELTY_SECONDS = float(os.getenv("DEFAULT_NOVELTY_SECONDS", "45"))
+
+# Peso da última tentativa na média móvel exponencial e margem sobre o custo estimado
+COST_SMOOTHING = 0.3
+COST_SAFETY_FACTOR = 1.2
+
+
+def format_duration(seconds):
+    """Formata segundos como '1h 05min', '12min' ou '40s'"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    hours, minutes = divmod(seconds // 60, 60)
+    return f"{hours}h {minutes:02d}min" if hours else f"{minutes}min"
+
+
+class RunController:
+    """Decide se ainda cabe mais uma novelty no orçamento e projeta o tempo para zerar o backlog"""
+
+    def __init__(self, deadline=None, default_cost=DEFAULT_NOVELTY_SECONDS):
+        self.deadline = deadline  # time.monotonic() limite; None = sem prazo
+        self.started_at = time.monotonic()
+        self.default_cost = default_cost
+        self.ewma_cost = None
+        self.attempts = 0
+        self.busy_seconds = 0.0
+        self.stop_reason = None
+
+    @classmethod
+    def for_run(cls, run_started_at=None, budget_minutes=RUN_TIME_BUDGET_MINUTES,
+                cron_interval_minutes=CRON_INTERVAL_MINUTES, margin_minutes=RUN_DEADLINE_MARGIN_MINUTES):
+        """
+        Orçamento de uma execução do cron: termina margin_minutes antes do próximo horário
+        (contado a partir de run_started_at, em time.monotonic()) e, se houver, respeita budget_minutes
+        """
+        now = time.monotonic()
+        deadlines = []
+        if cron_interval_minutes > 0:
+            start = run_started_at if run_started_at is not None else now
+            deadlines.append(start + (cron_interval_minutes - margin_minutes) * 60)
+        if budget_minutes > 0:
+            deadlines.append(now + budget_minutes * 60)
+
+        controller = cls(min(deadlines) if deadlines else None)
+        if controller.deadline is not None:
+            logger.info(f"⏱️ Orçamento de processamento: {format_duration(controller.remaining_seconds())}")
+        return controller
+
+    def record(self, duration):
+        """Registra a duração (s) de uma tentativa, com sucesso ou falha"""
+        self.attempts += 1
+        self.busy_seconds += duration
+        if self.ewma_cost is None:
+            self.ewma_cost = duration
+        else:
+            self.ewma_cost = COST_SMOOTHING * duration + (1 - COST_SMOOTHING) * self.ewma_cost
+
+    def estimated_cost(self):
+        """Custo estimado da próxima novelty (s), incluindo pausas entre iterações"""
+        if not self.attempts:
+            return self.default_cost
+        # Vazão real: tempo total de processamento (com esperas e recargas) por tentativa
+        throughput_cost = (time.monotonic() - self.started_at) / self.attempts
+        return max(self.ewma_cost, throughput_cost)
+
+    def remaining_seconds(self):
+        if self.deadline is None:
+            return float("inf")
+        return max(0.0, self.deadline - time.monotonic())
+
+    def can_start_next(self):
+        """True se a próxima novelty provavelmente termina antes do prazo"""
+        needed = self.estimated_cost() * COST_SAFETY_FACTOR
+        if self.remaining_seconds() >= needed:
+            return True
+        self.stop_reason = (
+            f"restam {format_duration(self.remaining_seconds())} e cada novelty leva ~{format_duration(self.estimated_cost())}"
+        )
+        logger.warning(f"⏰ Orçamento de tempo quase esgotado: {self.stop_reason}")
+        return False
+
+    def can_wait(self, seconds):
+        """True se ainda dá para esperar seconds e processar mais uma novelty depois"""
+        if self.remaining_seconds() >= seconds + self.estimated_cost() * COST_SAFETY_FACTOR:
+            return True
+        self.stop_reason = f"espera de {format_duration(seconds)} pela próxima retentativa ultrapassa o prazo"
+        logger.warning(f"⏰ {self.stop_reason}")
+        return False
+
+    def projected_clear_seconds(self, backlog):
+        """Tempo projetado para processar as backlog novelties restantes"""
+        return backlog * self.estimated_cost()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gravação de execuções reais para replay offline
+Em cada etapa (tabela, modal Save/Yes, formulário, após salvar) guarda um snapshot do DOM
+e as respostas de rede (XHR/fetch) capturadas pelo log de performance do Chrome,
+com os tempos originais. O replay_server.py serve essas gravações localmente
+"""
+
+import os
+import json
+import time
+import datetime
+import logging
+
+logger = logging.getLogger("dropi_automation_cron")
+
+# Ativa a gravação (também com: python chile_background_bot.py --record)
+RECORD_RUN = os.getenv("RECORD_RUN", "false").lower() in ["true", "1", "yes"]
+RECORDINGS_DIR = os.getenv("RECORDINGS_DIR", "recordings")
+
+# Limita o tamanho da gravação: novelties gravadas por execução
+RECORD_MAX_NOVELTIES = int(os.getenv("RECORD_MAX_NOVELTIES", "20"))
+
+MANIFEST_FILE = "manifest.json"
+
+# Tipos de recurso cujas respostas são guardadas (o restante é estático do SPA)
+RECORDED_RESOURCE_TYPES = ("XHR", "Fetch", "Document")
+
+# Cabeçalhos que nunca são gravados (sessão do usuário)
+REDACTED_HEADERS = ("set-cookie", "cookie", "authorization")
+
+DOM_SNAPSHOT_SCRIPT = "return '<!DOCTYPE html>' + document.documentElement.outerHTML;"
+
+# Regras CSS da página (o replay não carrega as folhas de estilo do Dropi; sem elas modais ocultos ficariam visíveis)
+STYLES_SCRIPT = """
+return Array.from(document.styleSheets).map(sheet => {
+    try { return Array.from(sheet.cssRules).map(rule => rule.cssText).join('\\n'); }
+    catch (e) { return ''; }
+}).join('\\n');
+"""
+STYLES_FILE = "styles.css"
+
+
+def enable_performance_log(chrome_options):
+    """Habilita o log de performance do Chrome (eventos Network.*) usado na gravação"""
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+class RunRecorder:
+    """Grava snapshots do DOM e respostas de rede de uma execução em recordings/<pais>_<data>/"""
+
+    def __init__(self, country, base_dir=RECORDINGS_DIR, max_novelties=RECORD_MAX_NOVELTIES):
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.folder = os.path.join(base_dir, f"{country}_{timestamp}")
+        os.makedirs(os.path.join(self.folder, "dom"), exist_ok=True)
+        os.makedirs(os.path.join(self.folder, "network"), exist_ok=True)
+        self.manifest = {
+            "country": country,
+            "started_at": datetime.datetime.now().isoformat(),
+            "snapshots": [],
+            "network": []
+        }
+        self.started = time.monotonic()
+        self.max_novelties = max_novelties
+        self.novelties = 0
+        self.pending_requests = {}
+        self.segment_latency = 0.0
+        logger.info(f"🎥 Gravação ativada: {self.folder}")
+
+    @property
+    def active(self):
+        return self.max_novelties <= 0 or self.novelties < self.max_novelties
+
+    def novelty_done(self):
+        """Conta uma novelty gravada; ao atingir o limite a gravação para"""
+        self.novelties += 1
+        if not self.active:
+            logger.info(f"🎥 Limite de {self.max_novelties} novelties gravadas atingido")
+
+    def start(self, driver):
+        """Descarta o tráfego anterior (login) para que credenciais e tokens não entrem na gravação"""
+        try:
+            driver.get_log("performance")
+        except Exception as e:
+            logger.debug(f"Log de performance indisponível: {str(e)}")
+        self.pending_requests = {}
+        self.started = time.monotonic()
+        try:
+            with open(os.path.join(self.folder, STYLES_FILE), 'w', encoding='utf-8') as f:
+                f.write(driver.execute_script(STYLES_SCRIPT) or "")
+            self.manifest["styles"] = STYLES_FILE
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível gravar o CSS da página: {str(e)}")
+
+    def collect_network(self, driver, entries=None):
+        """
+        Guarda as respostas concluídas desde a última chamada. entries: entradas do log de
+        performance já lidas por quem compartilha o log (a leitura esvazia o buffer)
+        """
+        if entries is None:
+            try:
+                entries = driver.get_log("performance")
+            except Exception as e:
+                logger.debug(f"Log de performance indisponível: {str(e)}")
+                return
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+            request_id = params.get("requestId")
+
+            if method == "Network.requestWillBeSent":
+                self.pending_requests[request_id] = {
+                    "url": params["request"]["url"],
+                    "method": params["request"].get("method", "GET"),
+                    "type": params.get("type"),
+                    "started": params.get("timestamp")
+                }
+            elif method == "Network.responseReceived" and request_id in self.pending_requests:
+                response = params.get("response", {})
+                self.pending_requests[request_id].update(
+                    status=response.get("status"),
+                    mime_type=response.get("mimeType"),
+                    headers={
+                        name: value for name, value in response.get("headers", {}).items()
+                        if name.lower() not in REDACTED_HEADERS
+                    },
+                    type=params.get("type") or self.pending_requests[request_id]["type"]
+                )
+            elif method == "Network.loadingFinished" and request_id in self.pending_requests:
+                request = self.pending_requests.pop(request_id)
+                if request.get("type") not in RECORDED_RESOURCE_TYPES or "status" not in request:
+                    continue
+                duration = max(0.0, params.get("timestamp", 0) - (request.get("started") or 0))
+                self._save_response(driver, request_id, request, duration)
+
+    def _save_response(self, driver, request_id, request, duration):
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except Exception:
+            body = {"body": "", "base64Encoded": False}
+
+        seq = len(self.manifest["network"])
+        file_name = os.path.join("network", f"{seq:05d}.json")
+        with open(os.path.join(self.folder, file_name), 'w', encoding='utf-8') as f:
+            json.dump(dict(request, body=body.get("body", ""), base64=body.get("base64Encoded", False)), f, ensure_ascii=False)
+
+        self.segment_latency += duration
+        self.manifest["network"].append({
+            "seq": seq,
+            "url": request["url"],
+            "method": request["method"],
+            "status": request["status"],
+            "mime_type": request.get("mime_type"),
+            "offset": round(time.monotonic() - self.started, 3),
+            "duration": round(duration, 3),
+            "file": file_name
+        })
+
+    def capture(self, driver, step):
+        """Snapshot do DOM da etapa; latency = tempo de rede desde o snapshot anterior"""
+        if not self.active:
+            return
+        try:
+            self.collect_network(driver)
+            seq = len(self.manifest["snapshots"])
+            file_name = os.path.join("dom", f"{seq:04d}_{step}.html")
+            html = driver.execute_script(DOM_SNAPSHOT_SCRIPT)
+            with open(os.path.join(self.folder, file_name), 'w', encoding='utf-8') as f:
+                f.write(html)
+
+            self.manifest["snapshots"].append({
+                "seq": seq,
+                "step": step,
+                "url": driver.current_url,
+                "offset": round(time.monotonic() - self.started, 3),
+                "latency": round(self.segment_latency, 3),
+                "file": file_name
+            })
+            self.segment_latency = 0.0
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao gravar etapa {step}: {str(e)}")
+
+    def save(self):
+        """Grava o manifest (índice dos snapshots e respostas com os tempos originais)"""
+        try:
+            with open(os.path.join(self.folder, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+            logger.info(
+                f"🎥 Gravação salva: {len(self.manifest['snapshots'])} snapshots, "
+                f"{len(self.manifest['network'])} respostas de rede em {self.folder}"
+            )
+            return self.folder
+        except Exception as e:
+            logger.error(f"❌ Erro ao salvar gravação: {str(e)}")
+            return None
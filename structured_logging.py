@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline de logs assíncrono
+As chamadas de log só enfileiram o registro (QueueHandler); uma thread (QueueListener)
+grava no console em texto e em arquivo JSON lines com rotação por tamanho.
+Cada linha JSON leva run_id, order_id e step do contexto atual
+"""
+
+import os
+import copy
+import json
+import uuid
+import queue
+import atexit
+import random
+import logging
+import logging.handlers
+import contextvars
+from contextlib import contextmanager
+
+# Arquivo JSON lines (lido pelo monitor) e rotação por tamanho
+LOG_FILE = os.getenv("LOG_FILE", "automation.jsonl")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Amostragem por nível, ex: "DEBUG=0.05" mantém ~5% das mensagens DEBUG
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Campos de contexto incluídos em cada linha JSON
+CONTEXT_FIELDS = ("run_id", "country", "order_id", "step")
+
+_log_context = contextvars.ContextVar("log_context", default={})
+_listener = None
+_stream_handler = None
+# Formata tracebacks antes de o registro ir para a fila
+_exception_formatter = logging.Formatter()
+
+
+def new_run_id():
+    """Identificador curto de uma execução"""
+    return uuid.uuid4().hex[:12]
+
+
+def set_log_context(**fields):
+    """Define campos de contexto para os próximos logs desta thread (None remove o campo)"""
+    context = dict(_log_context.get())
+    for key, value in fields.items():
+        if value is None:
+            context.pop(key, None)
+        else:
+            context[key] = value
+    _log_context.set(context)
+
+
+@contextmanager
+def log_context(**fields):
+    """Campos de contexto válidos apenas dentro do bloco"""
+    token = _log_context.set(dict(_log_context.get(), **fields))
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def parse_sample_rates(raw):
+    """'DEBUG=0.05,INFO=1' -> {10: 0.05, 20: 1.0}"""
+    rates = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, value = item.split("=", 1)
+        level = logging.getLevelName(name.strip().upper())
+        try:
+            if isinstance(level, int):
+                rates[level] = max(0.0, min(1.0, float(value)))
+        except ValueError:
+            continue
+    return rates
+
+
+class ContextFilter(logging.Filter):
+    """Copia o contexto da thread que gerou o log para o registro (antes de ir para a fila)"""
+
+    def filter(self, record):
+        context = _log_context.get()
+        for field in CONTEXT_FIELDS:
+            setattr(record, field, context.get(field))
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Descarta uma fração dos registros dos níveis configurados"""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelno)
+        return rate is None or random.random() < rate
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Uma linha JSON por registro. ts e level vêm primeiro e com formato fixo, para que o
+    monitor identifique data e erros sem decodificar o JSON
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, TIMESTAMP_FORMAT),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "logger": record.name
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        entry["msg"] = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que mantém o traceback separado da mensagem. O prepare() padrão junta o
+    traceback a msg e limpa exc_info/exc_text, e a linha JSON ficaria sem o campo exc
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.message = record.msg
+        record.args = None
+        # O traceback vira texto antes de ir para a fila (a thread do listener não acessa os frames)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+def setup_logging(level=LOG_LEVEL, log_file=LOG_FILE, text_format=TEXT_FORMAT):
+    """
+    Substitui os handlers do logger raiz por um QueueHandler; o QueueListener grava
+    no console (texto) e em log_file (JSON lines, com rotação)
+    """
+    global _listener, _stream_handler
+    if _listener is not None:
+        return _listener
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    rates = parse_sample_rates(LOG_SAMPLE_RATES)
+    if rates:
+        queue_handler.addFilter(SamplingFilter(rates))
+    queue_handler.addFilter(ContextFilter())
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file,
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(JsonLinesFormatter())
+    _stream_handler = logging.StreamHandler()
+    _stream_handler.setFormatter(logging.Formatter(text_format))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, _stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Esvazia a fila antes de o processo terminar
+    atexit.register(stop_logging)
+    return _listener
+
+
+def set_text_format(text_format):
+    """Altera o formato do console (ex: incluir o nome da thread no modo multi-país)"""
+    if _stream_handler is not None:
+        _stream_handler.setFormatter(logging.Formatter(text_format))
+
+
+def stop_logging():
+    """Grava os registros pendentes e encerra a thread do listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
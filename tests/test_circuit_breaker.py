@@ -0,0 +1,57 @@
+import pytest
+
+from circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker(consecutive_failures=3, window_size=4, window_failure_rate=0.75,
+                          slow_attempt_seconds=60, slow_attempts=2)
+
+
+def test_stays_closed_on_healthy_attempts(breaker):
+    for _ in range(10):
+        assert breaker.record(True, 5) is False
+    assert breaker.state()["tripped"] is False
+
+
+def test_trips_on_consecutive_failures(breaker):
+    breaker.window_enabled = False
+    assert breaker.record(False, 5) is False
+    assert breaker.record(False, 5) is False
+    assert breaker.record(True, 5) is False
+    assert breaker.record(False, 5) is False
+    assert breaker.record(False, 5) is False
+    assert breaker.record(False, 5) is True
+    assert breaker.reason == "3 falhas seguidas"
+
+
+def test_trips_on_window_failure_rate_only_when_window_is_full(breaker):
+    breaker.consecutive_failures_limit = 0
+    assert breaker.record(False, 5) is False
+    assert breaker.record(False, 5) is False
+    assert breaker.record(True, 5) is False
+    assert breaker.record(False, 5) is True
+    assert "taxa de falha 75%" in breaker.reason
+
+
+def test_trips_on_consecutive_slow_attempts(breaker):
+    assert breaker.record(True, 61) is False
+    assert breaker.record(True, 5) is False
+    assert breaker.record(True, 61) is False
+    assert breaker.record(True, 60) is True
+    assert "acima de 60s" in breaker.reason
+
+
+def test_stays_open_once_tripped(breaker):
+    for _ in range(3):
+        breaker.record(False, 5)
+    reason = breaker.reason
+    assert breaker.record(True, 1) is True
+    assert breaker.reason == reason
+
+
+def test_zero_limits_disable_criteria():
+    breaker = CircuitBreaker(consecutive_failures=0, window_size=0, slow_attempt_seconds=0, slow_attempts=0)
+    for _ in range(20):
+        assert breaker.record(False, 500) is False
@@ -0,0 +1,41 @@
+import pytest
+
+from country_profiles import get_profile, get_enabled_profiles, parse_chilean_address, parse_generic_address
+
+
+def test_chilean_address_components():
+    assert parse_chilean_address("Av. Providencia 1234 - depto 5, Providencia - Metropolitana") == {
+        "calle": "Av. Providencia 1234", "numero": "1234", "comuna": "Providencia", "region": "Metropolitana"
+    }
+
+
+def test_chilean_address_with_bio_bio_region():
+    components = parse_chilean_address("Calle Uno 45, Concepción - BIO - BIO")
+    assert components["comuna"] == "Concepción"
+    assert components["region"] == "BIO - BIO"
+
+
+def test_generic_address_uses_last_part_as_comuna():
+    assert parse_generic_address("Carrera 7 # 45-10, Bogotá") == {
+        "calle": "Carrera", "numero": "7", "comuna": "Bogotá", "region": ""
+    }
+
+
+def test_profiles_from_env_skip_disabled(monkeypatch):
+    monkeypatch.setenv("DROPI_COUNTRIES", " Chile, colombia ,")
+    assert [profile.source_country for profile in get_enabled_profiles()] == ["chile"]
+    assert not get_profile("colombia").enabled
+    with pytest.raises(ValueError):
+        get_profile("peru")
+
+
+def test_credentials_only_from_country_env(monkeypatch):
+    monkeypatch.delenv("DROPI_CHILE_EMAIL", raising=False)
+    monkeypatch.delenv("DROPI_CHILE_PASSWORD", raising=False)
+    assert get_profile("chile").get_credentials() == ("", "")
+    assert not get_profile("chile").has_credentials()
+
+    monkeypatch.setenv("DROPI_CHILE_EMAIL", "ops@example.com")
+    monkeypatch.setenv("DROPI_CHILE_PASSWORD", "segredo")
+    assert get_profile("chile").get_credentials() == ("ops@example.com", "segredo")
+    assert get_profile("chile").has_credentials()
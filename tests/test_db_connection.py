@@ -0,0 +1,114 @@
+import time
+import threading
+
+import pandas as pd
+import pytest
+
+import db_connection
+
+
+class Connection:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        self.engine.statements.append(str(statement))
+        time.sleep(self.engine.delay)
+        return self
+
+    def fetchone(self):
+        return (self.engine.version,)
+
+
+class Engine:
+    """Engine do SQLAlchemy que só registra os comandos executados"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.statements = []
+        self.version = "2026-10-19 06:00:00"
+
+    def connect(self):
+        return Connection(self)
+
+    def begin(self):
+        return Connection(self)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = Engine()
+    monkeypatch.setattr(db_connection, "get_engine", lambda: engine)
+    monkeypatch.setattr(db_connection, "get_database_url", lambda: "postgresql://teste")
+    monkeypatch.setattr(db_connection, "_schema_ready", False)
+    monkeypatch.setattr(db_connection, "_history_cache", db_connection.HistoryCache(ttl=60))
+    return engine
+
+
+@pytest.fixture
+def history_reads(monkeypatch):
+    """Conta as leituras do histórico (pd.read_sql_query)"""
+    reads = []
+
+    def read_sql_query(query, conn, params=None):
+        reads.append(params)
+        return pd.DataFrame({"source_country": [params["country_filter"]], "successful": [len(reads)]})
+
+    monkeypatch.setattr(db_connection.pd, "read_sql_query", read_sql_query)
+    return reads
+
+
+def test_concurrent_ensure_schema_runs_ddl_once(engine):
+    engine.delay = 0.01
+    threads = [threading.Thread(target=db_connection.ensure_schema) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(engine.statements) == len(db_connection.SCHEMA_STATEMENTS)
+    assert db_connection.ensure_schema() is True
+
+
+def test_summary_reads_rollups_without_refreshing(engine, monkeypatch):
+    monkeypatch.setattr(db_connection, "refresh_execution_rollups", lambda country: pytest.fail("refresh na leitura"))
+    rollup = pd.DataFrame({"runs": [2], "successful": [3], "failed": [1], "total_execution_time": [120.0]})
+    monkeypatch.setattr(db_connection.pd, "read_sql_query", lambda query, conn, params=None: rollup.copy())
+
+    summary = db_connection.get_execution_summary("2026-10-01", "2026-10-19", "chile")
+
+    assert engine.statements == []
+    assert list(summary["success_rate"]) == [0.75]
+    assert list(summary["avg_execution_time"]) == [60.0]
+
+
+def test_history_cache_checks_version_once_per_ttl(engine, history_reads, clock):
+    first = db_connection.get_execution_history("2026-10-01", "2026-10-19", "chile")
+    assert len(engine.statements) == 1 and len(history_reads) == 1
+
+    # Dentro do TTL: nenhuma consulta
+    clock.advance(30)
+    db_connection.get_execution_history("2026-10-01", "2026-10-19", "chile")
+    assert len(engine.statements) == 1
+
+    # TTL vencido, versão igual: só a consulta de versão
+    clock.advance(31)
+    assert db_connection.get_execution_history("2026-10-01", "2026-10-19", "chile").equals(first)
+    assert len(engine.statements) == 2 and len(history_reads) == 1
+
+    # Outro processo salvou uma execução
+    clock.advance(61)
+    engine.version = "2026-10-19 12:00:00"
+    assert db_connection.get_execution_history("2026-10-01", "2026-10-19", "chile")["successful"][0] == 2
+
+
+def test_history_cache_key_uses_the_queried_country(engine, history_reads):
+    db_connection.get_execution_history("2026-10-01", "2026-10-19", "chile")
+    padded = db_connection.get_execution_history("2026-10-01", "2026-10-19", " chile")
+    assert [params["country_filter"] for params in history_reads] == ["chile", " chile"]
+    assert padded["source_country"][0] == " chile"
@@ -0,0 +1,101 @@
+import pytest
+
+from discord_digest import DiscordDigest, build_digest_embed, alert_key, summary_line
+
+
+class Webhook:
+    """Webhook falso: guarda os embeds enviados (ok=False simula falha no envio)"""
+
+    def __init__(self):
+        self.ok = True
+        self.embeds = []
+
+    def __call__(self, embed):
+        if self.ok:
+            self.embeds.append(embed)
+        return self.ok
+
+
+def make_embed(message, critical):
+    return {"description": message, "critical": critical}
+
+
+@pytest.fixture
+def webhook():
+    return Webhook()
+
+
+@pytest.fixture
+def digest_path(tmp_path):
+    return str(tmp_path / "digest.json")
+
+
+@pytest.fixture
+def digest(webhook, digest_path):
+    return DiscordDigest("🇨🇱 Chile", make_embed, webhook, path=digest_path, interval_minutes=60, suppress_minutes=30)
+
+
+def test_events_wait_for_interval_then_go_in_one_embed(digest, webhook):
+    assert digest.notify("🚀 **Cron Job iniciado** (10:00)\n\ndetalhes", now=0) is False
+    assert digest.notify("🚀 **Cron Job iniciado** (16:00)", now=1800) is False
+    assert webhook.embeds == []
+
+    assert digest.notify("⏭️ **Execução pulada**", now=3600) is True
+    assert len(webhook.embeds) == 1
+    description = webhook.embeds[0]["description"]
+    # Eventos iguais a menos de números são agrupados com contagem
+    assert "🚀 Cron Job iniciado (16:00) ×2" in description
+    assert "⏭️ Execução pulada" in description
+    assert digest.flush(now=3700) is False
+
+
+def test_sources_share_the_file(digest, webhook, digest_path):
+    monitor = DiscordDigest("🔍 Monitor", make_embed, webhook, path=digest_path)
+    digest.notify("Cron Job iniciado", now=0)
+    monitor.notify("Sistema saudável", now=10)
+    assert monitor.flush(now=20) is True
+    description = webhook.embeds[0]["description"]
+    assert "🇨🇱 Chile: Cron Job iniciado" in description
+    assert "🔍 Monitor: Sistema saudável" in description
+
+
+def test_failed_post_keeps_events(digest, webhook):
+    webhook.ok = False
+    digest.notify("Cron Job iniciado", now=0)
+    assert digest.flush(now=10) is False
+    webhook.ok = True
+    assert digest.flush(now=20) is True
+    assert "Cron Job iniciado" in webhook.embeds[0]["description"]
+
+
+def test_repeated_alert_is_suppressed_and_counted(digest, webhook):
+    assert digest.notify("❌ 5 falhas seguidas", critical=True, now=0) is True
+    # Mesmo alerta com outros números dentro da janela: suprimido
+    assert digest.notify("❌ 7 falhas seguidas", critical=True, now=60) is False
+    assert digest.notify("❌ 9 falhas seguidas", critical=True, now=120) is False
+    assert len(webhook.embeds) == 1
+
+    # Depois da janela volta a ser enviado, com a contagem do que foi suprimido
+    assert digest.notify("❌ 9 falhas seguidas", critical=True, now=1800) is True
+    assert webhook.embeds[1]["critical"] is True
+    assert "Repetido 2x" in webhook.embeds[1]["description"]
+
+
+def test_suppressed_count_goes_to_digest(digest, webhook):
+    digest.notify("❌ Erro no Monitor", critical=True, key="monitor", now=0)
+    digest.notify("❌ Erro no Monitor", critical=True, key="monitor", now=10)
+    assert digest.flush(now=20) is True
+    assert "suprimidos: **1**" in webhook.embeds[-1]["description"]
+
+
+def test_disabled_digest_sends_immediately(digest, webhook):
+    digest.interval = 0
+    assert digest.notify("Cron Job iniciado\nlinha 2", now=0) is True
+    assert webhook.embeds[0]["description"] == "Cron Job iniciado\nlinha 2"
+
+
+def test_helpers():
+    assert summary_line("\n**Cron Job** `ok`\nresto") == "Cron Job ok"
+    assert alert_key("Monitor", "CPU 91%") == alert_key("Monitor", "CPU 97%")
+    assert alert_key("Monitor", "CPU 91%") != alert_key("Bot", "CPU 91%")
+    assert build_digest_embed([], now=0)["description"] == "Sem eventos"
@@ -0,0 +1,69 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from history_analytics import compute_history_analytics, report_lines
+
+START = datetime.datetime(2026, 3, 1, 6, 0)
+
+
+@pytest.fixture
+def history():
+    """Chile: 4 execuções de base (10/min), 1 noop e 2 recentes (5/min); Colombia: 1 execução"""
+    runs = [("chile", 10, 0, 60)] * 4 + [("chile", 0, 0, 5)] + [("chile", 4, 1, 60)] * 2 + [("colombia", 3, 1, 120)]
+    rows = []
+    for position, (country, successful, failed, seconds) in enumerate(runs):
+        rows.append({
+            "source_country": country,
+            "execution_date": START + datetime.timedelta(hours=6 * position),
+            "successful": successful,
+            "failed": failed,
+            "total_processed": successful + failed,
+            "execution_time": seconds
+        })
+    # Ordem do banco não importa
+    return pd.DataFrame(rows[::-1])
+
+
+def test_empty_history():
+    assert compute_history_analytics(pd.DataFrame()) == {}
+    assert compute_history_analytics(None) == {}
+
+
+def test_recent_window_against_baseline(history):
+    chile = compute_history_analytics(history, window=2, regression_pct=20)["chile"]
+
+    assert chile["runs"] == 6
+    assert chile["last_run"] == (START + datetime.timedelta(hours=36)).isoformat()
+    assert chile["novelties_per_minute"] == 5.0
+    assert chile["baseline_novelties_per_minute"] == 10.0
+    assert chile["delta_novelties_per_minute_pct"] == -50.0
+    assert chile["rolling_success_rate"] == 0.8
+    assert chile["delta_success_rate_pct"] == -20.0
+    assert chile["delta_execution_time_p50_pct"] == 0.0
+    assert chile["execution_time_p95"] == 60.0
+    assert chile["regression"] is True
+
+
+def test_country_without_baseline(history):
+    colombia = compute_history_analytics(history, window=2)["colombia"]
+    assert colombia["novelties_per_minute"] == 2.0
+    assert colombia["baseline_novelties_per_minute"] is None
+    assert colombia["delta_novelties_per_minute_pct"] is None
+    assert colombia["regression"] is False
+
+
+def test_runs_limit_keeps_most_recent(history):
+    chile = compute_history_analytics(history, runs=3, window=2)["chile"]
+    assert chile["runs"] == 3
+    assert chile["baseline_novelties_per_minute"] == 10.0
+
+
+def test_report_lines(history):
+    lines = report_lines(compute_history_analytics(history, window=2))
+    assert lines[0] == "• chile (6 execuções) ⚠️ REGRESSÃO"
+    assert lines[1] == "  Vazão: 5.0 novelties/min (base 10.0, -50.0%)"
+    assert lines[2] == "  Sucesso (últimas 2): 80% (-20.0%)"
+    assert lines[4] == "• colombia (1 execuções)"
+    assert lines[5] == "  Vazão: 2.0 novelties/min"
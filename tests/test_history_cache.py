@@ -0,0 +1,81 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from db_connection import HistoryCache
+
+
+@pytest.fixture
+def cache(clock):
+    return HistoryCache(ttl=60, max_entries=2, max_bytes=10 ** 6)
+
+
+@pytest.fixture
+def history():
+    return pd.DataFrame({"source_country": ["chile", "chile"], "successful": [3, 4]})
+
+
+def test_equivalent_parameters_share_the_key():
+    start = datetime.datetime(2026, 10, 1)
+    assert HistoryCache.make_key(start, "2026-10-19", "chile") == HistoryCache.make_key(
+        "2026-10-01 00:00:00", datetime.datetime(2026, 10, 19), "chile"
+    )
+
+
+def test_hit_returns_a_copy(cache, history):
+    cache.put("k", history)
+    cached = cache.get("k")
+    cached.loc[0, "successful"] = 99
+    assert cache.get("k").loc[0, "successful"] == 3
+    assert cache.stats()["hits"] == 2
+
+
+def test_country_is_kept_as_queried():
+    assert HistoryCache.make_key("2026-10-01", "2026-10-19", " chile") != HistoryCache.make_key(
+        "2026-10-01", "2026-10-19", "chile"
+    )
+
+
+def test_expired_entry_is_revalidated_by_version(cache, history, clock):
+    cache.put("k", history, version="v1")
+    clock.advance(61)
+    assert cache.get("k") is None
+
+    # Versão igual: renova o TTL sem reler os dados
+    assert cache.revalidate("k", "v1") is not None
+    clock.advance(30)
+    assert cache.get("k") is not None
+
+    clock.advance(31)
+    assert cache.revalidate("k", "v2") is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_is_evicted(cache, history):
+    cache.put("a", history)
+    cache.put("b", history)
+    cache.get("a")
+    cache.put("c", history)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_limit(history, clock):
+    size = int(history.memory_usage(deep=True).sum())
+    cache = HistoryCache(ttl=60, max_entries=10, max_bytes=size * 2)
+    for key in ("a", "b", "c"):
+        cache.put(key, history)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["bytes"] <= size * 2
+
+
+def test_invalidate_country(cache, history):
+    cache.put(HistoryCache.make_key("2026-10-01", "2026-10-19", "chile"), history)
+    cache.put(HistoryCache.make_key("2026-10-01", "2026-10-19", "colombia"), history)
+    cache.invalidate_country("chile")
+    assert cache.get(HistoryCache.make_key("2026-10-01", "2026-10-19", "chile")) is None
+    assert cache.get(HistoryCache.make_key("2026-10-01", "2026-10-19", "colombia")) is not None
@@ -0,0 +1,104 @@
+import os
+import json
+import datetime
+
+import pytest
+
+from log_scanner import LogScanner, TIMESTAMP_FORMAT, format_log_line, parse_line_timestamp, read_last_lines
+
+
+def line(level, message, at=None):
+    at = at or datetime.datetime.now()
+    return f"{at.strftime(TIMESTAMP_FORMAT)},000 - {level} - {message}\n"
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    return str(tmp_path / "automation.log")
+
+
+def append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_scan_reads_only_new_bytes_and_persists_checkpoint(log_file):
+    append(log_file, line("INFO", "início") + line("ERROR", "falha 1"))
+    scanner = LogScanner(log_file)
+    scanner.scan()
+    assert scanner.count_errors() == 1
+    assert scanner.state["offset"] == os.path.getsize(log_file)
+
+    # Novo processo retoma do checkpoint salvo e não reconta as linhas antigas
+    append(log_file, line("ERROR", "falha 2"))
+    scanner = LogScanner(log_file)
+    scanner.scan()
+    assert scanner.count_errors() == 2
+    assert LogScanner(log_file).state["offset"] == os.path.getsize(log_file)
+
+
+def test_partial_line_is_read_on_next_scan(log_file):
+    append(log_file, line("INFO", "ok"))
+    scanner = LogScanner(log_file)
+    scanner.scan()
+
+    partial = line("ERROR", "falha")
+    append(log_file, partial[:10])
+    scanner.scan()
+    assert scanner.count_errors() == 0
+
+    append(log_file, partial[10:])
+    scanner.scan()
+    assert scanner.count_errors() == 1
+
+
+def test_traceback_lines_inherit_last_timestamp(log_file):
+    earlier = datetime.datetime.now() - datetime.timedelta(hours=3)
+    append(log_file, line("ERROR", "falha", at=earlier) + "Traceback ERRO sem timestamp\n")
+    scanner = LogScanner(log_file)
+    scanner.scan()
+    assert scanner.count_errors(minutes=60) == 0
+    assert scanner.count_errors(minutes=4 * 60) == 2
+
+
+def test_rotation_finishes_old_file_then_reads_new_one(log_file):
+    append(log_file, line("ERROR", "antes da rotação"))
+    scanner = LogScanner(log_file)
+    scanner.scan()
+
+    # Escrito depois do checkpoint, logo antes da rotação
+    append(log_file, line("ERROR", "final do arquivo antigo"))
+    os.rename(log_file, f"{log_file}.1")
+    append(log_file, line("ERROR", "arquivo novo"))
+
+    scanner.scan()
+    assert scanner.count_errors() == 3
+    assert scanner.state["offset"] == os.path.getsize(log_file)
+
+
+def test_truncated_file_restarts_from_beginning(log_file):
+    append(log_file, line("INFO", "x" * 200) + line("ERROR", "falha"))
+    scanner = LogScanner(log_file)
+    scanner.scan()
+
+    with open(log_file, "w", encoding="utf-8") as f:
+        f.write(line("ERROR", "depois de truncar"))
+    scanner.scan()
+    assert scanner.count_errors() == 2
+
+
+
+
+def test_json_lines(log_file):
+    now = datetime.datetime.now().strftime(TIMESTAMP_FORMAT)
+    entries = [{"ts": now, "level": "INFO", "msg": f"linha {i}"} for i in range(4)]
+    entries.append({"ts": now, "level": "ERROR", "msg": "falha", "order_id": "123"})
+    append(log_file, "".join(json.dumps(entry) + "\n" for entry in entries))
+
+    assert parse_line_timestamp(json.dumps(entries[0])).strftime(TIMESTAMP_FORMAT) == now
+    assert format_log_line(json.dumps(entries[-1])) == f"{now} - ERROR - [123] falha"
+    assert [json.loads(text)["msg"] for text in read_last_lines(log_file, 2)] == ["linha 3", "falha"]
+
+    scanner = LogScanner(log_file)
+    scanner.scan()
+    assert scanner.count_errors() == 1
@@ -0,0 +1,89 @@
+import pytest
+
+import memory_watchdog
+from memory_watchdog import MemoryWatchdog, MB, RECYCLE_TAB, RECYCLE_DRIVER
+
+
+@pytest.fixture
+def rss(monkeypatch):
+    current = [0]
+    monkeypatch.setattr(memory_watchdog, "measure_process_tree_rss", lambda pid: current[0])
+    return current
+
+
+@pytest.fixture
+def watchdog(rss):
+    return MemoryWatchdog(lambda: 1, tab_limit_mb=1500, driver_limit_mb=2500, tab_every=0, driver_every=0,
+                          min_novelties=10)
+
+
+def process(watchdog, count):
+    for _ in range(count):
+        watchdog.record_novelty()
+
+
+def test_below_limits_does_nothing(watchdog, rss):
+    rss[0] = 900 * MB
+    watchdog.sample()
+    assert watchdog.check() == (None, None)
+
+
+def test_tab_limit_recycles_tab(watchdog, rss):
+    rss[0] = 1600 * MB
+    watchdog.sample()
+    assert watchdog.check() == (RECYCLE_TAB, "RSS 1600 MB ≥ 1500 MB")
+
+
+def test_driver_limit_wins_over_tab_limit(watchdog, rss):
+    rss[0] = 3000 * MB
+    watchdog.sample()
+    kind, reason = watchdog.check()
+    assert kind == RECYCLE_DRIVER
+    assert "3000 MB" in reason
+
+
+def test_count_based_recycling(watchdog, rss):
+    watchdog.tab_every = 3
+    watchdog.driver_every = 5
+    rss[0] = 500 * MB
+    process(watchdog, 3)
+    assert watchdog.check()[0] == RECYCLE_TAB
+    watchdog.recycled(RECYCLE_TAB)
+    process(watchdog, 2)
+    assert watchdog.check()[0] == RECYCLE_DRIVER
+    watchdog.recycled(RECYCLE_DRIVER)
+    assert watchdog.check() == (None, None)
+
+
+def test_recycled_samples_again_and_keeps_peak(watchdog, rss):
+    rss[0] = 1600 * MB
+    watchdog.sample()
+    rss[0] = 900 * MB
+    watchdog.recycled(RECYCLE_TAB)
+    assert watchdog.last_rss == 900 * MB
+    assert watchdog.peak_rss == 1600 * MB
+
+
+def test_tab_recycle_that_does_not_help_escalates_to_driver(watchdog, rss):
+    rss[0] = 2000 * MB
+    watchdog.sample()
+    assert watchdog.check()[0] == RECYCLE_TAB
+
+    # Guia nova continua entre o limite da guia e o do navegador
+    assert watchdog.recycled(RECYCLE_TAB) is not None
+    assert watchdog.check()[0] == RECYCLE_DRIVER
+
+    rss[0] = 800 * MB
+    assert watchdog.recycled(RECYCLE_DRIVER) is None
+    assert watchdog.check() == (None, None)
+
+
+def test_memory_recycles_are_spaced_by_min_novelties(watchdog, rss):
+    rss[0] = 1600 * MB
+    watchdog.recycled(RECYCLE_DRIVER)
+    # RSS que não cai não recicla a cada novelty
+    for _ in range(9):
+        watchdog.record_novelty()
+        assert watchdog.check() == (None, None)
+    watchdog.record_novelty()
+    assert watchdog.check()[0] == RECYCLE_TAB
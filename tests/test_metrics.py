@@ -0,0 +1,54 @@
+import pytest
+
+from metrics import MetricsRegistry, Counter, Gauge, Histogram
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_and_gauge_render(registry):
+    counter = Counter("dropi_test_total", "Contador de teste", ["country"], registry=registry)
+    gauge = Gauge("dropi_test_gauge", "Gauge de teste", registry=registry)
+    counter.inc(country="chile")
+    counter.inc(2, country="chile")
+    gauge.set(1.5)
+
+    text = registry.render()
+    assert "# TYPE dropi_test_total counter" in text
+    assert 'dropi_test_total{country="chile"} 3' in text
+    assert "dropi_test_gauge 1.5" in text
+    assert counter.get(country="chile") == 3
+
+
+def test_missing_labels_are_rejected(registry):
+    counter = Counter("dropi_test_total", "Contador de teste", ["country"], registry=registry)
+    with pytest.raises(ValueError):
+        counter.inc()
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = Histogram("dropi_test_seconds", "Duração", ["step"], buckets=(1, 5), registry=registry)
+    for value in (0.5, 2, 10):
+        histogram.observe(value, step="login")
+
+    text = registry.render()
+    assert 'dropi_test_seconds_bucket{step="login",le="1"} 1' in text
+    assert 'dropi_test_seconds_bucket{step="login",le="5"} 2' in text
+    assert 'dropi_test_seconds_bucket{step="login",le="+Inf"} 3' in text
+    assert 'dropi_test_seconds_sum{step="login"} 12.5' in text
+    assert 'dropi_test_seconds_count{step="login"} 3' in text
+
+
+def test_label_values_are_escaped(registry):
+    gauge = Gauge("dropi_test_gauge", "Gauge de teste", ["reason"], registry=registry)
+    gauge.set(1, reason='linha "1"\nlinha 2')
+    assert 'reason="linha \\"1\\"\\nlinha 2"' in registry.render()
+
+
+def test_write_textfile(registry, tmp_path):
+    Counter("dropi_test_total", "Contador de teste", registry=registry).inc()
+    path = tmp_path / "metrics" / "dropi_bot.prom"
+    assert registry.write_textfile(str(path)) is True
+    assert path.read_text(encoding="utf-8") == registry.render()
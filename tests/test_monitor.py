@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+import db_connection
+import monitor
+from metrics import MONITOR_REGISTRY
+from monitor import DroplMonitor, CPU_SAMPLE_SECONDS, format_cpu
+
+
+class Process:
+    def __init__(self, pid, cpu=12.5):
+        self.pid = pid
+        self.cpu = cpu
+        self.intervals = []
+
+    def cpu_percent(self, interval=None):
+        self.intervals.append(interval)
+        return self.cpu
+
+    def memory_info(self):
+        return type("MemoryInfo", (), {"rss": 100 * 1024 * 1024})()
+
+    def create_time(self):
+        return 0
+
+
+def no_database():
+    raise RuntimeError("sem banco nos testes")
+
+
+@pytest.fixture
+def dropl_monitor(clock, monkeypatch):
+    monkeypatch.setattr(monitor.psutil, "cpu_percent", lambda interval=None: 42.0)
+    # O monitor troca as métricas do db_connection; restaura para os demais testes
+    monkeypatch.setattr(db_connection, "DB_CALL_DURATION", db_connection.DB_CALL_DURATION)
+    monkeypatch.setattr(db_connection, "HISTORY_CACHE_REQUESTS", db_connection.HISTORY_CACHE_REQUESTS)
+    dropl_monitor = DroplMonitor()
+    yield dropl_monitor
+    dropl_monitor.probe_executor.shutdown(wait=False)
+
+
+def test_first_system_cpu_reading_is_unavailable(dropl_monitor, clock, monkeypatch):
+    monkeypatch.setattr(monitor.time, "sleep", lambda seconds: pytest.fail("não deve esperar"))
+    assert dropl_monitor.check_system_resources()["cpu_percent"] is None
+
+    clock.advance(CPU_SAMPLE_SECONDS)
+    assert dropl_monitor.check_system_resources()["cpu_percent"] == 42.0
+    # A leitura seguinte mede a partir desta
+    assert dropl_monitor.check_system_resources()["cpu_percent"] is None
+
+
+def test_new_bot_process_is_primed_without_blocking(dropl_monitor):
+    proc = Process(pid=7)
+    assert dropl_monitor._describe_bot_process(proc)["cpu_percent"] is None
+    assert dropl_monitor._describe_bot_process(proc)["cpu_percent"] == 12.5
+    assert proc.intervals == [None, None]
+
+
+def test_format_cpu():
+    assert format_cpu(None) == "indisponível (primeira leitura)"
+    assert format_cpu(7.26) == "7.3%"
+
+
+@pytest.fixture
+def daemon(dropl_monitor, monkeypatch):
+    monkeypatch.setattr(dropl_monitor, "send_discord_notification", lambda *args, **kwargs: None)
+    monkeypatch.setattr(dropl_monitor, "generate_status_report", lambda probe_results: ("", False))
+    return monitor.MonitorDaemon(dropl_monitor)
+
+
+@pytest.mark.parametrize("problems, healthy, status", [
+    ([], True, "ok"),
+    (["bot_parado"], True, "warning"),
+    (["bot_parado", "regressao_vazao"], True, "warning"),
+    (["bot_parado", "banco_desconectado"], False, "critical"),
+])
+def test_health_ignores_idle_bot(daemon, monkeypatch, problems, healthy, status):
+    monkeypatch.setattr(daemon.monitor, "run_probes", lambda: dict(monitor.PROBE_TIMEOUT_RESULTS))
+    monkeypatch.setattr(daemon.monitor, "detect_problems", lambda probe_results: problems)
+    daemon.sample_once()
+
+    is_healthy, body = daemon.get_snapshot()
+    assert is_healthy is healthy
+    assert json.loads(body)["status"] == status
+
+
+def test_monitor_db_calls_are_exposed_in_monitor_registry(dropl_monitor, monkeypatch):
+    monkeypatch.setattr(db_connection, "get_engine", no_database)
+    assert db_connection.ensure_schema() is False
+
+    rendered = MONITOR_REGISTRY.render()
+    assert 'dropi_monitor_db_call_duration_seconds_count{operation="ensure_schema"} 1' in rendered
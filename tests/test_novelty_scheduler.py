@@ -0,0 +1,74 @@
+import datetime
+
+import pytest
+
+from novelty_scheduler import NoveltyScheduler, extract_dates, pending_fingerprint
+
+
+def classify(text):
+    for incident_type in ("RECHAZO DE ENTREGA", "CLIENTE AUSENTE"):
+        if incident_type in text:
+            return incident_type, ""
+    return "DESCONHECIDO", ""
+
+
+@pytest.fixture
+def scheduler():
+    priorities = {"RECHAZO DE ENTREGA": 1, "CLIENTE AUSENTE": 2, "DESCONHECIDO": 4}
+    return NoveltyScheduler(classify, priorities=priorities, deadline_urgent_hours=24)
+
+
+def row(order_id, index, *cells):
+    return {"order_id": order_id, "index": index, "cells": [order_id, *cells]}
+
+
+def test_extract_dates_in_both_formats():
+    assert extract_dates(["criado 2026-10-01 08:30", "prazo 05/10/2026", "sem data"]) == [
+        datetime.datetime(2026, 10, 1, 8, 30), datetime.datetime(2026, 10, 5)
+    ]
+    assert extract_dates(["2026-13-45"]) == []
+
+
+def test_rank_by_priority_then_age_then_position(scheduler):
+    now = datetime.datetime.now()
+    old = (now - datetime.timedelta(days=3)).strftime("%Y-%m-%d %H:%M")
+    recent = (now - datetime.timedelta(hours=2)).strftime("%Y-%m-%d %H:%M")
+    snapshot = [
+        row("A", 0, "CLIENTE AUSENTE", recent),
+        row("B", 1, "CLIENTE AUSENTE", old),
+        row("C", 2, "RECHAZO DE ENTREGA", recent),
+        row("D", 3, "OUTRO"),
+    ]
+    assert [r["order_id"] for r in scheduler.rank(snapshot)] == ["C", "B", "A", "D"]
+
+
+def test_urgent_deadline_goes_first(scheduler):
+    soon = (datetime.datetime.now() + datetime.timedelta(hours=5)).strftime("%Y-%m-%d %H:%M")
+    ranked = scheduler.rank([row("A", 0, "RECHAZO DE ENTREGA"), row("B", 1, "OUTRO", soon)])
+    assert [r["order_id"] for r in ranked] == ["B", "A"]
+    assert ranked[0]["priority"] == 0
+
+
+def test_stats_count_each_order_once(scheduler):
+    snapshot = [row("A", 0, "RECHAZO DE ENTREGA"), row("B", 1, "CLIENTE AUSENTE")]
+    ranked = scheduler.rank(snapshot)
+    scheduler.rank(snapshot)
+    scheduler.record(ranked[0], True)
+    scheduler.record(ranked[1], False)
+    assert scheduler.summary_lines() == ["P1: 1/1 concluídas, 0 falhas", "P2: 0/1 concluídas, 1 falhas"]
+
+
+def test_fingerprint_ignores_row_order_and_tracks_incident_type():
+    snapshot = [row("A", 0, "CLIENTE AUSENTE"), row("B", 1, "OUTRO")]
+    fingerprint = pending_fingerprint(snapshot, classify)
+    assert pending_fingerprint(snapshot[::-1], classify) == fingerprint
+    assert pending_fingerprint([row("A", 0, "RECHAZO DE ENTREGA"), row("B", 1, "OUTRO")], classify) != fingerprint
+
+
+def test_end_fingerprint_covers_failed_rows_that_were_attempted():
+    # B falhou em todas as tentativas e continua pendente: a próxima execução pode ser pulada
+    snapshot = [row("B", 0, "CLIENTE AUSENTE")]
+    assert pending_fingerprint(snapshot, classify, attempted_ids={"A", "B"}) == pending_fingerprint(snapshot, classify)
+    # C apareceu (ou não coube no orçamento) sem ser tentada: sem fingerprint
+    assert pending_fingerprint(snapshot + [row("C", 1, "OUTRO")], classify, attempted_ids={"A", "B"}) is None
+    assert pending_fingerprint([], classify, attempted_ids=set()) == pending_fingerprint([], classify)
@@ -0,0 +1,63 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from country_profiles import CHILE_INCIDENT_RULES, INCIDENT_UNKNOWN, get_profile
+from novelty_scrape import build_novelty_dataset, classify_incidents, column_names, summary_lines
+
+NOW = datetime.datetime(2026, 3, 10, 12, 0)
+
+
+@pytest.fixture
+def scraped():
+    return {
+        "headers": ["ID", "Fecha", "Dirección", "Novedad"],
+        "rows": [
+            {"index": 0, "pending": True,
+             "cells": ["101", "2026-03-08 12:00", "Los Aromos 123, Concepción - BIO - BIO", "Cliente ausente"]},
+            {"index": 1, "pending": True,
+             "cells": ["102", "09/03/2026", "Av. Matta 55, Santiago - RM", "Dirección incorrecta, rechaza"]},
+            {"index": 3, "pending": False, "cells": ["103", "2026-03-11", "Sin número"]},
+        ]
+    }
+
+
+def test_classify_incidents_first_rule_wins():
+    texts = pd.Series(["CLIENTE AUSENTE Y RECHAZA", "FALTAN DATOS", "RECHAZADA", "OTRA COISA"])
+    incident_type, message = classify_incidents(texts, CHILE_INCIDENT_RULES)
+    assert list(incident_type) == ["CLIENTE AUSENTE", "PROBLEMA DE ENDEREÇO", "RECHAZO DE ENTREGA", INCIDENT_UNKNOWN]
+    assert message[0] == CHILE_INCIDENT_RULES[0][2]
+    assert message[3] == ""
+
+
+def test_column_names_are_normalized_and_unique():
+    assert column_names(["ID", "Fecha creación", "", "ID"], 5) == ["id", "fecha_creación", "col_2", "id_3", "col_4"]
+
+
+def test_build_novelty_dataset(scraped):
+    df = build_novelty_dataset(scraped, get_profile("chile"), now=NOW)
+
+    assert list(df["order_id"]) == ["101", "102", "103"]
+    assert list(df["table_index"]) == [0, 1, 3]
+    assert list(df["country"].unique()) == ["chile"]
+    assert list(df["incident_type"]) == ["CLIENTE AUSENTE", "PROBLEMA DE ENDEREÇO", INCIDENT_UNKNOWN]
+    assert list(df["age_hours"][:2]) == [48.0, 36.0]
+    assert pd.isna(df["age_hours"][2])
+    assert df["deadline"][2] == pd.Timestamp("2026-03-11")
+    assert list(df["address_comuna"][:2]) == ["Concepción", "Santiago"]
+    assert df["address_region"][0] == "BIO - BIO"
+    # Linha mais curta completada com célula vazia
+    assert df["novedad"][2] == ""
+
+
+def test_build_novelty_dataset_empty():
+    assert build_novelty_dataset({"headers": [], "rows": []}, get_profile("chile"), now=NOW).empty
+
+
+def test_summary_lines_count_only_pending(scraped):
+    lines = summary_lines(build_novelty_dataset(scraped, get_profile("chile"), now=NOW))
+    assert lines[0] == "Linhas: 3 (2 pendentes)"
+    assert "CLIENTE AUSENTE: 1" in lines
+    assert any(line.startswith("Comunas: ") and "Santiago (1)" in line for line in lines)
+    assert lines[-1] == "Idade (h): mediana 42, p90 47, máx 48"
@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from rate_governor import (
+    RateGovernor, NetworkLogWatcher, worst_outcome, is_error_page, GOVERNOR_RATE_STEP,
+    GOVERNOR_COOLDOWN_SECONDS, OUTCOME_OK, OUTCOME_SLOW, OUTCOME_THROTTLED, OUTCOME_SERVER_ERROR, OUTCOME_ERROR_PAGE
+)
+
+
+@pytest.fixture
+def governor(clock):
+    return RateGovernor(rate=1.0, min_rate=0.1, max_rate=2, burst=2)
+
+
+@pytest.fixture
+def watcher():
+    return NetworkLogWatcher(hosts=["dropi"])
+
+
+def response(status, latency=0.1, retry_after=None, method="GET"):
+    return {"status": status, "latency": latency, "method": method, "retry_after": retry_after}
+
+
+def log_entry(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+def test_worst_outcome_by_severity():
+    assert worst_outcome([]) == (None, None)
+    assert worst_outcome([response(200)]) == (OUTCOME_OK, None)
+    assert worst_outcome([response(200), response(200, latency=10)], slow_seconds=5) == (OUTCOME_SLOW, None)
+    assert worst_outcome([response(503), response(200, latency=10)], slow_seconds=5)[0] == OUTCOME_SERVER_ERROR
+    assert worst_outcome([response(429, retry_after=30), response(503), response(200, retry_after=5)]) == (OUTCOME_THROTTLED, 30)
+
+
+def test_additive_increase_up_to_max(governor):
+    governor.record(OUTCOME_OK)
+    assert governor.rate == pytest.approx(1.0 + GOVERNOR_RATE_STEP)
+    for _ in range(50):
+        governor.record(OUTCOME_OK)
+    assert governor.rate == 2
+
+
+def test_multiplicative_decrease_with_growing_pause(governor, clock):
+    governor.record(OUTCOME_SERVER_ERROR)
+    assert governor.rate == 0.5
+    assert governor.paused_until == clock.now + GOVERNOR_COOLDOWN_SECONDS
+    assert governor.tokens == 0
+
+    governor.record(OUTCOME_ERROR_PAGE)
+    assert governor.rate == 0.25
+    assert governor.paused_until == clock.now + GOVERNOR_COOLDOWN_SECONDS * 2
+
+    # Sucesso zera a sequência de backoffs
+    governor.record(OUTCOME_OK)
+    assert governor.consecutive_backoffs == 0
+
+
+def test_retry_after_sets_pause_and_rate_respects_min(governor, clock):
+    governor.rate = 0.15
+    governor.record(OUTCOME_THROTTLED, retry_after=42)
+    assert governor.rate == 0.1
+    assert governor.paused_until == clock.now + 42
+    assert governor.state()["resultados"] == {OUTCOME_THROTTLED: 1}
+
+
+def test_slow_reduces_lightly_without_pause(governor):
+    governor.record(OUTCOME_SLOW)
+    assert governor.rate == pytest.approx(0.8)
+    assert governor.paused_until == 0.0
+
+
+def test_no_outcome_is_ignored(governor):
+    governor.record(None)
+    assert governor.rate == 1.0
+    assert governor.outcomes == {}
+
+
+def test_bucket_does_not_refill_during_pause(governor, clock):
+    governor.record(OUTCOME_SERVER_ERROR)
+    clock.advance(GOVERNOR_COOLDOWN_SECONDS - 1)
+    governor._refill(clock.now)
+    assert governor.tokens == 0
+
+    # O fim da pausa não conta como tempo de reposição do bucket
+    clock.advance(3)
+    governor._refill(clock.now)
+    assert governor.tokens == pytest.approx(1.0)
+
+
+def test_network_watcher_pairs_requests_and_responses(watcher):
+    entries = [
+        log_entry("Network.requestWillBeSent", requestId="1", type="XHR", timestamp=10.0,
+                  request={"url": "https://api.dropi.cl/orders", "method": "POST"}),
+        log_entry("Network.requestWillBeSent", requestId="2", type="XHR", timestamp=10.0,
+                  request={"url": "https://cdn.example.com/x.js", "method": "GET"}),
+        log_entry("Network.responseReceived", requestId="1", timestamp=12.5,
+                  response={"status": 429, "headers": {"Retry-After": "7"}}),
+        log_entry("Network.responseReceived", requestId="2", timestamp=11.0, response={"status": 500}),
+    ]
+    assert watcher.responses(entries) == [{"status": 429, "latency": 2.5, "method": "POST", "retry_after": 7.0}]
+    assert watcher.pending == {}
+
+
+def test_network_watcher_keeps_requests_across_batches(watcher):
+    watcher.responses([
+        log_entry("Network.requestWillBeSent", requestId="1", type="Document", timestamp=1.0,
+                  request={"url": "https://app.dropi.cl/dashboard/novelties"}),
+        log_entry("Network.requestWillBeSent", requestId="2", type="Fetch", timestamp=1.0,
+                  request={"url": "https://app.dropi.cl/api"}),
+        log_entry("Network.requestWillBeSent", requestId="3", type="Image", timestamp=1.0,
+                  request={"url": "https://app.dropi.cl/logo.png"}),
+        log_entry("Network.loadingFailed", requestId="2"),
+        {"message": "não é JSON"},
+    ])
+    assert set(watcher.pending) == {"1"}
+    responses = watcher.responses([log_entry("Network.responseReceived", requestId="1", timestamp=3.0,
+                                             response={"status": 200})])
+    assert responses == [{"status": 200, "latency": 2.0, "method": "GET", "retry_after": None}]
+
+
+def test_error_page_detection():
+    assert is_error_page("502 Bad Gateway nginx")
+    assert is_error_page("Too Many Requests")
+    assert not is_error_page("Novelties - Dropi")
+    assert not is_error_page("")
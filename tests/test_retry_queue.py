@@ -0,0 +1,67 @@
+import pytest
+
+from retry_queue import (
+    RetryQueue, MAX_BACKOFF_SECONDS, FAILURE_SAVE_FAILED, FAILURE_MODAL_NOT_SHOWN, FAILURE_UNEXPECTED
+)
+
+
+@pytest.fixture
+def queue():
+    return RetryQueue({
+        FAILURE_SAVE_FAILED: {"max_attempts": 4, "base_delay": 15},
+        FAILURE_MODAL_NOT_SHOWN: {"max_attempts": 2, "base_delay": 30},
+        FAILURE_UNEXPECTED: {"max_attempts": 2, "base_delay": 20}
+    })
+
+
+def test_backoff_doubles_per_attempt(queue):
+    assert queue.record_failure("A", FAILURE_SAVE_FAILED, now=0) is True
+    assert queue.entries["A"]["next_at"] == 15
+    assert queue.record_failure("A", FAILURE_SAVE_FAILED, now=100) is True
+    assert queue.entries["A"]["next_at"] == 130
+    assert queue.record_failure("A", FAILURE_SAVE_FAILED, now=200) is True
+    assert queue.entries["A"]["next_at"] == 260
+
+
+def test_backoff_is_capped(queue):
+    queue.policies[FAILURE_SAVE_FAILED] = {"max_attempts": 10, "base_delay": 100}
+    for _ in range(4):
+        queue.record_failure("A", FAILURE_SAVE_FAILED, now=0)
+    assert queue.entries["A"]["next_at"] == MAX_BACKOFF_SECONDS
+
+
+def test_exhausted_after_max_attempts(queue):
+    assert queue.record_failure("A", FAILURE_MODAL_NOT_SHOWN, now=0) is True
+    assert queue.record_failure("A", FAILURE_MODAL_NOT_SHOWN, now=10) is False
+    assert queue.entries["A"]["exhausted"] is True
+    # Esgotado fica bloqueado para sempre e não conta como retentativa pendente
+    assert queue.blocked_ids(now=10 ** 6) == {"A"}
+    assert queue.seconds_until_next_retry({"A"}, now=0) is None
+
+
+def test_unknown_reason_uses_unexpected_policy(queue):
+    queue.record_failure("A", "motivo_novo", now=0)
+    assert queue.entries["A"]["next_at"] == 20
+    assert queue.record_failure("A", "motivo_novo", now=0) is False
+
+
+def test_blocked_ids_and_next_retry_order(queue):
+    queue.record_failure("A", FAILURE_SAVE_FAILED, now=0)      # volta em 15s
+    queue.record_failure("B", FAILURE_MODAL_NOT_SHOWN, now=0)  # volta em 30s
+
+    assert queue.blocked_ids(now=10) == {"A", "B"}
+    assert queue.blocked_ids(now=20) == {"B"}
+    assert queue.blocked_ids(now=30) == set()
+    assert queue.seconds_until_next_retry({"A", "B"}, now=10) == 5
+    # Pedidos que saíram da tabela não contam
+    assert queue.seconds_until_next_retry({"B"}, now=10) == 20
+    assert queue.seconds_until_next_retry({"A", "B"}, now=40) == 0.0
+
+
+def test_success_removes_entry_and_counts_are_kept(queue):
+    queue.record_failure("A", FAILURE_SAVE_FAILED, row={"order_id": "A"}, now=0)
+    queue.record_failure("B", FAILURE_SAVE_FAILED, now=0)
+    queue.record_success("A")
+
+    assert set(queue.unresolved()) == {"B"}
+    assert queue.reason_counts() == {FAILURE_SAVE_FAILED: 2}
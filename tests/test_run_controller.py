@@ -0,0 +1,70 @@
+import pytest
+
+from run_controller import RunController, COST_SMOOTHING, format_duration
+
+
+@pytest.fixture
+def controller(clock):
+    return RunController(deadline=clock.now + 100, default_cost=45)
+
+
+def test_ewma_cost(controller):
+    assert controller.estimated_cost() == 45
+
+    controller.record(10)
+    assert controller.ewma_cost == 10
+    controller.record(20)
+    assert controller.ewma_cost == pytest.approx(COST_SMOOTHING * 20 + (1 - COST_SMOOTHING) * 10)
+
+
+def test_estimated_cost_uses_real_throughput_when_slower(controller, clock):
+    controller.record(10)
+    controller.record(10)
+    # 2 tentativas em 100s de relógio (esperas e recargas incluídas): 50s por novelty
+    clock.advance(100)
+    assert controller.estimated_cost() == 50
+    assert controller.projected_clear_seconds(4) == 200
+
+
+def test_stop_rule_keeps_safety_margin(controller, clock):
+    controller.record(40)
+    clock.advance(40)
+    # Restam 60s e cada novelty leva ~40s (48s com a margem): ainda cabe
+    assert controller.can_start_next() is True
+    assert controller.stop_reason is None
+
+    controller.record(40)
+    clock.advance(40)
+    assert controller.can_start_next() is False
+    assert controller.stop_reason.startswith("restam 20s")
+
+
+def test_can_wait_accounts_for_next_novelty(controller):
+    controller.default_cost = 20
+    assert controller.can_wait(70) is True
+    assert controller.can_wait(80) is False
+    assert "espera de 1min" in controller.stop_reason
+
+
+def test_without_deadline_never_stops(controller):
+    controller.deadline = None
+    controller.record(10 ** 6)
+    assert controller.can_start_next() is True
+
+
+def test_for_run_uses_earliest_deadline(clock):
+    controller = RunController.for_run(
+        run_started_at=clock.now - 60, budget_minutes=30, cron_interval_minutes=360, margin_minutes=10
+    )
+    assert controller.deadline == clock.now + 30 * 60
+
+    controller = RunController.for_run(
+        run_started_at=clock.now - 340 * 60, budget_minutes=30, cron_interval_minutes=360, margin_minutes=10
+    )
+    assert controller.deadline == clock.now + 10 * 60
+
+
+def test_format_duration():
+    assert format_duration(40) == "40s"
+    assert format_duration(12 * 60) == "12min"
+    assert format_duration(3900) == "1h 05min"
@@ -0,0 +1,87 @@
+import io
+import json
+import queue
+import logging
+import logging.handlers
+
+import pytest
+
+from structured_logging import (
+    JsonLinesFormatter, StructuredQueueHandler, ContextFilter, SamplingFilter, log_context, set_log_context,
+    parse_sample_rates
+)
+
+
+@pytest.fixture
+def record():
+    record = logging.LogRecord("bot", logging.ERROR, __file__, 1, "falha %s", ("grave",), None)
+    record.threadName = "Chile"
+    return record
+
+
+def test_json_line_starts_with_timestamp_and_level(record):
+    line = JsonLinesFormatter().format(record)
+    entry = json.loads(line)
+    assert line.startswith('{"ts": "')
+    assert list(entry)[:2] == ["ts", "level"]
+    assert entry["level"] == "ERROR"
+    assert entry["thread"] == "Chile"
+    assert entry["msg"] == "falha grave"
+    assert "exc" not in entry
+
+
+def test_context_fields_are_copied_to_record(record):
+    with log_context(run_id="abc", order_id=42):
+        ContextFilter().filter(record)
+    entry = json.loads(JsonLinesFormatter().format(record))
+    assert entry["run_id"] == "abc"
+    assert entry["order_id"] == 42
+    assert "step" not in entry
+
+
+def test_set_log_context_none_removes_field(record):
+    with log_context():
+        set_log_context(country="chile", step="login")
+        set_log_context(step=None)
+        ContextFilter().filter(record)
+    assert record.country == "chile"
+    assert record.step is None
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates("debug=0.05, INFO=2,WARNING=x,NOPE=1,semvalor") == {
+        logging.DEBUG: 0.05, logging.INFO: 1.0
+    }
+    assert parse_sample_rates("") == {}
+
+
+def test_sampling_filter_only_affects_configured_levels(record, monkeypatch):
+    monkeypatch.setattr("structured_logging.random.random", lambda: 0.5)
+    sampling = SamplingFilter({logging.ERROR: 0.1})
+    assert not sampling.filter(record)
+    record.levelno = logging.INFO
+    assert sampling.filter(record)
+
+
+def test_exception_reaches_json_line_through_queue():
+    log_queue = queue.SimpleQueue()
+    stream = io.StringIO()
+    json_handler = logging.StreamHandler(stream)
+    json_handler.setFormatter(JsonLinesFormatter())
+    listener = logging.handlers.QueueListener(log_queue, json_handler)
+    logger = logging.getLogger("test_structured_logging.exc")
+    logger.propagate = False
+    logger.addHandler(StructuredQueueHandler(log_queue))
+
+    listener.start()
+    try:
+        raise ValueError("quebrou")
+    except ValueError:
+        logger.exception("falha no pedido %s", 42)
+    finally:
+        listener.stop()
+
+    entry = json.loads(stream.getvalue())
+    assert entry["msg"] == "falha no pedido 42"
+    assert entry["exc"].startswith("Traceback")
+    assert "ValueError: quebrou" in entry["exc"]
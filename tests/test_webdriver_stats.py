@@ -0,0 +1,64 @@
+import pytest
+
+from webdriver_stats import CommandStats, instrument_driver, percentile
+
+
+class Driver:
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, driver_command, params=None):
+        self.calls.append(driver_command)
+        return {"value": None}
+
+
+@pytest.fixture
+def stats():
+    stats = CommandStats()
+    for duration in (0.01, 0.02, 0.03, 0.04):
+        stats.record("find_novelty_rows", "findElements", duration)
+    stats.record("find_novelty_rows", "getElementText", 0.5)
+    stats.record("login", "clickElement", 0.1)
+    return stats
+
+
+def test_percentile_nearest_rank():
+    values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert percentile(values, 0.5) == 5
+    assert percentile(values, 0.95) == 10
+    assert percentile([7], 0.95) == 7
+    assert percentile([], 0.5) == 0.0
+
+
+def test_rows_sorted_by_total_time(stats):
+    rows = stats.rows()
+    assert [row["metodo"] for row in rows] == ["find_novelty_rows", "login"]
+    assert rows[0]["comandos"] == 5
+    assert rows[0]["total_s"] == 0.6
+    assert rows[0]["p50_ms"] == 30.0
+    assert rows[0]["p95_ms"] == 500.0
+    assert rows[0]["principais"] == {"findElements": 4, "getElementText": 1}
+    assert stats.total_commands == 6
+
+
+def test_table_lines(stats):
+    lines = stats.table_lines()
+    assert len(lines) == 3
+    assert lines[0].startswith("método")
+    assert "findElements×4" in lines[1]
+    stats.reset()
+    assert stats.table_lines() == []
+
+
+def test_instrumented_driver_attributes_commands_to_caller():
+    driver = Driver()
+    driver.command_stats = CommandStats()
+    instrument_driver(driver, __file__)
+    instrument_driver(driver, __file__)
+
+    driver.execute("findElements", {"using": "css selector"})
+
+    assert driver.calls == ["findElements"]
+    assert list(driver.command_stats.commands) == [
+        ("test_instrumented_driver_attributes_commands_to_caller", "findElements")
+    ]
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contagem e latência dos comandos WebDriver por método do bot
+Cada find_elements, is_displayed, execute_script, .text ou click é uma requisição HTTP ao
+chromedriver. O wrapper de driver.execute (por onde passam também os comandos dos WebElements)
+registra o comando, a duração e o método do bot que o originou
+"""
+
+import sys
+import math
+import time
+import threading
+
+from metrics import WEBDRIVER_COMMANDS, WEBDRIVER_COMMAND_DURATION
+
+# Comandos emitidos fora de um método do bot (ex: dentro do Selenium ao criar o driver)
+UNKNOWN_CALLER = "(fora do bot)"
+
+
+def caller_method(bot_file, max_depth=40):
+    """Nome do primeiro método de bot_file na pilha (ignora lambdas e geradores internos)"""
+    frame = sys._getframe(1)
+    depth = 0
+    while frame is not None and depth < max_depth:
+        code = frame.f_code
+        if code.co_filename == bot_file and not code.co_name.startswith("<"):
+            return code.co_name
+        frame = frame.f_back
+        depth += 1
+    return UNKNOWN_CALLER
+
+
+def percentile(sorted_values, fraction):
+    """Percentil por posição (nearest-rank) de uma lista já ordenada"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class CommandStats:
+    """Durações dos comandos por método do bot e contagem por (método, comando) de uma execução"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations = {}
+        self.commands = {}
+
+    def reset(self):
+        with self.lock:
+            self.durations = {}
+            self.commands = {}
+
+    def record(self, method, command, duration):
+        with self.lock:
+            self.durations.setdefault(method, []).append(duration)
+            key = (method, command)
+            self.commands[key] = self.commands.get(key, 0) + 1
+
+    @property
+    def total_commands(self):
+        with self.lock:
+            return sum(len(values) for values in self.durations.values())
+
+    def rows(self):
+        """Uma linha por método, ordenada pelo tempo total gasto em comandos"""
+        with self.lock:
+            durations = {method: sorted(values) for method, values in self.durations.items()}
+            commands = dict(self.commands)
+
+        rows = []
+        for method, values in durations.items():
+            per_command = sorted(
+                ((command, count) for (owner, command), count in commands.items() if owner == method),
+                key=lambda item: -item[1]
+            )
+            rows.append({
+                "metodo": method,
+                "comandos": len(values),
+                "total_s": round(sum(values), 2),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 1),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 1),
+                "principais": {command: count for command, count in per_command[:3]}
+            })
+        rows.sort(key=lambda row: -row["total_s"])
+        return rows
+
+    def table_lines(self, rows=None):
+        """Tabela de texto para o relatório da execução"""
+        rows = self.rows() if rows is None else rows
+        if not rows:
+            return []
+        width = max(len("método"), max(len(row["metodo"]) for row in rows))
+        lines = [f"{'método'.ljust(width)}  {'cmds':>7}  {'total':>8}  {'p50':>8}  {'p95':>8}  principais"]
+        for row in rows:
+            top = ", ".join(f"{command}×{count}" for command, count in row["principais"].items())
+            lines.append(
+                f"{row['metodo'].ljust(width)}  {row['comandos']:>7}  {row['total_s']:>7.1f}s  "
+                f"{row['p50_ms']:>6.1f}ms  {row['p95_ms']:>6.1f}ms  {top}"
+            )
+        return lines
+
+
+def command_recorder(driver, bot_file):
+    """
+    Função (comando, duração) que registra um comando nas métricas e em driver.command_stats
+    (usada também pelo backend CDP, que não passa por driver.execute)
+    """
+    def record(command, duration):
+        method = caller_method(bot_file)
+        WEBDRIVER_COMMANDS.inc(command=command)
+        WEBDRIVER_COMMAND_DURATION.observe(duration, method=method)
+        stats = getattr(driver, "command_stats", None)
+        if stats is not None:
+            stats.record(method, command, duration)
+
+    return record
+
+
+def instrument_driver(driver, bot_file):
+    """
+    Envolve driver.execute uma única vez. Os registros vão para driver.command_stats, que o bot
+    dono do driver define (drivers do pool mudam de dono entre execuções)
+    """
+    if getattr(driver, "command_stats_installed", False):
+        return
+    original_execute = driver.execute
+    record = command_recorder(driver, bot_file)
+
+    def instrumented_execute(driver_command, params=None):
+        started = time.perf_counter()
+        try:
+            return original_execute(driver_command, params)
+        finally:
+            record(driver_command, time.perf_counter() - started)
+
+    driver.execute = instrumented_execute
+    driver.command_stats_installed = True